@@ -1,13 +1,18 @@
+import concurrent.futures
 import logging
 import os
 import shutil
+import threading
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, Dict, List, Set
 
 from pydantic import BaseModel
 
 from magnus import defaults, utils
 
+if TYPE_CHECKING:
+    from magnus.datastore import DataCatalog
+
 logger = logging.getLogger(defaults.NAME)
 
 
@@ -113,6 +118,65 @@ class BaseCatalog:
         """
         raise NotImplementedError
 
+    def get_many(self, names: List[str], run_id: str, compute_data_folder=None, **kwargs) -> List[object]:
+        """
+        Get the catalog items matching any of the 'names' for the 'run id' and store them in compute data folder.
+
+        The names are fetched concurrently by get, in threads as the work is I/O bound.
+        Implementations that can fetch many items in one request should over-ride this method.
+
+        Args:
+            names (List[str]): The names of the catalog items
+            run_id (str): The run_id of the run.
+            compute_data_folder (str, optional): The compute data folder. Defaults to magnus default (data/)
+
+        Returns:
+            List(object) : A list of catalog objects, in the order of the names
+        """
+        return self._sync_many(self.get, names, run_id=run_id, compute_data_folder=compute_data_folder, **kwargs)
+
+    def put_many(self, names: List[str], run_id: str, compute_data_folder=None, synced_catalogs=None,
+                 **kwargs) -> List[object]:
+        """
+        Put the files matching any of the 'names' from the 'compute_data_folder' in the catalog for the run_id.
+
+        The names are put concurrently by put, in threads as the work is I/O bound.
+        Implementations that can put many items in one request should over-ride this method.
+
+        Args:
+            names (List[str]): The names of the catalog items.
+            run_id (str): The run_id of the run.
+            compute_data_folder (str, optional): The compute data folder. Defaults to magnus default (data/)
+            synced_catalogs (dict, optional): Any previously synced catalogs. Defaults to None.
+
+        Returns:
+            List(object) : A list of catalog objects, in the order of the names
+        """
+        return self._sync_many(self.put, names, run_id=run_id, compute_data_folder=compute_data_folder,
+                               synced_catalogs=synced_catalogs, **kwargs)
+
+    @staticmethod
+    def _sync_many(sync, names: List[str], **kwargs) -> List[object]:
+        """
+        Call sync, get or put, for every name and collect the catalog objects in the order of the names.
+
+        The names are synced in threads, no more than the number of cpus available at a time.
+
+        Args:
+            sync (callable): The get or put method of the catalog.
+            names (List[str]): The names of the catalog items.
+
+        Returns:
+            List(object) : A list of catalog objects
+        """
+        max_workers = min(len(names), utils.effective_cpu_count())
+        if max_workers <= 1:
+            return [data_catalog for name in names for data_catalog in sync(name=name, **kwargs)]
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = pool.map(lambda name: sync(name=name, **kwargs), names)
+            return [data_catalog for data_catalogs in results for data_catalog in data_catalogs]
+
     def sync_between_runs(self, previous_run_id: str, run_id: str):
         """
         Given run_id of a previous run, sync them to the catalog of the run given by run_id
@@ -161,6 +225,34 @@ class DoNothingCatalog(BaseCatalog):
         ...
 
 
+class _ClaimedFiles:
+    """
+    The files claimed for copying by any of the names synced together by get_many or put_many.
+
+    The names could match the same files, a file is copied only by the name that claims it first.
+    """
+
+    def __init__(self):
+        self._files: Set[Path] = set()
+        self._lock = threading.Lock()
+
+    def claim(self, file: Path) -> bool:
+        """
+        Claim the file for copying.
+
+        Args:
+            file (Path): The file to copy
+
+        Returns:
+            bool: True if the file was not claimed before.
+        """
+        with self._lock:
+            if file in self._files:
+                return False
+            self._files.add(file)
+            return True
+
+
 class FileSystemCatalog(BaseCatalog):
     """
     A Catalog handler that uses the local file system for cataloging.
@@ -193,13 +285,27 @@ class FileSystemCatalog(BaseCatalog):
         """
         return self.config.catalog_location  # type: ignore
 
-    def get(self, name: str, run_id: str, compute_data_folder=None, **kwargs) -> List[object]:
+    def get_many(self, names: List[str], run_id: str, compute_data_folder=None, **kwargs) -> List[object]:
+        # The names could match the same files, every file is copied once
+        return super().get_many(names, run_id, compute_data_folder=compute_data_folder,
+                                claimed_files=_ClaimedFiles(), **kwargs)
+
+    def put_many(self, names: List[str], run_id: str, compute_data_folder=None, synced_catalogs=None,
+                 **kwargs) -> List[object]:
+        # The names could match the same files, every file is copied once
+        return super().put_many(names, run_id, compute_data_folder=compute_data_folder,
+                                synced_catalogs=synced_catalogs, claimed_files=_ClaimedFiles(), **kwargs)
+
+    def get(self, name: str, run_id: str, compute_data_folder=None, claimed_files: _ClaimedFiles = None,
+            **kwargs) -> List[object]:
         """
         Get the file by matching glob pattern to the name
 
         Args:
             name ([str]): A glob matching the file name
             run_id ([str]): The run id
+            claimed_files (_ClaimedFiles, optional): The files claimed by the other names synced along with this one.
+                A file claimed by another name is not copied again. Defaults to None.
 
         Raises:
             Exception: If the catalog location does not exist
@@ -255,6 +361,9 @@ class FileSystemCatalog(BaseCatalog):
             data_catalog.stage = 'get'
             data_catalogs.append(data_catalog)
 
+            if claimed_files is not None and not claimed_files.claim(file):
+                continue
+
             # Make the directory in the data folder if required
             Path(copy_to / relative_file_path.parent).mkdir(parents=True, exist_ok=True)
             shutil.copy(file, copy_to / relative_file_path)
@@ -263,7 +372,8 @@ class FileSystemCatalog(BaseCatalog):
 
         return data_catalogs
 
-    def put(self, name: str, run_id: str, compute_data_folder=None, synced_catalogs=None, **kwargs) -> List[object]:
+    def put(self, name: str, run_id: str, compute_data_folder=None, synced_catalogs=None,
+            claimed_files: _ClaimedFiles = None, **kwargs) -> List[object]:
         """
         Put the files matching the glob pattern into the catalog.
 
@@ -274,6 +384,8 @@ class FileSystemCatalog(BaseCatalog):
             run_id (str): The run id of the run
             compute_data_folder (str, optional): The compute data folder to sync from. Defaults to settings default.
             synced_catalogs (dict, optional): dictionary of previously synced catalogs. Defaults to None.
+            claimed_files (_ClaimedFiles, optional): The files claimed by the other names synced along with this one.
+                A file claimed by another name is not copied again. Defaults to None.
 
         Raises:
             Exception: If the compute data folder does not exist.
@@ -307,6 +419,11 @@ class FileSystemCatalog(BaseCatalog):
         glob_files = copy_from.glob(name)  # type: ignore
         logger.debug(f'Glob identified {glob_files} as matches to from the compute data folder: {copy_from}')
 
+        # Index the previously synced catalogs once instead of scanning all of them for every file
+        synced_catalogs_by_path: Dict[str, DataCatalog] = {}
+        for synced_catalog in synced_catalogs or []:
+            synced_catalogs_by_path.setdefault(synced_catalog.catalog_relative_path, synced_catalog)
+
         data_catalogs = []
         run_log_store = get_run_log_store()
         for file in glob_files:
@@ -323,7 +440,11 @@ class FileSystemCatalog(BaseCatalog):
             data_catalog.stage = 'put'
             data_catalogs.append(data_catalog)
 
-            if is_catalog_out_of_sync(data_catalog, synced_catalogs):
+            if claimed_files is not None and not claimed_files.claim(file):
+                continue
+
+            synced_catalog = synced_catalogs_by_path.get(data_catalog.catalog_relative_path, None)
+            if is_catalog_out_of_sync(data_catalog, [synced_catalog] if synced_catalog else None):
                 logger.info(f'{data_catalog.name} was found to be changed, syncing')
 
                 # Make the directory in the catalog if required
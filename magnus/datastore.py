@@ -2,9 +2,17 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional, OrderedDict, Tuple, Union
+from typing import Dict, Iterator, List, Optional, OrderedDict, Set, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # Not available on non-POSIX platforms, the run logs of the file system store are not locked there
+    fcntl = None  # type: ignore
 
 from pydantic import BaseModel
 
@@ -341,6 +349,33 @@ class BaseRunLogStore:
         """
         raise NotImplementedError
 
+    def get_run_status(self, run_id: str, **kwargs) -> str:  # pylint: disable=unused-argument
+        """
+        Get the status of the Run log defined by the run_id
+
+        Implementations that can read the status without the whole run log should over-ride this method.
+
+        Args:
+            run_id (str): The run_id of the run
+
+        Returns:
+            str: The status of the run
+        Raises:
+            RunLogNotFoundError: If the run log for run_id is not found in the datastore
+        """
+        run_log = self.get_run_log_by_id(run_id=run_id, full=False)
+        return run_log.status
+
+    def release_run_log(self, run_id: str, **kwargs):  # pylint: disable=unused-argument
+        """
+        Release anything held for the run log of the run_id, like locks, once the run is finished.
+
+        Implementations that hold resources for a run in progress should over-ride this method.
+
+        Args:
+            run_id (str): The run_id of the run
+        """
+
     def get_parameters(self, run_id: str, **kwargs) -> dict:  # pylint: disable=unused-argument
         """
         Get the parameters from the Run log defined by the run_id
@@ -482,6 +517,20 @@ class BaseRunLogStore:
         branch.steps[step_log.internal_name] = step_log
         self.put_run_log(run_log=run_log)
 
+    def add_step_logs(self, step_logs: List[StepLog], run_id: str, **kwargs):  # pylint: disable=unused-argument
+        """
+        Add many step logs in the run log as identified by the run_id in the datastore
+
+        The default implementation adds the step logs one by one, run log stores could over-ride it to add them in
+        a single write.
+
+        Args:
+            step_logs (List[StepLog]): The step logs to add to the database
+            run_id (str): The run id of the run
+        """
+        for step_log in step_logs:
+            self.add_step_log(step_log, run_id)
+
     def create_branch_log(self, internal_branch_name: str, **kwargs) -> BranchLog:  # pylint: disable=unused-argument
         """
         Creates a uncomitted branch log object by the internal name given
@@ -515,6 +564,23 @@ class BaseRunLogStore:
         branch, _ = run_log.search_branch_by_internal_name(internal_branch_name)
         return branch
 
+    def get_branch_logs(self, internal_branch_names: List[str], run_id: str,
+                        **kwargs) -> Dict[str, Union[BranchLog, RunLog]]:  # pylint: disable=unused-argument
+        """
+        Returns many branch logs by their internal branch names for the run id
+
+        The default implementation gets the branch logs one by one, run log stores could over-ride it to get them in
+        a single read.
+
+        Args:
+            internal_branch_names (List[str]): The internal branch names to retrieve.
+            run_id (str): The run id of interest
+
+        Returns:
+            dict: The branch logs by their internal branch names.
+        """
+        return {name: self.get_branch_log(name, run_id) for name in internal_branch_names}
+
     def add_branch_log(self, branch_log: Union[BranchLog, RunLog], run_id: str, **kwargs):  # pylint: disable=unused-argument
         """
         The method should:
@@ -547,6 +613,20 @@ class BaseRunLogStore:
         step.branches[internal_branch_name] = branch_log  # type: ignore
         self.put_run_log(run_log)
 
+    def add_branch_logs(self, branch_logs: List[BranchLog], run_id: str, **kwargs):  # pylint: disable=unused-argument
+        """
+        Add many branch logs in the run log as identified by the run_id in the datastore
+
+        The default implementation adds the branch logs one by one, run log stores could over-ride it to add them in
+        a single write.
+
+        Args:
+            branch_logs (List[BranchLog]): The branch logs to add to the database
+            run_id (str): The run id to which the branch logs are added
+        """
+        for branch_log in branch_logs:
+            self.add_branch_log(branch_log, run_id)
+
     def create_attempt_log(self, **kwargs) -> StepAttempt:  # pylint: disable=unused-argument
         """
         Returns an uncommitted step attempt log.
@@ -641,8 +721,8 @@ class FileSystemRunLogstore(BaseRunLogStore):
         When locally testing a pipeline and have the need to compare across runs.
         Its fully featured and perfectly fine if your local environment is where you would do everyhing.
 
-    Do not use:
-        If you need parallelization on local, this run log would not support it.
+    The changes to a run log are made under an exclusive lock on the run log and the run log is replaced atomically,
+    so the parallel branches of a run can share the run log.
 
     Example config:
 
@@ -656,14 +736,54 @@ class FileSystemRunLogstore(BaseRunLogStore):
     class Config(BaseModel):
         log_folder: str = defaults.LOG_LOCATION_FOLDER
 
+    def __init__(self, config):
+        super().__init__(config)
+        self._locked_run_ids: Set[str] = set()
+
     @property
     def log_folder_name(self) -> str:
         return self.config.log_folder
 
+    @contextmanager
+    def lock_run_log(self, run_id: str) -> Iterator[None]:
+        """
+        Hold an exclusive lock on the run log of the run_id, across processes.
+
+        Any read, modify and write of the run log should happen while holding the lock, so that the changes made by
+        other processes, like the workers executing parallel branches, are not over-written.
+        The lock is re-entrant within the process.
+
+        The lock is a no-op on platforms without fcntl.
+
+        Args:
+            run_id (str): The run id of the run log to lock
+        """
+        if run_id in self._locked_run_ids or fcntl is None:
+            yield
+            return
+
+        utils.safe_make_dir(self.log_folder_name)
+        lock_file_path = Path(self.log_folder_name) / f'{run_id}.lock'
+
+        with lock_file_path.open('w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._locked_run_ids.add(run_id)
+            try:
+                yield
+            finally:
+                self._locked_run_ids.discard(run_id)
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def release_run_log(self, run_id: str, **kwargs):
+        # The lock file is only needed while the run is in progress
+        (Path(self.log_folder_name) / f'{run_id}.lock').unlink(missing_ok=True)
+
     def write_to_folder(self, run_log: RunLog):
         """
         Write the run log to the folder
 
+        The run log is written to a temporary file and moved in place, so a reader never sees a partial run log.
+
         Args:
             run_log (RunLog): The run log to be added to the database
         """
@@ -673,9 +793,11 @@ class FileSystemRunLogstore(BaseRunLogStore):
         write_to_path = Path(write_to)
         run_id = run_log.run_id
         json_file_path = write_to_path / f'{run_id}.json'
+        temporary_file_path = write_to_path / f'{run_id}.json.{os.getpid()}'
 
-        with json_file_path.open('w') as fw:
+        with temporary_file_path.open('w') as fw:
             json.dump(run_log.dict(), fw, ensure_ascii=True, indent=4)  # pylint: disable=no-member
+        os.replace(temporary_file_path, json_file_path)
 
     def get_from_folder(self, run_id: str) -> RunLog:
         """
@@ -719,7 +841,8 @@ class FileSystemRunLogstore(BaseRunLogStore):
         logger.info(f'{self.service_name} Creating a Run Log for : {run_id}')
         run_log = RunLog(run_id=run_id, dag_hash=dag_hash, use_cached=use_cached,
                          tag=tag, original_run_id=original_run_id, status=status)
-        self.write_to_folder(run_log)
+        with self.lock_run_log(run_id):
+            self.write_to_folder(run_log)
         return run_log
 
     def get_run_log_by_id(self, run_id: str, full: bool = True, **kwargs) -> RunLog:
@@ -732,7 +855,166 @@ class FileSystemRunLogstore(BaseRunLogStore):
         except FileNotFoundError as e:
             raise exceptions.RunLogNotFoundError(run_id) from e
 
+    def get_run_status(self, run_id: str, **kwargs) -> str:
+        # Reads the status from the JSON without decoding the run log
+        json_file_path = Path(self.log_folder_name) / f'{run_id}.json'
+
+        if not json_file_path.exists():
+            raise exceptions.RunLogNotFoundError(run_id)
+
+        with json_file_path.open('r') as fr:
+            return json.load(fr)['status']
+
     def put_run_log(self, run_log: RunLog, **kwargs):
         # Puts the run_log into the database
         logger.info(f'{self.service_name} Putting the run log in the DB: {run_log.run_id}')
-        self.write_to_folder(run_log)
+        with self.lock_run_log(run_log.run_id):
+            self.write_to_folder(run_log)
+
+    def set_parameters(self, run_id: str, parameters: dict, **kwargs):
+        with self.lock_run_log(run_id):
+            super().set_parameters(run_id=run_id, parameters=parameters, **kwargs)
+
+    def set_run_config(self, run_id: str, run_config: dict, **kwargs):
+        with self.lock_run_log(run_id):
+            super().set_run_config(run_id=run_id, run_config=run_config, **kwargs)
+
+    def add_step_log(self, step_log: StepLog, run_id: str, **kwargs):
+        with self.lock_run_log(run_id):
+            super().add_step_log(step_log, run_id, **kwargs)
+
+    def add_step_logs(self, step_logs: List[StepLog], run_id: str, **kwargs):
+        # Adds all the step logs with a single read and write of the run log
+        logger.info(f'{self.service_name} Adding {len(step_logs)} step logs to DB')
+        with self.lock_run_log(run_id):
+            run_log = self.get_run_log_by_id(run_id=run_id)
+
+            for step_log in step_logs:
+                branch_to_add = '.'.join(step_log.internal_name.split('.')[:-1])
+                branch, _ = run_log.search_branch_by_internal_name(branch_to_add)
+                branch.steps[step_log.internal_name] = step_log
+
+            self.put_run_log(run_log=run_log)
+
+    def get_branch_logs(self, internal_branch_names: List[str], run_id: str,
+                        **kwargs) -> Dict[str, Union[BranchLog, RunLog]]:
+        # Gets all the branch logs with a single read of the run log
+        run_log = self.get_run_log_by_id(run_id=run_id)
+
+        branch_logs: Dict[str, Union[BranchLog, RunLog]] = {}
+        for internal_branch_name in internal_branch_names:
+            if not internal_branch_name:
+                branch_logs[internal_branch_name] = run_log
+                continue
+            branch_logs[internal_branch_name], _ = run_log.search_branch_by_internal_name(internal_branch_name)
+
+        return branch_logs
+
+    def add_branch_log(self, branch_log: Union[BranchLog, RunLog], run_id: str, **kwargs):
+        with self.lock_run_log(run_id):
+            super().add_branch_log(branch_log, run_id, **kwargs)
+
+    def add_branch_logs(self, branch_logs: List[BranchLog], run_id: str, **kwargs):
+        # Adds all the branch logs with a single read and write of the run log
+        logger.info(f'{self.service_name} Adding {len(branch_logs)} branch logs to DB')
+        with self.lock_run_log(run_id):
+            run_log = self.get_run_log_by_id(run_id=run_id)
+
+            for branch_log in branch_logs:
+                step_name = '.'.join(branch_log.internal_name.split('.')[:-1])
+                step, _ = run_log.search_step_by_internal_name(step_name)
+                step.branches[branch_log.internal_name] = branch_log
+
+            self.put_run_log(run_log=run_log)
+
+
+class BatchedRunLogStore(BaseRunLogStore):
+    """
+    A write behind layer over any run log store that persists the run log as a whole via put_run_log.
+
+    The run log of the current run is held in memory once read or written and the writes to the underlying run log
+    store are coalesced. The run log is written to the underlying store once every max_pending_writes or when
+    flush is called.
+
+    As the pending writes are only visible to this process, the run log should be flushed before any other process
+    (parallel branches, containers) reads or writes the run log. The workers executing parallel branches do not batch
+    their writes, as they would over-write the writes of their sibling branches.
+
+    This store is not a service by itself and is used by the executor if the mode config has batch_log_writes: True.
+    """
+
+    def __init__(self, run_log_store: BaseRunLogStore, max_pending_writes: int = defaults.MAX_PENDING_LOG_WRITES):
+        # pylint: disable=super-init-not-called
+        self.run_log_store = run_log_store
+        self.max_pending_writes = max_pending_writes
+        self.service_name = run_log_store.service_name
+
+        self._run_log: Optional[RunLog] = None
+        self._pending_writes = 0
+
+    @property
+    def config(self):
+        return self.run_log_store.config
+
+    def __getattr__(self, name):
+        # Any property of the underlying run log store, like log_folder_name, is accessed from it
+        if name == 'run_log_store':
+            raise AttributeError(name)
+        return getattr(self.run_log_store, name)
+
+    def flush(self):
+        """
+        Write any pending changes of the run log to the underlying run log store and forget the in memory copy.
+        """
+        if self._run_log and self._pending_writes:
+            logger.info(f'Flushing {self._pending_writes} pending writes of run log: {self._run_log.run_id}')
+            self.run_log_store.put_run_log(run_log=self._run_log)
+
+        self._run_log = None
+        self._pending_writes = 0
+
+    def discard_pending_writes(self):
+        """
+        Forget any pending changes of the run log without writing them to the underlying run log store.
+
+        A worker forked from the process that owns the pending changes should not write them again.
+        """
+        self._run_log = None
+        self._pending_writes = 0
+
+    def create_run_log(self, run_id: str, dag_hash: str = '', use_cached: bool = False,
+                       tag: str = '', original_run_id: str = '', status: str = defaults.CREATED, **kwargs) -> RunLog:
+        self.flush()
+        return self.run_log_store.create_run_log(run_id=run_id, dag_hash=dag_hash, use_cached=use_cached, tag=tag,
+                                                 original_run_id=original_run_id, status=status, **kwargs)
+
+    def get_run_log_by_id(self, run_id: str, full: bool = True, **kwargs) -> RunLog:
+        if self._run_log and self._run_log.run_id == run_id:
+            return self._run_log
+
+        if self._run_log:
+            # Only the run log of the current run is kept in memory, previous run logs are read as is.
+            return self.run_log_store.get_run_log_by_id(run_id=run_id, full=full, **kwargs)
+
+        self._run_log = self.run_log_store.get_run_log_by_id(run_id=run_id, full=True, **kwargs)
+        return self._run_log
+
+    def get_run_status(self, run_id: str, **kwargs) -> str:
+        if self._run_log and self._run_log.run_id == run_id:
+            return self._run_log.status
+
+        return self.run_log_store.get_run_status(run_id=run_id, **kwargs)
+
+    def release_run_log(self, run_id: str, **kwargs):
+        self.flush()
+        self.run_log_store.release_run_log(run_id=run_id, **kwargs)
+
+    def put_run_log(self, run_log: RunLog, **kwargs):
+        if self._run_log and self._run_log.run_id != run_log.run_id:
+            self.flush()
+
+        self._run_log = run_log
+        self._pending_writes += 1
+
+        if self._pending_writes >= self.max_pending_writes:
+            self.flush()
@@ -70,9 +70,14 @@ USER_CONFIG_FILE = 'magnus-config.yaml'
 
 # Executor settings
 ENABLE_PARALLEL = False
+BATCH_LOG_WRITES = False
+
+# Node settings
+MAX_RESOLVED_LOG_NAMES = 32  # The log names resolved for map variables remembered by a node
 
 # RUN log store settings
 LOG_LOCATION_FOLDER = '.run_log_store'
+MAX_PENDING_LOG_WRITES = 32
 
 # Dag node
 DAG_BRANCH_NAME = 'dag'
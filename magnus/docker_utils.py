@@ -5,10 +5,6 @@ from typing import Union
 from magnus import defaults, utils
 
 logger = logging.getLogger(defaults.NAME)
-try:
-    import docker
-except ImportError:
-    logger.info('docker was not installed, docker functionality will not work')
 
 
 def generate_docker_file(style: str = "poetry", git_tracked: bool = True):
@@ -62,5 +58,8 @@ def build_docker(image_name: str, docker_file: Union[str, None],
     if dry_run:
         return
 
+    # Conditional import
+    import docker  # pylint: disable=C0415
+
     docker_client = docker.from_env()
     docker_client.images.build(path=f".", dockerfile=docker_file, tag=f'{image_name}:{tag}', quiet=False)
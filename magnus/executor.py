@@ -1,26 +1,43 @@
 from __future__ import annotations
 
+import atexit
+import concurrent.futures
 import copy
+import itertools
 import json
 import logging
 import os
 import re
-from typing import TYPE_CHECKING, Dict, Optional
+from functools import cached_property
+from string import Template
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
 
 from pydantic import BaseModel
 
-from magnus import defaults, exceptions, integration, interaction, utils
+from magnus import datastore, defaults, exceptions, integration, interaction, pipeline, utils
 from magnus.graph import Graph
 from magnus.nodes import BaseNode
 
 if TYPE_CHECKING:
     from magnus.catalog import BaseCatalog
-    from magnus.datastore import BaseRunLogStore, StepLog
+    from magnus.datastore import BaseRunLogStore, BranchLog, CodeIdentity, RunLog, StepLog
     from magnus.experiment_tracker import BaseExperimentTracker
     from magnus.secrets import BaseSecrets
 
 logger = logging.getLogger(defaults.NAME)
 
+# Characters that are not allowed in the job ids of a rendered job specification
+_JOB_ID_INVALID_CHARACTERS = re.compile('[^A-Za-z0-9]+')
+
+# The bash script section following a step in the demo renderer, runs the fail node and exits if the step fails
+_DEMO_FAIL_CHECK_TEMPLATE = Template(
+    'exit_code=$$?\necho $$exit_code\n'
+    'if [ $$exit_code -ne 0 ];\nthen\n'
+    '\t $$(${fail_command})\n'
+    '\texit 1\n'
+    'fi\n'
+)
+
 
 class BaseExecutor:
     """
@@ -65,6 +82,7 @@ class BaseExecutor:
 
     class Config(BaseModel):
         enable_parallel: bool = defaults.ENABLE_PARALLEL
+        batch_log_writes: bool = defaults.BATCH_LOG_WRITES
         placeholders: dict = {}
 
     def __init__(self, config: dict = None):
@@ -73,10 +91,10 @@ class BaseExecutor:
         self.config = self.Config(**config)
         # The remaining would be attached later
         # The definition files
-        self.pipeline_file = None
+        self.pipeline_file: str = None  # type: ignore
         self.variables_file = None
         self.parameters_file = None
-        self.configuration_file = None
+        self.configuration_file: str = None  # type: ignore
         # run descriptors
         self.tag: str = ''
         self.run_id: str = ''
@@ -91,7 +109,15 @@ class BaseExecutor:
         self.secrets_handler: BaseSecrets = None  # type: ignore
         self.experiment_tracker: BaseExperimentTracker = None  # type: ignore
         self.run_log_store: BaseRunLogStore = None  # type: ignore
-        self.previous_run_log = None
+        self.previous_run_log: Optional[RunLog] = None
+        self._previous_step_logs: Optional[Dict[str, StepLog]] = None
+        self._pending_skip_logs: List[StepLog] = []
+        self._git_code_identity: Optional[CodeIdentity] = None
+        self._parameters_cache: Dict[str, dict] = {}
+        self._configured_for_traversal: Set[Tuple[str, int]] = set()
+        self._configured_for_execution: Set[Tuple[str, int]] = set()
+        self._process_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._critical_path_lengths: Dict[int, int] = {}
 
         self.context_step_log: StepLog = None  # type: ignore
 
@@ -109,6 +135,215 @@ class BaseExecutor:
         """
         return self.config.enable_parallel
 
+    def _get_process_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        """
+        The pool of worker processes that execute the branches of composite nodes in parallel.
+
+        The pool is created on first use and is shared by all the composite nodes of the run, so the workers are
+        started once rather than for every composite node.
+
+        Returns:
+            concurrent.futures.ProcessPoolExecutor: The pool of worker processes
+        """
+        if self._process_pool is None:
+            self._process_pool = concurrent.futures.ProcessPoolExecutor(max_workers=utils.effective_cpu_count())
+        return self._process_pool
+
+    def _shutdown_process_pool(self):
+        """
+        Shut down the pool of worker processes, if one was started, waiting for the workers to exit.
+        """
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True)
+            self._process_pool = None
+
+    def _flush_run_log(self):
+        """
+        If the writes to the run log store are batched, write the pending changes to the run log store.
+
+        This should be called before any other process reads or writes to the run log.
+        """
+        if isinstance(self.run_log_store, datastore.BatchedRunLogStore):
+            self.run_log_store.flush()
+
+    def _flush_skipped_step_logs(self):
+        """
+        Add the step logs of the nodes skipped in a re-run to the run log store, in one go.
+
+        The step logs are written before any other step log to keep the order of steps in the run log.
+        """
+        if self._pending_skip_logs:
+            self.run_log_store.add_step_logs(self._pending_skip_logs, self.run_id)
+            self._pending_skip_logs = []
+
+    def _get_parameters(self) -> dict:
+        """
+        Get the parameters of the current run.
+
+        The parameters are read from the run log store only once and served from an in-memory cache after,
+        the cache is kept in sync by self._set_parameters.
+
+        Returns:
+            dict: The parameters of the current run.
+        """
+        if self.run_id not in self._parameters_cache:
+            parameters = self.run_log_store.get_parameters(run_id=self.run_id)
+            self._parameters_cache[self.run_id] = dict(parameters)
+
+        return self._parameters_cache[self.run_id]
+
+    def _set_parameters(self, parameters: dict):
+        """
+        Update the parameters of the current run in the run log store and the in-memory cache.
+
+        Args:
+            parameters (dict): The parameters to update.
+        """
+        self.run_log_store.set_parameters(run_id=self.run_id, parameters=parameters)
+        if self.run_id in self._parameters_cache:
+            self._parameters_cache[self.run_id].update(parameters)
+
+    def _invalidate_parameters_cache(self):
+        """
+        Drop the cached parameters.
+
+        This should be called whenever another process could have changed the parameters in the run log store.
+        """
+        self._parameters_cache = {}
+
+    def _submit_branch(self, pool: concurrent.futures.ProcessPoolExecutor, branch: Graph,
+                       map_variable: str) -> concurrent.futures.Future:
+        """
+        Submit the execution of a branch to the pool of worker processes.
+
+        Args:
+            pool (concurrent.futures.ProcessPoolExecutor): The pool of worker processes
+            branch (Graph): The branch to execute
+            map_variable (str): The map variable of the branch, serialized as json
+
+        Returns:
+            concurrent.futures.Future: The future of the execution of the branch
+        """
+        return pool.submit(
+            pipeline.execute_single_brach,
+            configuration_file=self.configuration_file,
+            pipeline_file=self.pipeline_file,
+            branch_name=branch.internal_branch_name.replace(' ', defaults.COMMAND_FRIENDLY_CHARACTER),
+            map_variable=map_variable,
+            run_id=self.run_id,
+            tag=self.tag)
+
+    def _fail_unfinished_branches(self, branch_log_names: List[str], failed_branch_log_names: Set[str]):
+        """
+        Mark the branches that failed to execute or did not complete as failed in the run log store.
+
+        The branches are executed synchronously, so once all of them have returned, a branch log still processing
+        belongs to a branch whose worker died or that was never executed.
+
+        Args:
+            branch_log_names (List[str]): The names of the branch logs of the executed branches
+            failed_branch_log_names (Set[str]): The names of the branch logs of the branches whose execution raised
+        """
+        unfinished_branch_logs: List[BranchLog] = []
+        branch_logs = self.run_log_store.get_branch_logs(branch_log_names, self.run_id)
+        for branch_log_name, branch_log in branch_logs.items():
+            if not isinstance(branch_log, datastore.BranchLog) or branch_log.status == defaults.FAIL:
+                continue
+
+            if branch_log.status == defaults.PROCESSING or branch_log_name in failed_branch_log_names:
+                logger.error(f'The branch {branch_log_name} did not complete, marking it as failed')
+                branch_log.status = defaults.FAIL
+                unfinished_branch_logs.append(branch_log)
+
+        if unfinished_branch_logs:
+            self.run_log_store.add_branch_logs(unfinished_branch_logs, self.run_id)
+
+    def _execute_branches(self, branches: List[Tuple[Graph, dict]], max_concurrency: Optional[int] = None,
+                          **kwargs):
+        """
+        Execute the branches of a composite node.
+
+        If the mode allows parallel execution, the branches are submitted as tasks to the pool of worker processes
+        bounded by the number of cpus available and we wait for all of them to complete.
+        If max_concurrency is given, no more than those many branches are submitted at any time and the remaining
+        are submitted as the running ones complete.
+        The branches with the longest critical path are submitted first, so that they do not wait for a free worker
+        behind shorter branches. Branches of the same length keep their order. The length of the critical path of a
+        branch is computed the first time the branch is executed.
+        Workers execute the branch via magnus.pipeline.execute_single_brach, as parameters are exchanged between the
+        steps via environment variables and they need a process of their own.
+
+        If the parallel execution is not enabled or there is at most one branch, the branches are executed
+        sequentially in this process.
+
+        The status of the branches is not returned but is available in the branch logs of the run log store.
+        A branch whose worker raised or died, or that was not executed, is marked as failed.
+
+        Args:
+            branches (List[Tuple[Graph, dict]]): The branches to execute along with their map variable.
+            max_concurrency (int, optional): The maximum number of branches to execute at a time.
+                Defaults to None, in which case all the branches are submitted at once.
+        """
+        if not self._is_parallel_execution() or len(branches) <= 1:
+            for branch, map_variable in branches:
+                self.execute_graph(branch, map_variable=map_variable, **kwargs)
+            return
+
+        # The branches are part of the dag and do not change during the run, their lengths are computed once
+        for branch, _ in branches:
+            if id(branch) not in self._critical_path_lengths:
+                self._critical_path_lengths[id(branch)] = branch.compute_priorities().get(branch.start_at, 0)
+        branches = sorted(branches, key=lambda branch: -self._critical_path_lengths[id(branch[0])])
+
+        # The branches of a parallel node share the map variable, serialize it once
+        serialized_map_variables: Dict[int, str] = {}
+        serialized_branches = []
+        for branch, map_variable in branches:
+            if id(map_variable) not in serialized_map_variables:
+                serialized_map_variables[id(map_variable)] = json.dumps(map_variable)
+            branch_log_name = BaseNode._resolve_map_placeholders(branch.internal_branch_name, map_variable=map_variable)
+            serialized_branches.append((branch, serialized_map_variables[id(map_variable)], branch_log_name))
+
+        self._flush_run_log()
+        pool = self._get_process_pool()
+        pending = iter(serialized_branches)
+        running: Dict[concurrent.futures.Future, str] = {}
+        for branch, map_variable_str, branch_log_name in itertools.islice(pending, max_concurrency or len(branches)):
+            running[self._submit_branch(pool, branch, map_variable_str)] = branch_log_name
+
+        failed_branch_log_names: Set[str] = set()
+        pool_is_broken = False
+        while running:
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                branch_log_name = running.pop(future)
+                try:
+                    future.result()
+                except concurrent.futures.BrokenExecutor:
+                    # A worker died abruptly, the pool cannot take any more branches
+                    logger.exception(f'Execution of the branch {branch_log_name} failed')
+                    failed_branch_log_names.add(branch_log_name)
+                    pool_is_broken = True
+                except Exception:  # pylint: disable=W0703
+                    logger.exception(f'Execution of the branch {branch_log_name} failed')
+                    failed_branch_log_names.add(branch_log_name)
+
+                if pool_is_broken:
+                    continue
+                next_branch = next(pending, None)
+                if next_branch:
+                    branch, map_variable_str, next_branch_log_name = next_branch
+                    running[self._submit_branch(pool, branch, map_variable_str)] = next_branch_log_name
+
+        if pool_is_broken:
+            self._shutdown_process_pool()
+
+        self._fail_unfinished_branches([branch_log_name for _, _, branch_log_name in serialized_branches],
+                                       failed_branch_log_names)
+
+        # The branches could have changed the parameters
+        self._invalidate_parameters_cache()
+
     def _set_up_run_log(self, exists_ok=False):
         """
         Create a run log and put that in the run log store
@@ -117,16 +352,16 @@ class BaseExecutor:
         """
         try:
             attempt_run_log = self.run_log_store.get_run_log_by_id(run_id=self.run_id, full=False)
+        except exceptions.RunLogNotFoundError:
+            attempt_run_log = None
+
+        if attempt_run_log is not None:
             if attempt_run_log.status in [defaults.FAIL, defaults.SUCCESS]:
                 raise Exception(f'The run log by id: {self.run_id} already exists and is {attempt_run_log.status}')
 
-            raise exceptions.RunLogExistsError(self.run_id)
-        except exceptions.RunLogNotFoundError:
-            pass
-        except exceptions.RunLogExistsError:
             if exists_ok:
                 return
-            raise
+            raise exceptions.RunLogExistsError(self.run_id)
 
         run_log = {}
         run_log['run_id'] = self.run_id
@@ -151,7 +386,7 @@ class BaseExecutor:
 
         run_log = self.run_log_store.create_run_log(**run_log)
         # Any interaction with run log store attributes should happen via API if available.
-        self.run_log_store.set_parameters(run_id=self.run_id, parameters=parameters)
+        self._set_parameters(parameters)
 
         # Update run_config
         run_config = utils.get_run_config(self)
@@ -166,15 +401,7 @@ class BaseExecutor:
 
         But in cases of actual rendering the job specs (eg: AWS step functions, K8's) we need not do anything.
         """
-
-        integration.validate(self, self.run_log_store)
-        integration.configure_for_traversal(self, self.run_log_store)
-
-        integration.validate(self, self.catalog_handler)
-        integration.configure_for_traversal(self, self.catalog_handler)
-
-        integration.validate(self, self.secrets_handler)
-        integration.configure_for_traversal(self, self.secrets_handler)
+        self._configure_services(integration.configure_for_traversal, self._configured_for_traversal)
 
         self._set_up_run_log()
 
@@ -186,15 +413,35 @@ class BaseExecutor:
             node (Node): [description]
             map_variable (dict, optional): [description]. Defaults to None.
         """
+        self._configure_services(integration.configure_for_execution, self._configured_for_execution)
+
+    def _configure_services(self, configure, configured: Set[Tuple[str, int]]):
+        """
+        Validate and configure the run log store, catalog and secrets handler for the executor.
+
+        The integrations are idempotent for a given executor and service, so a service is validated and configured
+        only once and skipped in subsequent calls. A service that is replaced is configured again.
 
-        integration.validate(self, self.run_log_store)
-        integration.configure_for_execution(self, self.run_log_store)
+        Args:
+            configure (callable): The integration method to configure a service, for traversal or execution.
+            configured (Set[Tuple[str, int]]): The services already configured, updated in place.
+        """
+        for service_type in ['run_log_store', 'catalog_handler', 'secrets_handler']:
+            service = getattr(self, service_type)
+            key = (service_type, id(service))
+            if key in configured:
+                continue
 
-        integration.validate(self, self.catalog_handler)
-        integration.configure_for_execution(self, self.catalog_handler)
+            integration.validate(self, service)
+            configure(self, service)
+            configured.add(key)
 
-        integration.validate(self, self.secrets_handler)
-        integration.configure_for_execution(self, self.secrets_handler)
+    def _invalidate_integration_cache(self):
+        """
+        Forget the services already configured, so that they are validated and configured again.
+        """
+        self._configured_for_traversal = set()
+        self._configured_for_execution = set()
 
     def _sync_catalog(self, node: BaseNode, step_log: StepLog, stage: str, synced_catalogs=None):
         """
@@ -230,19 +477,17 @@ class BaseExecutor:
         if 'compute_data_folder' in node_catalog_settings and node_catalog_settings['compute_data_folder']:
             compute_data_folder = node_catalog_settings['compute_data_folder']
 
-        data_catalogs = []
-        for name_pattern in node_catalog_settings.get(stage) or []:  #  Assumes a list
-            data_catalogs = getattr(
-                self.catalog_handler, stage)(
-                name=name_pattern, run_id=self.run_id, compute_data_folder=compute_data_folder,
-                synced_catalogs=synced_catalogs)
+        data_catalogs = getattr(
+            self.catalog_handler, f'{stage}_many')(
+            names=node_catalog_settings.get(stage) or [],  # Assumes a list
+            run_id=self.run_id, compute_data_folder=compute_data_folder, synced_catalogs=synced_catalogs)
 
         if data_catalogs:
             step_log.add_data_catalogs(data_catalogs)
 
         return data_catalogs
 
-    def _execute_node(self, node: BaseNode, map_variable: dict = None, **kwargs):
+    def _execute_node(self, node: BaseNode, map_variable: dict = None, step_log: StepLog = None, **kwargs):
         """
         This is the entry point when we do the actual execution of the function.
         DO NOT Over-ride this function.
@@ -256,18 +501,26 @@ class BaseExecutor:
             * If the node succeeds, we get any of the user defined metrics provided by the user.
             * We sync the catalog to PUT any data sets that are in the catalog.
 
+        The step log is updated in place and written to the run log store once, at the end of the execution.
+
         Args:
             node (Node): The node to execute
             map_variable (dict, optional): If the node is of a map state, map_variable is the value of the iterable.
                         Defaults to None.
+            step_log (StepLog, optional): The step log of the node, if the caller has it at hand.
+                        Defaults to None, in which case it is read from the run log store.
+
+        Returns:
+            StepLog: The step log of the node after the execution.
 
         #TODO: The attempts should ideally by handled outside of this function
         """
         max_attempts = node._get_max_attempts()
         attempts = 0
-        step_log = self.run_log_store.get_step_log(node._get_step_log_name(map_variable), self.run_id)
+        if step_log is None:
+            step_log = self.run_log_store.get_step_log(node._get_step_log_name(map_variable), self.run_id)
 
-        parameters = self.run_log_store.get_parameters(run_id=self.run_id)
+        parameters = self._get_parameters()
         # Set up environment variables for the execution
         # If the key already exists, do not update it to give priority to parameters set by environment variables
         interaction.store_parameter(update=False, **parameters)
@@ -277,34 +530,39 @@ class BaseExecutor:
         mock = step_log.mock
         logger.info(f'Trying to execute node: {node.internal_name}, attempt : {attempts}, max_attempts: {max_attempts}')
         while attempts < max_attempts:
+            attempt_log = None
             try:
                 self.context_step_log = step_log
                 attempt_log = node.execute(executor=self, mock=mock,
                                            map_variable=map_variable, **kwargs)
-                attempt_log.attempt_number = attempts
-                step_log.attempts.append(attempt_log)
-                if attempt_log.status == defaults.FAIL:
-                    raise Exception()
-
-                step_log.status = defaults.SUCCESS
-                step_log.user_defined_metrics = utils.get_tracked_data()
-                self.run_log_store.set_parameters(self.run_id, utils.get_user_set_parameters(remove=True))
-                break
             except Exception as _e:  # pylint: disable=W0703
-                attempts += 1
                 logger.exception(f'Node: {node} failed with exception {_e}')
-                # Remove any steps data
-                utils.get_tracked_data()
-                utils.get_user_set_parameters(remove=True)
             finally:
                 self.context_step_log = None  # type: ignore
 
+            if attempt_log is not None:
+                attempt_log.attempt_number = attempts
+                step_log.attempts.append(attempt_log)
+
+                if attempt_log.status != defaults.FAIL:
+                    step_log.status = defaults.SUCCESS
+                    step_log.user_defined_metrics = utils.get_tracked_data()
+                    self._set_parameters(utils.get_user_set_parameters(remove=True))
+                    break
+
+                logger.error(f'Node: {node} failed in the attempt: {attempts}')
+
+            attempts += 1
+            # Remove any steps data
+            utils.reset_tracked_state()
+
             if attempts == max_attempts:
                 step_log.status = defaults.FAIL
                 logger.error(f'Node {node} failed, max retries of {max_attempts} reached')
 
         self._sync_catalog(node, step_log, stage='put', synced_catalogs=data_catalogs_get)
         self.run_log_store.add_step_log(step_log, self.run_id)
+        return step_log
 
     def execute_node(self, node: BaseNode, map_variable: dict = None, **kwargs):
         raise NotImplementedError
@@ -314,12 +572,16 @@ class BaseExecutor:
         Add code identities specific to the implementation.
 
         The Base class has an implementation of adding git code identities.
+        The git code identity does not change during the run and is computed only once.
 
         Args:
             step_log (object): The step log object
             node (BaseNode): The node we are adding the step log for
         """
-        step_log.code_identities.append(utils.get_git_code_identity(self.run_log_store))
+        if self._git_code_identity is None:
+            self._git_code_identity = utils.get_git_code_identity(self.run_log_store)
+
+        step_log.code_identities.append(self._git_code_identity)
 
     def execute_from_graph(self, node: BaseNode, map_variable: dict = None, **kwargs):
         """
@@ -344,6 +606,9 @@ class BaseExecutor:
             node (Node): The node to execute
             map_variable (dict, optional): If the node if of a map state, this corresponds to the value of iterable.
                     Defaults to None.
+
+        Returns:
+            StepLog: The step log of the node, if known without reading it back from the run log store.
         """
         step_log = self.run_log_store.create_step_log(node.name, node._get_step_log_name(map_variable))
 
@@ -355,9 +620,9 @@ class BaseExecutor:
         # Add the step log to the database as per the situation.
         # If its a terminal node, complete it now
         if node.node_type in ['success', 'fail']:
+            self._flush_skipped_step_logs()
             self.run_log_store.add_step_log(step_log, self.run_id)
-            self._execute_node(node, map_variable=map_variable, **kwargs)
-            return
+            return self._execute_node(node, map_variable=map_variable, step_log=step_log, **kwargs)
 
         # In single step
         if self.single_step:
@@ -366,29 +631,33 @@ class BaseExecutor:
                 step_log.mock = True
                 step_log.status = defaults.SUCCESS
                 self.run_log_store.add_step_log(step_log, self.run_id)
-                return
+                return step_log
         else:  # We are not in single step mode
             # If previous run was successful, move on to the next step
             if not self._is_eligible_for_rerun(node, map_variable=map_variable):
                 step_log.mock = True
                 step_log.status = defaults.SUCCESS
-                self.run_log_store.add_step_log(step_log, self.run_id)
-                return
+                step_log.message = 'Node execution successful in previous run, skipping it'
+                # The skipped step logs are added to the run log store together
+                self._pending_skip_logs.append(step_log)
+                return step_log
 
+        self._flush_skipped_step_logs()
         # We call an internal function to iterate the sub graphs and execute them
         if node.is_composite:
             self.run_log_store.add_step_log(step_log, self.run_id)
-            node.execute_as_graph(self, map_variable=map_variable, **kwargs)
-            return
+            return node.execute_as_graph(self, map_variable=map_variable, **kwargs)
 
         # Executor specific way to trigger a job
         self.run_log_store.add_step_log(step_log, self.run_id)
-        self.trigger_job(node=node, map_variable=map_variable, **kwargs)
+        return self.trigger_job(node=node, map_variable=map_variable, **kwargs)
 
     def trigger_job(self, node: BaseNode, map_variable: dict = None, **kwargs):
         """
         Executor specific way of triggering jobs.
 
+        Implementations could return the step log of the node, if available, to avoid reading it again.
+
         Args:
             node (BaseNode): The node to execute
             map_variable (str, optional): If the node if of a map state, this corresponds to the value of iterable.
@@ -398,7 +667,8 @@ class BaseExecutor:
         """
         raise NotImplementedError
 
-    def _get_status_and_next_node_name(self, current_node: BaseNode, dag: Graph, map_variable: dict = None):
+    def _get_status_and_next_node_name(self, current_node: BaseNode, dag: Graph, map_variable: dict = None,
+                                       step_log: StepLog = None):
         """
         Given the current node and the graph, returns the name of the next node to execute.
 
@@ -411,9 +681,10 @@ class BaseExecutor:
             current_node (BaseNode): The current node.
             dag (Graph): The dag we are traversing.
             map_variable (dict): If the node belongs to a map branch.
+            step_log (StepLog): The step log of the current node, read from the run log store if not provided.
         """
-
-        step_log = self.run_log_store.get_step_log(current_node._get_step_log_name(map_variable), self.run_id)
+        if step_log is None:
+            step_log = self.run_log_store.get_step_log(current_node._get_step_log_name(map_variable), self.run_id)
         logger.info(
             f'Finished executing the node {current_node} with status {step_log.status}')
 
@@ -441,31 +712,45 @@ class BaseExecutor:
                     Defaults to None.
         """
         current_node = dag.start_at
-        previous_node = None
+        visited = set()
+        self._invalidate_parameters_cache()
         logger.info(f'Running the execution with {current_node}')
-        while True:
-            working_on = dag.get_node_by_name(current_node)
+        try:
+            while True:
+                working_on = dag.get_node_by_name(current_node)
 
-            if previous_node == current_node:
-                raise Exception('Potentially running in a infinite loop')
+                if current_node in visited:
+                    raise Exception(f'Potentially running in a infinite loop, {current_node} is visited again')
 
-            previous_node = current_node
+                visited.add(current_node)
 
-            logger.info(f'Creating execution log for {working_on}')
-            self.execute_from_graph(working_on, map_variable=map_variable, **kwargs)
+                logger.info(f'Creating execution log for {working_on}')
+                step_log = self.execute_from_graph(working_on, map_variable=map_variable, **kwargs)
 
-            status, next_node_name = self._get_status_and_next_node_name(
-                current_node=working_on, dag=dag, map_variable=map_variable)
+                status, next_node_name = self._get_status_and_next_node_name(
+                    current_node=working_on, dag=dag, map_variable=map_variable, step_log=step_log)
 
-            if status == defaults.TRIGGERED:
-                # Some nodes go into triggered state and self traverse
-                logger.info(f'Triggered the job to execute the node {current_node}')
-                break
+                if status == defaults.TRIGGERED:
+                    # Some nodes go into triggered state and self traverse
+                    logger.info(f'Triggered the job to execute the node {current_node}')
+                    break
 
-            if working_on.node_type in ['success', 'fail']:
-                break
+                if working_on.node_type in ['success', 'fail']:
+                    break
+
+                current_node = next_node_name
+        except Exception:
+            # The step logs of the skipped nodes are written even if the traversal failed,
+            # but a failure to write them should not hide the failure of the traversal.
+            try:
+                self._flush_skipped_step_logs()
+                self._flush_run_log()
+            except Exception:  # pylint: disable=W0703
+                logger.exception('Writing the run log after the failed traversal did not succeed')
+            raise
 
-            current_node = next_node_name
+        self._flush_skipped_step_logs()
+        self._flush_run_log()
 
         run_log = self.run_log_store.get_branch_log(working_on._get_branch_log_name(map_variable), self.run_id)
 
@@ -474,7 +759,35 @@ class BaseExecutor:
             branch = working_on.internal_branch_name
 
         logger.info(f'Finished execution of the {branch} with status {run_log.status}')
-        print(json.dumps(run_log.dict(), indent=4))
+        if not working_on.internal_branch_name:
+            print(json.dumps(run_log.dict(), indent=4))
+        elif logger.isEnabledFor(logging.DEBUG):
+            # The branch log is part of the run log shown at the end of the graph, serialize it only if asked for.
+            logger.debug(json.dumps(run_log.dict(), indent=4))
+
+    @property
+    def _previous_step_index(self) -> Dict[str, StepLog]:
+        """
+        An index of all the step logs, including the ones in branches, of the previous run log by their internal name.
+
+        The index is built once on the first access and is empty if there is no previous run log.
+
+        Returns:
+            dict: The step logs of the previous run keyed by the internal name.
+        """
+        if self.previous_run_log is None:
+            return {}
+
+        if self._previous_step_logs is None:
+            self._previous_step_logs = {}
+            step_logs = list(self.previous_run_log.steps.values())
+            while step_logs:
+                step_log = step_logs.pop()
+                self._previous_step_logs[step_log.internal_name] = step_log
+                for branch_log in step_log.branches.values():
+                    step_logs.extend(branch_log.steps.values())
+
+        return self._previous_step_logs
 
     def _is_eligible_for_rerun(self, node: BaseNode, map_variable: dict = None):
         """
@@ -498,26 +811,21 @@ class BaseExecutor:
             node_step_log_name = node._get_step_log_name(map_variable=map_variable)
             logger.info(f'Scanning previous run logs for node logs of: {node_step_log_name}')
 
-            previous_node_log = None
-            try:
-                previous_node_log, _ = self.previous_run_log.search_step_by_internal_name(node_step_log_name)
-            except exceptions.StepLogNotFoundError:
+            previous_node_log = self._previous_step_index.get(node_step_log_name, None)
+            if previous_node_log is None:
                 logger.warning(f'Did not find the node {node.name} in previous run log')
                 return True  # We should re-run the node.
 
-            step_log = self.run_log_store.get_step_log(node._get_step_log_name(map_variable), self.run_id)
             logger.info(f'The original step status: {previous_node_log.status}')
 
             if previous_node_log.status == defaults.SUCCESS:
                 logger.info(f'The step {node.name} is marked success, not executing it')
-                step_log.status = defaults.SUCCESS
-                step_log.message = 'Node execution successful in previous run, skipping it'
-                self.run_log_store.add_step_log(step_log, self.run_id)
                 return False  # We need not run the node
 
             #  Remove previous run log to start execution from this step
             logger.info(f'The new execution should start executing graph from this node {node.name}')
             self.previous_run_log = None
+            self._previous_step_logs = None
         return True
 
     def send_return_code(self, stage='traversal'):
@@ -528,9 +836,10 @@ class BaseExecutor:
             Exception: If the pipeline execution failed
         """
         run_id = self.run_id
+        self._shutdown_process_pool()
+        self._flush_run_log()
 
-        run_log = self.run_log_store.get_run_log_by_id(run_id=run_id, full=False)
-        if run_log.status == defaults.FAIL:
+        if self.run_log_store.get_run_status(run_id=run_id) == defaults.FAIL:
             raise Exception('Pipeline execution failed')
 
     def _resolve_node_config(self, node: BaseNode):
@@ -599,6 +908,7 @@ class LocalExecutor(BaseExecutor):
       type: local
       config:
         enable_parallel: True or False to enable parallel.
+        batch_log_writes: True or False to coalesce the writes to the run log store.
 
     """
     service_name = 'local'
@@ -612,10 +922,10 @@ class LocalExecutor(BaseExecutor):
             map_variable (str, optional): [description]. Defaults to ''.
         """
         self.prepare_for_node_execution()
-        self.execute_node(node=node, map_variable=map_variable, **kwargs)
+        return self.execute_node(node=node, map_variable=map_variable, **kwargs)
 
     def execute_node(self, node: BaseNode, map_variable: dict = None, **kwargs):
-        self._execute_node(node=node, map_variable=map_variable, **kwargs)
+        return self._execute_node(node=node, map_variable=map_variable, **kwargs)
 
 
 class LocalContainerExecutor(BaseExecutor):
@@ -649,11 +959,13 @@ class LocalContainerExecutor(BaseExecutor):
       type: local-container
       config:
         docker_image: The default docker image to use if the node does not provide one.
+        reuse_container: True to execute the nodes sharing an image in one long running container, defaults to False.
     """
     service_name = 'local-container'
 
     class Config(BaseExecutor.Config):
         docker_image: str
+        reuse_container: bool = False
 
     def __init__(self, config):
         # pylint: disable=R0914,R0913
@@ -662,28 +974,62 @@ class LocalContainerExecutor(BaseExecutor):
         self.container_catalog_location = '/tmp/catalog/'
         self.container_secrets_location = '/tmp/dotenv'
         self.volumes = {}
+        self._docker_image_ids: Dict[str, str] = {}
+        self._exec_containers = {}  # The long running containers by the docker image, if reuse_container
 
     @ property
     def docker_image(self):
         return self.config.docker_image
 
+    @property
+    def reuse_container(self):
+        return self.config.reuse_container
+
+    def _resolve_docker_image(self, node: BaseNode):
+        """
+        Resolve the docker image of the node, as _resolve_node_config would, without copying the whole config.
+
+        Args:
+            node (BaseNode): The current node being processed.
+
+        Returns:
+            str: The docker image to run the node in
+        """
+        docker_image = self.docker_image
+        placeholders = self.config.placeholders
+
+        for key, value in node._get_mode_config(self.service_name).items():
+            if not value and key in placeholders:
+                if isinstance(placeholders[key], dict):
+                    docker_image = placeholders[key].get('docker_image', docker_image)
+                continue
+
+            if key == 'docker_image':
+                docker_image = value
+
+        return docker_image
+
     def add_code_identities(self, node: BaseNode, step_log: StepLog, **kwargs):
         """
         Call the Base class to add the git code identity and add docker identity
 
+        The id of a docker image is looked up only once during the run.
+
         Args:
             node (BaseNode): The node we are adding the code identity
             step_log (Object): The step log corresponding to the node
         """
 
         super().add_code_identities(node, step_log)
-        mode_config = self._resolve_node_config(node)
 
-        docker_image = mode_config.get('docker_image', None)
+        docker_image = self._resolve_docker_image(node)
         if docker_image:
             code_id = self.run_log_store.create_code_identity()
 
-            code_id.code_identifier = utils.get_local_docker_image_id(docker_image)
+            if docker_image not in self._docker_image_ids:
+                self._docker_image_ids[docker_image] = utils.get_local_docker_image_id(docker_image)
+
+            code_id.code_identifier = self._docker_image_ids[docker_image]
             code_id.code_identifier_type = 'docker'
             code_id.code_identifier_dependable = True
             code_id.code_identifier_url = 'local docker host'
@@ -709,10 +1055,13 @@ class LocalContainerExecutor(BaseExecutor):
             integration.validate(self, self.catalog_handler)
             integration.validate(self, self.secrets_handler)
 
-            self.execute_node(node=node, map_variable=map_variable, **kwargs)
-            return
+            return self.execute_node(node=node, map_variable=map_variable, **kwargs)
 
+        # The container writes to the run log, it should see all the changes so far
+        self._flush_run_log()
         self._spin_container(node, map_variable=map_variable, **kwargs)
+        # The container could have changed the parameters
+        self._invalidate_parameters_cache()
 
         # Check for the status of the node log and anything apart from Success is FAIL
         # This typically happens if something is wrong with magnus or settings.
@@ -727,20 +1076,74 @@ class LocalContainerExecutor(BaseExecutor):
             step_log.status = defaults.FAIL
             self.run_log_store.add_step_log(step_log, self.run_id)
 
-    def _spin_container(self, node, map_variable: dict = None, **kwargs):  # pylint: disable=unused-argument
+        return step_log
+
+    @cached_property
+    def _docker_client(self):
         """
-        During the flow run, we have to spin up a container with the docker image mentioned
-        and the right log locations
+        The docker client, created once and shared by all the nodes of the run.
         """
         # Conditional import
         import docker  # pylint: disable=C0415
 
         try:
-            client = docker.from_env()
+            return docker.from_env()
         except Exception as ex:
             logger.exception('Could not get access to docker')
             raise Exception('Could not get the docker socket file, do you have docker installed?') from ex
 
+    def _get_exec_container(self, docker_image: str):
+        """
+        Return a long running container of the docker image to execute the nodes in, starting one if not present.
+
+        Args:
+            docker_image (str): The docker image of the container
+        """
+        if docker_image not in self._exec_containers:
+            if not self._exec_containers:
+                # Do not leave the containers running if the run is aborted
+                atexit.register(self._stop_exec_containers)
+
+            logger.info(f'Starting a long running container of {docker_image}')
+            # The entrypoint of the image is over-ridden to keep the container idle for the nodes to exec in
+            self._exec_containers[docker_image] = self._docker_client.containers.run(image=docker_image,
+                                                                                     entrypoint=['sleep', 'infinity'],
+                                                                                     detach=True,
+                                                                                     auto_remove=True,
+                                                                                     volumes=self.volumes,
+                                                                                     network_mode='host')
+        return self._exec_containers[docker_image]
+
+    def _stop_exec_containers(self):
+        """
+        Stop all the long running containers started during the run.
+        """
+        for docker_image, container in self._exec_containers.items():
+            logger.info(f'Stopping the long running container of {docker_image}')
+            try:
+                container.stop()
+            except Exception:  # pylint: disable=W0703
+                logger.exception(f'Could not stop the container of {docker_image}')
+
+        self._exec_containers = {}
+
+    def send_return_code(self, stage='traversal'):
+        """
+        Stop any long running containers and send the return code to the caller of the cli
+
+        Raises:
+            Exception: If the pipeline execution failed
+        """
+        self._stop_exec_containers()
+        super().send_return_code(stage=stage)
+
+    def _spin_container(self, node, map_variable: dict = None, **kwargs):  # pylint: disable=unused-argument
+        """
+        During the flow run, we have to spin up a container with the docker image mentioned
+        and the right log locations.
+
+        If reuse_container, the node is executed in the long running container of the docker image instead.
+        """
         try:
             action = utils.get_node_execution_command(self, node, map_variable=map_variable)
             logger.info(f'Running the command {action}')
@@ -753,23 +1156,24 @@ class LocalContainerExecutor(BaseExecutor):
                 raise Exception(
                     f'Please provide a docker_image using mode_config of the step {node.name} or at global mode')
 
-            # TODO: Should consider using getpass.getuser() when running the docker container? Volume permissions
-            container = client.containers.create(image=docker_image,
-                                                 command=action,
-                                                 auto_remove=True,
-                                                 volumes=self.volumes,
-                                                 network_mode='host',
-                                                 environment=environment)
-            container.start()
-            stream = container.logs(stream=True, follow=True)
-            while True:
-                try:
-                    output = next(stream).decode("utf-8")
-                    output = output.strip('\r\n')
-                    logger.info(output)
-                except StopIteration:
-                    logger.info('Docker Run completed')
-                    break
+            if self.reuse_container:
+                container = self._get_exec_container(docker_image)
+                _, stream = container.exec_run(action, stream=True, environment=environment)
+            else:
+                # TODO: Should consider using getpass.getuser() when running the docker container? Volume permissions
+                container = self._docker_client.containers.create(image=docker_image,
+                                                                  command=action,
+                                                                  auto_remove=True,
+                                                                  volumes=self.volumes,
+                                                                  network_mode='host',
+                                                                  environment=environment)
+                container.start()
+                stream = self._docker_client.api.logs(container.id, stream=True, follow=True,
+                                                      stdout=True, stderr=True)
+
+            for output in stream:
+                logger.info(output.decode('utf-8').strip('\r\n'))
+            logger.info('Docker Run completed')
 
         except Exception as _e:
             logger.exception('Problems with spinning up the container')
@@ -802,14 +1206,15 @@ class DemoRenderer(BaseExecutor):
 
         step_log.step_type = node.node_type
         step_log.status = defaults.PROCESSING
+        # The step log is built in memory and written once before the execution
         self.run_log_store.add_step_log(step_log, self.run_id)
 
-        super()._execute_node(node, map_variable=map_variable, **kwargs)
-
-        step_log = self.run_log_store.get_step_log(node._get_step_log_name(map_variable), self.run_id)
+        step_log = super()._execute_node(node, map_variable=map_variable, step_log=step_log, **kwargs)
         if step_log.status == defaults.FAIL:
             raise Exception(f'Step {node.name} failed')
 
+        return step_log
+
     def trigger_job(self, node: BaseNode, map_variable: dict = None, **kwargs):
         """
         Executor specific way of triggering jobs.
@@ -832,11 +1237,11 @@ class DemoRenderer(BaseExecutor):
         Raises:
             Exception: If the pipeline execution failed
         """
+        self._flush_run_log()
         if stage != 'traversal':  # traversal does no actual execution, so return code is pointless
             run_id = self.run_id
 
-            run_log = self.run_log_store.get_run_log_by_id(run_id=run_id, full=False)
-            if run_log.status == defaults.FAIL:
+            if self.run_log_store.get_run_status(run_id=run_id) == defaults.FAIL:
                 raise Exception('Pipeline execution failed')
 
     def execute_graph(self, dag: Graph, map_variable: dict = None, **kwargs):
@@ -849,45 +1254,40 @@ class DemoRenderer(BaseExecutor):
 
         """
         current_node = dag.start_at
-        previous_node = None
+        visited = set()
         logger.info(f'Rendering job started at {current_node}')
         bash_script_lines = []
 
+        # The fail node of the graph and hence the check after every step is the same for every step
+        fail_node_command = utils.get_node_execution_command(self, dag.get_fail_node(), over_write_run_id='$1')
+        fail_check = _DEMO_FAIL_CHECK_TEMPLATE.substitute(fail_command=fail_node_command)
+
         while True:
             working_on = dag.get_node_by_name(current_node)
 
             if working_on.is_composite:
                 raise NotImplementedError('In this demo version, composite nodes are not implemented')
 
-            if previous_node == current_node:
-                raise Exception('Potentially running in a infinite loop')
+            if current_node in visited:
+                raise Exception(f'Potentially running in a infinite loop, {current_node} is visited again')
 
-            previous_node = current_node
+            visited.add(current_node)
 
             logger.info(f'Creating execution log for {working_on}')
 
             _execute_node_command = utils.get_node_execution_command(self, working_on, over_write_run_id='$1')
-            current_job_id = re.sub('[^A-Za-z0-9]+', '', f'{current_node}_job_id')
-            fail_node_command = utils.get_node_execution_command(self, dag.get_fail_node(), over_write_run_id='$1')
+            current_job_id = _JOB_ID_INVALID_CHARACTERS.sub('', f'{current_node}_job_id')
 
             if working_on.node_type not in ['success', 'fail']:
+                command = f'{_execute_node_command}\n'
                 if working_on.node_type == 'as-is':
                     command_config = working_on.config.get('command_config', {})
+                    command = ''
                     if 'render_string' in command_config:
-                        bash_script_lines.append(command_config['render_string'] + '\n')
-                else:
-                    bash_script_lines.append(f'{_execute_node_command}\n')
-
-                bash_script_lines.append('exit_code=$?\necho $exit_code\n')
-                # Write failure node
-                bash_script_lines.append(
-                    (
-                        'if [ $exit_code -ne 0 ];\nthen\n'
-                        f'\t $({fail_node_command})\n'
-                        '\texit 1\n'
-                        'fi\n'
-                    )
-                )
+                        command = command_config['render_string'] + '\n'
+
+                bash_script_lines.append(command)
+                bash_script_lines.append(fail_check)
 
             if working_on.node_type == 'success':
                 bash_script_lines.append(f'{_execute_node_command}')
@@ -897,7 +1297,7 @@ class DemoRenderer(BaseExecutor):
             current_node = working_on._get_next_node()
 
         with open('demo-bash.sh', 'w', encoding='utf-8') as fw:
-            fw.writelines(bash_script_lines)
+            fw.write(''.join(bash_script_lines))
 
         msg = (
             'demo-bash.sh for running the pipeline is written. To execute it \n'
@@ -1,9 +1,7 @@
 import logging
 from typing import TYPE_CHECKING, Dict, List
 
-from stevedore import driver
-
-from magnus import defaults, exceptions
+from magnus import defaults, exceptions, utils
 
 if TYPE_CHECKING:
     from magnus.nodes import BaseNode
@@ -26,7 +24,19 @@ class Graph:
         self.description = description
         self.max_time = max_time
         self.internal_branch_name = internal_branch_name
-        self.nodes: List[BaseNode] = []
+        self._nodes: List[BaseNode] = []
+        self._nodes_by_name: Dict[str, BaseNode] = {}
+        self._nodes_by_internal_name: Dict[str, BaseNode] = {}
+
+    @property
+    def nodes(self) -> List['BaseNode']:
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, nodes: List['BaseNode']):
+        self._nodes = nodes
+        self._nodes_by_name = {}
+        self._nodes_by_internal_name = {}
 
     def _to_dict(self) -> dict:
         """
@@ -57,9 +67,14 @@ class Graph:
         Returns:
             Node: The Node object by name
         """
-        for node in self.nodes:
-            if node.name == name:
-                return node
+        if name not in self._nodes_by_name:
+            # Nodes could be added to the list of nodes directly, so the index is refreshed on a miss
+            self._nodes_by_name = {}
+            for node in self.nodes:
+                self._nodes_by_name.setdefault(node.name, node)
+
+        if name in self._nodes_by_name:
+            return self._nodes_by_name[name]
         raise exceptions.NodeNotFoundError(name)
 
     def get_node_by_internal_name(self, internal_name: str) -> 'BaseNode':
@@ -77,9 +92,14 @@ class Graph:
         Returns:
             Node: The Node object by the name
         """
-        for node in self.nodes:
-            if node.internal_name == internal_name:
-                return node
+        if internal_name not in self._nodes_by_internal_name:
+            # Nodes could be added to the list of nodes directly, so the index is refreshed on a miss
+            self._nodes_by_internal_name = {}
+            for node in self.nodes:
+                self._nodes_by_internal_name.setdefault(node.internal_name, node)
+
+        if internal_name in self._nodes_by_internal_name:
+            return self._nodes_by_internal_name[internal_name]
         raise exceptions.NodeNotFoundError(internal_name)
 
     def __str__(self):  # pragma: no cover
@@ -258,12 +278,37 @@ class Graph:
         recstack[node.name] = False
         return False
 
-    def missing_neighbors(self) -> List['BaseNode']:
+    def compute_priorities(self) -> Dict[str, int]:
+        """
+        Compute the bottom level of every node of the graph.
+
+        The bottom level of a node is the number of nodes in the longest path from the node to a terminal node,
+        including the node itself. The bottom level of the start node is the length of the critical path of the graph.
+
+        The graph is expected to be a valid DAG.
+
+        Returns:
+            dict: The bottom level of the nodes by their name.
+        """
+        bottom_levels: Dict[str, int] = {}
+
+        def _bottom_level(node: 'BaseNode') -> int:
+            if node.name not in bottom_levels:
+                neighbors = [self.get_node_by_name(neighbor) for neighbor in node._get_neighbors()]
+                bottom_levels[node.name] = 1 + max((_bottom_level(neighbor) for neighbor in neighbors), default=0)
+            return bottom_levels[node.name]
+
+        for node in self.nodes:
+            _bottom_level(node)
+
+        return bottom_levels
+
+    def missing_neighbors(self) -> List[str]:
         """
         Iterates through nodes and gets their connecting neighbors and checks if they exist in the graph.
 
         Returns:
-            list: List of the missing nodes. Empty list if all neighbors are in the graph.
+            list: The names of the missing nodes. Empty list if all neighbors are in the graph.
         """
         missing_nodes = []
         for node in self.nodes:
@@ -350,14 +395,9 @@ def create_node(name: str, step_config: dict, internal_branch_name: str = None):
         internal_name = internal_branch_name + '.' + name
 
     try:
-        node_mgr = driver.DriverManager(
-            namespace="magnus.nodes.BaseNode",
-            name=step_config['type'],
-            invoke_on_load=True,
-            invoke_kwds={"name": name, "internal_name": internal_name,
-                         "config": step_config, "internal_branch_name": internal_branch_name}
-        )
-        return node_mgr.driver
+        node_class = utils.get_plugin_class("magnus.nodes.BaseNode", step_config['type'])
+        return node_class(name=name, internal_name=internal_name, config=step_config,
+                          internal_branch_name=internal_branch_name)
     except Exception as _e:
         msg = (
             f"Could not find the node type {step_config['type']}. Please ensure you have installed "
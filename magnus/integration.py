@@ -181,15 +181,7 @@ class LocalComputeFileSystemRunLogStore(BaseIntegration):
     service_type = 'run_log_store'  # One of secret, catalog, datastore
     service_provider = 'file-system'  # The actual implementation of the service
 
-    def validate(self, **kwargs):
-        if self.executor._is_parallel_execution():
-            msg = (
-                'Run log generated by file-system run log store are not thread safe. '
-                'Inconsistent results are possible because of race conditions to write to the same file.\n'
-                'Consider using partitioned run log store like database for consistent results.'
-
-            )
-            logger.warning(msg)
+    # The file-system run log store locks the run log, the parallel branches of local compute can share it
 
 
 class LocalContainerComputeBufferedRunLogStore(BaseIntegration):
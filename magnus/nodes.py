@@ -1,17 +1,16 @@
-import json
 import logging
-import multiprocessing
 from collections import OrderedDict
 from datetime import datetime
-from typing import List, Optional, Union
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 from pydantic import BaseModel, Extra
-from stevedore import driver
 
-import magnus
 from magnus import defaults, utils
 from magnus.graph import create_graph
 
+if TYPE_CHECKING:
+    from magnus.datastore import StepAttempt, StepLog
+
 logger = logging.getLogger(defaults.NAME)
 
 
@@ -55,6 +54,7 @@ class BaseNode:
         self.config = self.Config(**config)
         self.internal_branch_name = internal_branch_name  # parallel, map, dag only have internal names
         self.is_composite = False
+        self._resolved_names: OrderedDict[Tuple[str, tuple], str] = OrderedDict()
 
     def validate(self):
         messages = []
@@ -64,13 +64,14 @@ class BaseNode:
         if '%' in self.name:
             messages.append("Node names cannot have '%' in them")
 
+        config_fields = self.config.dict()
         for req in self.required_fields:
-            if not req in self.config.dict():
+            if not req in config_fields:
                 messages.append(f'{self.name} should have {req} field')
                 continue
 
         for err in self.errors_on:
-            if err in self.config.dict():
+            if err in config_fields:
                 messages.append(f'{self.name} should not have {err} field')
         return messages
 
@@ -146,13 +147,46 @@ class BaseNode:
         Returns:
             [str]: The resolved name
         """
+        if not map_variable or defaults.MAP_PLACEHOLDER not in name:
+            return name
+
+        # Split once and interleave the values, rather than scanning the name for every map variable
+        values = list(map_variable.values())
+        parts = name.split(defaults.MAP_PLACEHOLDER, len(values))
+        resolved = [parts[0]]
+        for value, part in zip(values, parts[1:]):
+            resolved += [value, part]
+
+        return ''.join(resolved)
+
+    def _resolve_log_name(self, name: str, map_variable: dict = None) -> str:
+        """
+        Resolve the map placeholders of a step or branch log name, remembering the names already resolved.
+
+        The names are asked for several times during the execution of a node for the same map variable.
+        Only the most recently resolved names are remembered, as the map variables of a large map are not asked again
+        once their branch is executed.
+
+        Args:
+            name (str): The name to resolve
+            map_variable (dict): The dictionary of map variables
+
+        Returns:
+            str: The resolved name
+        """
         if not map_variable:
             return name
 
-        for _, value in map_variable.items():
-            name = name.replace(defaults.MAP_PLACEHOLDER, value, 1)
+        # The placeholders are replaced in the order of the map variables, so is the key.
+        key = (name, tuple(map_variable.items()))
+        if key in self._resolved_names:
+            self._resolved_names.move_to_end(key)
+            return self._resolved_names[key]
 
-        return name
+        self._resolved_names[key] = self._resolve_map_placeholders(name, map_variable=map_variable)
+        if len(self._resolved_names) > defaults.MAX_RESOLVED_LOG_NAMES:
+            self._resolved_names.popitem(last=False)
+        return self._resolved_names[key]
 
     def _get_step_log_name(self, map_variable: dict = None) -> str:
         """
@@ -169,7 +203,7 @@ class BaseNode:
         Returns:
             str: The dot path name of the step log name
         """
-        return self._resolve_map_placeholders(self.internal_name, map_variable=map_variable)
+        return self._resolve_log_name(self.internal_name, map_variable=map_variable)
 
     def _get_branch_log_name(self, map_variable: dict = None) -> str:
         """
@@ -186,7 +220,7 @@ class BaseNode:
         Returns:
             str: The dot path name of the branch log
         """
-        return self._resolve_map_placeholders(self.internal_branch_name, map_variable=map_variable)
+        return self._resolve_log_name(self.internal_branch_name, map_variable=map_variable)
 
     def __str__(self):  # pragma: no cover
         return f'Node of type {self.node_type} and name {self.internal_name}'
@@ -243,23 +277,14 @@ class BaseNode:
 
         return False
 
-    def _get_neighbors(self) -> List:
+    def _get_neighbors(self) -> Tuple[str, ...]:
         """
         Gets the connecting neighbor nodes, either the "next" node or "on_failure" node.
 
         Returns:
-            list: List of connected neighbors for a given node. Empty if terminal node.
+            tuple: The connected neighbors for a given node. Empty if terminal node.
         """
-        neighbors = []
-        next_node = self._get_next_node()
-        if next_node:
-            neighbors += [next_node]
-
-        fail_node = self._get_on_failure_node()
-        if fail_node:
-            neighbors += [fail_node]
-
-        return neighbors
+        return tuple(neighbor for neighbor in (self._get_next_node(), self._get_on_failure_node()) if neighbor)
 
     def _get_next_node(self) -> Union[str, None]:
         """
@@ -296,6 +321,59 @@ class BaseNode:
         """
         return self.config.retry
 
+    def _run_attempt(self, executor, action: Callable[[], None], ignore_errors: bool = False) -> 'StepAttempt':
+        """
+        Run the action of the node as an attempt and return the attempt log with its timing and status.
+
+        The attempt fails if the action raises an exception, unless ignore_errors is set. Nodes like success and
+        fail are dummy nodes whose attempts always succeed.
+
+        Args:
+            executor (BaseExecutor): The executor class
+            action (Callable[[], None]): The work of the node
+            ignore_errors (bool, optional): Mark the attempt as success even if the action fails. Defaults to False.
+
+        Returns:
+            StepAttempt: The attempt log of the action
+        """
+        attempt_log = executor.run_log_store.create_attempt_log()
+        errors = BaseException if ignore_errors else Exception
+
+        start_time = datetime.now()
+        attempt_log.start_time = str(start_time)
+        attempt_log.status = defaults.SUCCESS
+        try:
+            action()
+        except errors as _e:  # pylint: disable=W0703
+            logger.exception(f'Execution of the {self.node_type} node {self.internal_name} failed')
+            if not ignore_errors:
+                attempt_log.status = defaults.FAIL
+                attempt_log.message = str(_e)
+        finally:
+            end_time = datetime.now()
+            attempt_log.end_time = str(end_time)
+            attempt_log.duration = str(end_time - start_time)
+        return attempt_log
+
+    def _finalize_step(self, step_log: 'StepLog', branch_statuses: Iterable[str]):
+        """
+        Collate the status of the branches of a composite node into the status of its step log.
+
+        The step fails if any of the branches failed, is processing if any of the branches is still processing
+        and succeeds otherwise.
+
+        Args:
+            step_log (StepLog): The step log of the composite node
+            branch_statuses (Iterable[str]): The status of every branch of the node
+        """
+        branch_statuses = set(branch_statuses)
+        if defaults.FAIL in branch_statuses:
+            step_log.status = defaults.FAIL
+        elif defaults.PROCESSING in branch_statuses:
+            step_log.status = defaults.PROCESSING
+        else:
+            step_log.status = defaults.SUCCESS
+
     def execute(self, executor, mock=False, map_variable: dict = None, **kwargs):
         """
         The actual function that does the execution of the command in the config.
@@ -355,18 +433,13 @@ class TaskNode(BaseNode):
         task_type = self.config.command_type
         logger.info(f"Trying to get a task of type {task_type}")
         try:
-            task_mgr = driver.DriverManager(
-                namespace="magnus.tasks.BaseTaskType",
-                name=task_type,
-                invoke_on_load=False
-            )
+            self.task = utils.get_plugin_class("magnus.tasks.BaseTaskType", task_type)
         except Exception as _e:
             msg = (
                 f"Could not find the task type {task_type}. Please ensure you have installed the extension that"
                 " provides the task type. \nCore supports: python(default), python-lambda, shell, notebook. python-function"
             )
             raise Exception(msg) from _e
-        self.task = task_mgr.driver
 
     def _to_dict(self) -> dict:
         config_dict = dict(self.config.dict())
@@ -377,25 +450,16 @@ class TaskNode(BaseNode):
 
     def execute(self, executor, mock=False, map_variable: dict = None, **kwargs):
         # Here is where the juice is
-        attempt_log = executor.run_log_store.create_attempt_log()
-        try:
-            attempt_log.start_time = str(datetime.now())
-            attempt_log.status = defaults.SUCCESS
-            if not mock:
+        def run_task():
+            if mock:
                 # Do not run if we are mocking the execution, could be useful for caching and dry runs
-                command_config = {'command': self.config.command}
-                command_config.update(self.config.command_config)
-                task = self.task(config=command_config)
-                task.execute_command(map_variable=map_variable)
-        except Exception as _e:  # pylint: disable=W0703
-            logger.exception('Task failed')
-            attempt_log.status = defaults.FAIL
-            attempt_log.message = str(_e)
-        finally:
-            attempt_log.end_time = str(datetime.now())
-            attempt_log.duration = utils.get_duration_between_datetime_strings(
-                attempt_log.start_time, attempt_log.end_time)
-        return attempt_log
+                return
+            command_config = {'command': self.config.command}
+            command_config.update(self.config.command_config)
+            task = self.task(config=command_config)
+            task.execute_command(map_variable=map_variable)
+
+        return self._run_attempt(executor, run_task)
 
     def execute_as_graph(self, executor, map_variable: dict = None, **kwargs):
         """
@@ -434,23 +498,15 @@ class FailNode(BaseNode):
         return {}
 
     def execute(self, executor, mock=False, map_variable: dict = None, **kwargs):
-        attempt_log = executor.run_log_store.create_attempt_log()
-        try:
-            attempt_log.start_time = str(datetime.now())
-            attempt_log.status = defaults.SUCCESS
+        def set_branch_status():
             #  could be a branch or run log
             run_or_branch_log = executor.run_log_store.get_branch_log(
                 self._get_branch_log_name(map_variable), executor.run_id)
             run_or_branch_log.status = defaults.FAIL
             executor.run_log_store.add_branch_log(run_or_branch_log, executor.run_id)
-        except BaseException:  # pylint: disable=W0703
-            logger.exception('Fail node execution failed')
-        finally:
-            attempt_log.status = defaults.SUCCESS  # This is a dummy node, so we ignore errors and mark SUCCESS
-            attempt_log.end_time = str(datetime.now())
-            attempt_log.duration = utils.get_duration_between_datetime_strings(
-                attempt_log.start_time, attempt_log.end_time)
-        return attempt_log
+
+        # This is a dummy node, so we ignore errors and mark SUCCESS
+        return self._run_attempt(executor, set_branch_status, ignore_errors=True)
 
     def execute_as_graph(self, executor, map_variable: dict = None, **kwargs):
         """
@@ -489,23 +545,15 @@ class SuccessNode(BaseNode):
         return {}
 
     def execute(self, executor, mock=False, map_variable: dict = None, **kwargs):
-        attempt_log = executor.run_log_store.create_attempt_log()
-        try:
-            attempt_log.start_time = str(datetime.now())
-            attempt_log.status = defaults.SUCCESS
+        def set_branch_status():
             #  could be a branch or run log
             run_or_branch_log = executor.run_log_store.get_branch_log(
                 self._get_branch_log_name(map_variable), executor.run_id)
             run_or_branch_log.status = defaults.SUCCESS
             executor.run_log_store.add_branch_log(run_or_branch_log, executor.run_id)
-        except BaseException:  # pylint: disable=W0703
-            logger.exception('Success node execution failed')
-        finally:
-            attempt_log.status = defaults.SUCCESS  # This is a dummy node and we make sure we mark it as success
-            attempt_log.end_time = str(datetime.now())
-            attempt_log.duration = utils.get_duration_between_datetime_strings(
-                attempt_log.start_time, attempt_log.end_time)
-        return attempt_log
+
+        # This is a dummy node and we make sure we mark it as success
+        return self._run_attempt(executor, set_branch_status, ignore_errors=True)
 
     def execute_as_graph(self, executor, map_variable: dict = None, **kwargs):
         """
@@ -556,14 +604,14 @@ class ParallelNode(BaseNode):
         Returns:
             dict: A branch_name: dag for every branch mentioned in the branches
         """
+        if not self.config.branches:
+            raise Exception('A parallel node should have branches')
 
         branches = {}
         for branch_name, branch_config in self.config.branches.items():
-            sub_graph = create_graph(branch_config, internal_branch_name=self.internal_name + '.' + branch_name)
-            branches[self.internal_name + '.' + branch_name] = sub_graph
+            internal_branch_name = self.internal_name + '.' + branch_name
+            branches[internal_branch_name] = create_graph(branch_config, internal_branch_name=internal_branch_name)
 
-        if not branches:
-            raise Exception('A parallel node should have branches')
         return branches
 
     def _get_branch_by_name(self, branch_name: str):
@@ -617,64 +665,33 @@ class ParallelNode(BaseNode):
         Args:
             executor (Executor): The Executor as per the use config
             **kwargs: Optional kwargs passed around
+
+        Returns:
+            StepLog: The step log of the node with the status of the branches collated
         """
-        # Prepare the branch logs
-        for internal_branch_name, branch in self.branches.items():
-            effective_branch_name = self._resolve_map_placeholders(internal_branch_name, map_variable=map_variable)
+        effective_branch_names = [self._resolve_map_placeholders(internal_branch_name, map_variable=map_variable)
+                                  for internal_branch_name in self.branches]
 
+        # Prepare the branch logs
+        branch_logs = []
+        for effective_branch_name in effective_branch_names:
             branch_log = executor.run_log_store.create_branch_log(effective_branch_name)
             branch_log.status = defaults.PROCESSING
-            executor.run_log_store.add_branch_log(branch_log, executor.run_id)
-
-        jobs = []
-        # Given that we can have nesting and complex graphs, controlling the number of processes is hard.
-        # A better way is to actually submit the job to some process scheduler which does resource management
-        for internal_branch_name, branch in self.branches.items():
-            if executor._is_parallel_execution():
-                # Trigger parallel jobs
-                action = magnus.pipeline.execute_single_brach
-                kwargs = {
-                    'configuration_file': executor.configuration_file,
-                    'pipeline_file': executor.pipeline_file,
-                    'variables_file': executor.variables_file,
-                    'branch_name': internal_branch_name.replace(' ', defaults.COMMAND_FRIENDLY_CHARACTER),
-                    'run_id': executor.run_id,
-                    'map_variable': json.dumps(map_variable)
-                }
-                process = multiprocessing.Process(target=action, kwargs=kwargs)
-                jobs.append(process)
-                process.start()
-
-            else:
-                # If parallel is not enabled, execute them sequentially
-                executor.execute_graph(branch, map_variable=map_variable, **kwargs)
-
-        for job in jobs:
-            job.join()  # Find status of the branches
-
-        step_success_bool = True
-        waiting = False
-        for internal_branch_name, branch in self.branches.items():
-            effective_branch_name = self._resolve_map_placeholders(internal_branch_name, map_variable=map_variable)
-            branch_log = executor.run_log_store.get_branch_log(effective_branch_name, executor.run_id)
-            if branch_log.status == defaults.FAIL:
-                step_success_bool = False
-
-            if branch_log.status == defaults.PROCESSING:
-                waiting = True
+            branch_logs.append(branch_log)
+        executor.run_log_store.add_branch_logs(branch_logs, executor.run_id)
+
+        executor._execute_branches(
+            [(branch, map_variable) for branch in self.branches.values()], **kwargs)
+
+        branch_logs_by_name = executor.run_log_store.get_branch_logs(effective_branch_names, executor.run_id)
 
         # Collate all the results and update the status of the step
         effective_internal_name = self._resolve_map_placeholders(self.internal_name, map_variable=map_variable)
         step_log = executor.run_log_store.get_step_log(effective_internal_name, executor.run_id)
-        step_log.status = defaults.PROCESSING
-
-        if step_success_bool:  #  If none failed and nothing is waiting
-            if not waiting:
-                step_log.status = defaults.SUCCESS
-        else:
-            step_log.status = defaults.FAIL
+        self._finalize_step(step_log, (branch_log.status for branch_log in branch_logs_by_name.values()))
 
         executor.run_log_store.add_step_log(step_log, executor.run_id)
+        return step_log
 
 
 class MapNode(BaseNode):
@@ -701,6 +718,7 @@ class MapNode(BaseNode):
         iterate_on: str
         iterate_as: str
         on_failure: str = ''
+        max_concurrency: Optional[int] = None
 
     def __init__(self, name, internal_name, config, internal_branch_name=None):
         # pylint: disable=R0914,R0913
@@ -788,6 +806,9 @@ class MapNode(BaseNode):
             executor (Executor): The Executor as per the use config
             map_variable (dict): The map variables the graph belongs to
             **kwargs: Optional kwargs passed around
+
+        Returns:
+            StepLog: The step log of the node with the status of the branches collated
         """
         run_log = executor.run_log_store.get_run_log_by_id(executor.run_id)
         if self.iterate_on not in run_log.parameters:
@@ -798,69 +819,34 @@ class MapNode(BaseNode):
         if not isinstance(iterate_on, list):
             raise Exception('Only list is allowed as a valid iterator type')
 
+        # The iteration values are appended to the resolved name of the step, so resolve the step name once
+        effective_internal_name = self._resolve_map_placeholders(self.internal_name, map_variable=map_variable)
+        effective_branch_names = [effective_internal_name + '.' + str(iter_variable) for iter_variable in iterate_on]
+
         # Prepare the branch logs
-        for iter_variable in iterate_on:
-            effective_branch_name = self._resolve_map_placeholders(
-                self.internal_name + '.' + str(iter_variable),
-                map_variable=map_variable)
+        branch_logs = []
+        for effective_branch_name in effective_branch_names:
             branch_log = executor.run_log_store.create_branch_log(effective_branch_name)
             branch_log.status = defaults.PROCESSING
-            executor.run_log_store.add_branch_log(branch_log, executor.run_id)
+            branch_logs.append(branch_log)
+        executor.run_log_store.add_branch_logs(branch_logs, executor.run_id)
 
-        jobs = []
-        # Given that we can have nesting and complex graphs, controlling the number of processess is hard.
-        # A better way is to actually submit the job to some process scheduler which does resource management
+        branches = []
         for iter_variable in iterate_on:
-            effective_map_variable = map_variable or OrderedDict()
+            effective_map_variable = OrderedDict(map_variable or {})
             effective_map_variable[self.iterate_as] = iter_variable
+            branches.append((self.branch, effective_map_variable))
 
-            if executor._is_parallel_execution():
-                # Trigger parallel jobs
-                action = magnus.pipeline.execute_single_brach
-                kwargs = {
-                    'configuration_file': executor.configuration_file,
-                    'pipeline_file': executor.pipeline_file,
-                    'variables_file': executor.variables_file,
-                    'branch_name': self.branch.internal_branch_name.replace(' ', defaults.COMMAND_FRIENDLY_CHARACTER),
-                    'run_id': executor.run_id,
-                    'map_variable': json.dumps(effective_map_variable)
-                }
-                process = multiprocessing.Process(target=action, kwargs=kwargs)
-                jobs.append(process)
-                process.start()
-
-            else:
-                # If parallel is not enabled, execute them sequentially
-                executor.execute_graph(self.branch, map_variable=effective_map_variable, **kwargs)
-
-        for job in jobs:
-            job.join()
-        # # Find status of the branches
-        step_success_bool = True
-        waiting = False
-        for iter_variable in iterate_on:
-            effective_branch_name = self._resolve_map_placeholders(self.internal_name + '.' + str(iter_variable),
-                                                                   map_variable=map_variable)
-            branch_log = executor.run_log_store.get_branch_log(
-                effective_branch_name, executor.run_id)
-            if branch_log.status == defaults.FAIL:
-                step_success_bool = False
+        executor._execute_branches(branches, max_concurrency=self.config.max_concurrency, **kwargs)
 
-            if branch_log.status == defaults.PROCESSING:
-                waiting = True
+        branch_logs_by_name = executor.run_log_store.get_branch_logs(effective_branch_names, executor.run_id)
 
         # Collate all the results and update the status of the step
-        effective_internal_name = self._resolve_map_placeholders(self.internal_name, map_variable=map_variable)
         step_log = executor.run_log_store.get_step_log(effective_internal_name, executor.run_id)
-        step_log.status = defaults.PROCESSING
-
-        if step_success_bool:  #  If none failed and nothing is waiting
-            if not waiting:
-                step_log.status = defaults.SUCCESS
-        else:
-            step_log.status = defaults.FAIL
+        self._finalize_step(step_log, (branch_log.status for branch_log in branch_logs_by_name.values()))
 
         executor.run_log_store.add_step_log(step_log, executor.run_id)
+        return step_log
 
 
 class DagNode(BaseNode):
@@ -973,10 +959,10 @@ class DagNode(BaseNode):
         Args:
             executor (Executor): The Executor as per the use config
             **kwargs: Optional kwargs passed around
-        """
-        step_success_bool = True
-        waiting = False
 
+        Returns:
+            StepLog: The step log of the node with the status of the branches collated
+        """
         effective_branch_name = self._resolve_map_placeholders(self._internal_branch_name, map_variable=map_variable)
         effective_internal_name = self._resolve_map_placeholders(self.internal_name, map_variable=map_variable)
 
@@ -987,22 +973,11 @@ class DagNode(BaseNode):
         executor.execute_graph(self.branch, map_variable=map_variable, **kwargs)
 
         branch_log = executor.run_log_store.get_branch_log(effective_branch_name, executor.run_id)
-        if branch_log.status == defaults.FAIL:
-            step_success_bool = False
-
-        if branch_log.status == defaults.PROCESSING:
-            waiting = True
-
         step_log = executor.run_log_store.get_step_log(effective_internal_name, executor.run_id)
-        step_log.status = defaults.PROCESSING
-
-        if step_success_bool:  #  If none failed and nothing is waiting
-            if not waiting:
-                step_log.status = defaults.SUCCESS
-        else:
-            step_log.status = defaults.FAIL
+        self._finalize_step(step_log, [branch_log.status])
 
         executor.run_log_store.add_step_log(step_log, executor.run_id)
+        return step_log
 
 
 class AsISNode(BaseNode):
@@ -1041,15 +1016,8 @@ class AsISNode(BaseNode):
         Returns:
             [type]: [description]
         """
-        attempt_log = executor.run_log_store.create_attempt_log()
-
-        attempt_log.start_time = str(datetime.now())
-        attempt_log.status = defaults.SUCCESS  # This is a dummy node and always will be success
-
-        attempt_log.end_time = str(datetime.now())
-        attempt_log.duration = utils.get_duration_between_datetime_strings(
-            attempt_log.start_time, attempt_log.end_time)
-        return attempt_log
+        # This is a dummy node and always will be success
+        return self._run_attempt(executor, lambda: None)
 
     def execute_as_graph(self, executor, map_variable: dict = None, **kwargs):
         """
@@ -1,14 +1,19 @@
 import json
 import logging
-from typing import Optional, Union
+from typing import Dict, Optional, Tuple, Union
 
-from magnus import defaults, exceptions, graph, utils
+from magnus import datastore, defaults, exceptions, graph, utils
 
 logger = logging.getLogger(defaults.NAME)
 
 # Set this global executor to the fitted executor for access later
 global_executor = None  # pylint: disable=invalid-name # type: ignore
 
+# The graph built in this process for the current run, by the run id and the hash of its dag definition.
+# Workers executing branches in parallel prepare the configurations for every branch of the same dag.
+# Only the graph of the latest run is kept, the nodes hold state that should not be carried over to another run.
+_graphs_by_run: Dict[Tuple[Optional[str], str], graph.Graph] = {}
+
 # TODO: Tests and mypy
 
 
@@ -94,19 +99,27 @@ def prepare_configurations(
         mode_config = magnus_defaults.get('executor', defaults.DEFAULT_EXECUTOR)
     mode_executor = utils.get_provider_by_name_and_type('executor', mode_config)
 
+    if mode_executor.config.batch_log_writes:
+        run_log_store = datastore.BatchedRunLogStore(run_log_store)
+
     if pipeline_file:
         # There are use cases where we are only preparing the executor
         pipeline_config = utils.load_yaml(pipeline_file)
         pipeline_config = utils.apply_variables(pipeline_config, variables=variables)
 
-        logger.info('The input pipeline:')
-        logger.info(json.dumps(pipeline_config, indent=4))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info('The input pipeline:')
+            logger.info(json.dumps(pipeline_config, indent=4))
 
         # Create the graph
         dag_config = pipeline_config['dag']
         dag_hash = utils.get_dag_hash(dag_config)
         # TODO: Dag nodes should not self refer themselves
-        dag = graph.create_graph(dag_config)
+        graph_key = (run_id, dag_hash)
+        if graph_key not in _graphs_by_run:
+            _graphs_by_run.clear()
+            _graphs_by_run[graph_key] = graph.create_graph(dag_config)
+        dag = _graphs_by_run[graph_key]
 
         mode_executor.pipeline_file = pipeline_file
         mode_executor.dag = dag
@@ -185,9 +198,13 @@ def execute(
     mode_executor.prepare_for_graph_execution()
 
     logger.info('Executing the graph')
-    mode_executor.execute_graph(dag=mode_executor.dag)
+    try:
+        mode_executor.execute_graph(dag=mode_executor.dag)
 
-    mode_executor.send_return_code()
+        mode_executor.send_return_code()
+    finally:
+        # The run is over, no branch worker shares the run log any more
+        mode_executor.run_log_store.release_run_log(run_id=run_id)
 
 
 def execute_single_step(
@@ -253,9 +270,13 @@ def execute_single_step(
     mode_executor.prepare_for_graph_execution()
 
     logger.info('Executing the graph')
-    mode_executor.execute_graph(dag=mode_executor.dag)
+    try:
+        mode_executor.execute_graph(dag=mode_executor.dag)
 
-    mode_executor.send_return_code()
+        mode_executor.send_return_code()
+    finally:
+        # The run is over, no branch worker shares the run log any more
+        mode_executor.run_log_store.release_run_log(run_id=run_id)
 
 
 def execute_single_node(
@@ -333,6 +354,12 @@ def execute_single_brach(
         tag (str): If a tag is provided at the run time
     """
     from magnus import nodes
+
+    # On linux, the branch workers are forked from the process traversing the graph and inherit its executor.
+    # The parent flushes its batched writes before submitting the branches, any left in the worker are not its own.
+    if global_executor is not None and isinstance(global_executor.run_log_store, datastore.BatchedRunLogStore):
+        global_executor.run_log_store.discard_pending_writes()
+
     mode_executor = prepare_configurations(configuration_file=configuration_file,
                                            pipeline_file=pipeline_file,
                                            run_id=run_id,
@@ -341,6 +368,10 @@ def execute_single_brach(
     mode_executor.execution_plan = defaults.EXECUTION_PLAN.pipeline
     utils.set_magnus_environment_variables(run_id=run_id, configuration_file=configuration_file, tag=tag)
 
+    # The sibling branches write to the same run log, batched writes of this branch would over-write theirs
+    if isinstance(mode_executor.run_log_store, datastore.BatchedRunLogStore):
+        mode_executor.run_log_store = mode_executor.run_log_store.run_log_store
+
     branch_internal_name = nodes.BaseNode._get_internal_name_from_command_name(branch_name)
 
     map_variable_dict = utils.json_to_ordered_dict(map_variable)
@@ -395,9 +426,13 @@ def execute_notebook(
     mode_executor.prepare_for_graph_execution()
 
     logger.info('Executing the graph')
-    mode_executor.execute_graph(dag=mode_executor.dag)
+    try:
+        mode_executor.execute_graph(dag=mode_executor.dag)
 
-    mode_executor.send_return_code()
+        mode_executor.send_return_code()
+    finally:
+        # The run is over, no branch worker shares the run log any more
+        mode_executor.run_log_store.release_run_log(run_id=run_id)
 
 
 def execute_function(
@@ -442,6 +477,10 @@ def execute_function(
     mode_executor.prepare_for_graph_execution()
 
     logger.info('Executing the graph')
-    mode_executor.execute_graph(dag=mode_executor.dag)
+    try:
+        mode_executor.execute_graph(dag=mode_executor.dag)
 
-    mode_executor.send_return_code()
+        mode_executor.send_return_code()
+    finally:
+        # The run is over, no branch worker shares the run log any more
+        mode_executor.run_log_store.release_run_log(run_id=run_id)
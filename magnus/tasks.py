@@ -6,6 +6,7 @@ import logging
 import os
 import subprocess
 import sys
+from typing import Callable, Dict, Tuple
 
 from pydantic import BaseModel
 
@@ -18,6 +19,9 @@ try:
 except ImportError:
     pm = None
 
+# The module name, function name and the function of python tasks by their command, imported once per process
+_python_functions: Dict[str, Tuple[str, str, Callable]] = {}
+
 
 @contextlib.contextmanager
 def output_to_file(path: str):
@@ -154,11 +158,24 @@ class PythonTaskType(BaseTaskType):  # pylint: disable=too-few-public-methods
     """
     task_type = 'python'
 
+    def _get_function(self) -> Tuple[str, str, Callable]:
+        """
+        Import the function defined by the command, the function is remembered for later executions of the command.
+
+        Returns:
+            Tuple[str, str, Callable]: The module name, the function name and the function to call
+        """
+        if self.command not in _python_functions:
+            module, func = utils.get_module_and_func_names(self.command)
+            if os.getcwd() not in sys.path:
+                sys.path.insert(0, os.getcwd())  # Need to add the current directory to path
+            imported_module = importlib.import_module(module)
+            _python_functions[self.command] = (module, func, getattr(imported_module, func))
+
+        return _python_functions[self.command]
+
     def execute_command(self, map_variable: dict = None, **kwargs):
-        module, func = utils.get_module_and_func_names(self.command)
-        sys.path.insert(0, os.getcwd())  # Need to add the current directory to path
-        imported_module = importlib.import_module(module)
-        f = getattr(imported_module, func)
+        module, func, f = self._get_function()
 
         parameters = self._get_parameters()
         filtered_parameters = utils.filter_arguments_for_func(f, parameters, map_variable)
@@ -300,8 +317,11 @@ class ShellTaskType(BaseTaskType):
         if map_variable:
             subprocess_env[defaults.PARAMETER_PREFIX + 'MAP_VARIABLE'] = json.dumps(map_variable)
 
-        result = subprocess.run(self.command, check=True, env=subprocess_env, shell=True,
-                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        # Stream the output as it is produced rather than holding all of it in memory till the command finishes
+        with subprocess.Popen(self.command, env=subprocess_env, shell=True, stdout=subprocess.PIPE,
+                              stderr=subprocess.STDOUT, universal_newlines=True, bufsize=1) as proc:
+            for line in proc.stdout:  # type: ignore
+                print(line, end='')
 
-        print(result.stdout)
-        print(result.stderr)
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, self.command)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import copy
 import hashlib
 import json
 import logging
@@ -8,11 +9,12 @@ import subprocess
 import sys
 from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
 from inspect import signature
 from pathlib import Path
 from string import Template as str_template
 from types import FunctionType
-from typing import TYPE_CHECKING, Callable, List, Mapping, Tuple, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
 
 from ruamel.yaml import YAML  # type: ignore
 from stevedore import driver
@@ -26,10 +28,8 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(defaults.NAME)
 
-try:
-    import docker
-except ImportError:
-    logger.warning('docker was not installed, local-container mode will not function')
+# The yaml files parsed by load_yaml, by their path and load type, along with the version of the file parsed
+_loaded_yamls: Dict[Tuple[str, str], Tuple[Tuple[int, int], Any]] = {}
 
 
 def does_file_exist(file_path: str) -> bool:
@@ -166,6 +166,8 @@ def load_yaml(file_path: str, load_type: str = 'safe') -> dict:
     """
     Loads an yaml and returns the dictionary
 
+    A file is parsed once per process as long as it is not modified, every call gets its own copy of the mapping.
+
     Args:
         file_path (str): The path of the yamlfile
         load_type (str, optional): The load type as understood by ruamel. Defaults to 'safe'.
@@ -173,9 +175,23 @@ def load_yaml(file_path: str, load_type: str = 'safe') -> dict:
     Returns:
         dict: The mapping as defined in the yaml file
     """
+    version: Optional[Tuple[int, int]] = None
+    try:
+        stat = os.stat(file_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        pass
+
+    key = (os.path.abspath(file_path), load_type)
+    if version and key in _loaded_yamls and _loaded_yamls[key][0] == version:
+        return copy.deepcopy(_loaded_yamls[key][1])
+
     with open(file_path, encoding='utf-8') as f:
         yaml = YAML(typ=load_type, pure=True)
         yaml_config = yaml.load(f)
+
+    if version:
+        _loaded_yamls[key] = (version, copy.deepcopy(yaml_config))
     return yaml_config
 
 
@@ -284,6 +300,9 @@ def get_local_docker_image_id(image_name: str) -> str:
         str: The docker image digest
     """
     try:
+        # Conditional import
+        import docker  # pylint: disable=C0415
+
         client = docker.from_env()
         image = client.images.get(image_name)
         return image.attrs['Id']
@@ -377,6 +396,38 @@ def get_user_set_parameters(remove: bool = False) -> dict:
     return parameters
 
 
+def reset_tracked_state():
+    """
+    Removes the user tracked data and the user returned parameters from the environment variables.
+
+    Equivalent to calling get_tracked_data and get_user_set_parameters(remove=True) but without decoding the values
+    of the variables.
+    """
+    for env_var in list(os.environ):
+        if env_var.startswith(defaults.TRACK_PREFIX) or env_var.startswith(defaults.PARAMETER_PREFIX):
+            del os.environ[env_var]
+
+
+def effective_cpu_count() -> int:
+    """
+    The number of cpus available to this process.
+
+    The cpus allocated by slurm or the cpus the process is allowed to run on are preferred over the cpus of the
+    machine, as on shared hosts the process is usually given only a few of them.
+
+    Returns:
+        int: The number of cpus available
+    """
+    slurm_cpus = os.environ.get('SLURM_CPUS_ON_NODE', '')
+    if slurm_cpus.isdigit() and int(slurm_cpus) > 0:
+        return int(slurm_cpus)
+
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+
+    return os.cpu_count() or 1
+
+
 def hash_bytestr_iter(bytesiter, hasher, ashexstr=True):  # pylint: disable=C0116
     for block in bytesiter:  # pragma: no cover
         hasher.update(block)
@@ -482,6 +533,28 @@ def get_node_execution_command(
     return action
 
 
+@lru_cache(maxsize=None)
+def get_plugin_class(namespace: str, name: str) -> type:
+    """
+    Return the class of the plugin registered by the name in the namespace of entry points.
+
+    Loading a plugin by stevedore scans the installed entry points, the class of a plugin is looked up only once and
+    remembered for the rest of the process.
+
+    Args:
+        namespace (str): The namespace of the entry points, for example: magnus.nodes.BaseNode
+        name (str): The name of the plugin, for example: task
+
+    Raises:
+        Exception: If there is no plugin by that name in the namespace, the failure is not remembered.
+
+    Returns:
+        type: The class of the plugin
+    """
+    mgr = driver.DriverManager(namespace=namespace, name=name, invoke_on_load=False)
+    return mgr.driver
+
+
 def get_service_namespace(service_type: str) -> str:
     """
     Return the namespace of the service type
@@ -538,13 +611,7 @@ def get_provider_by_name_and_type(service_type: str, service_details: dict):
 
     logger.info(f'Trying to get a service of {service_type} of the name {service_name} with config: {service_config}')
     try:
-        mgr = driver.DriverManager(
-            namespace=namespace,
-            name=service_name,
-            invoke_on_load=True,
-            invoke_kwds={'config': service_config}
-        )
-        return mgr.driver
+        return get_plugin_class(namespace, service_name)(config=service_config)
     except Exception as _e:
         raise Exception(f'Could not find the service of type: {service_type} with config: {service_details}') from _e
 
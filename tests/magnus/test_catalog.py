@@ -92,6 +92,56 @@ def test_base_catalog_sync_between_runs_raises_exception():
         base_catalog.sync_between_runs(previous_run_id=1, run_id=2)
 
 
+def test_base_catalog_get_many_collects_the_catalogs_of_all_names_in_order(mocker, monkeypatch):
+    mock_get = mocker.MagicMock(side_effect=lambda name, **kwargs: [name + '1', name + '2'])
+    monkeypatch.setattr(catalog.BaseCatalog, 'get', mock_get)
+
+    base_catalog = catalog.BaseCatalog(config=None)
+
+    assert base_catalog.get_many(names=['a', 'b', 'c'], run_id='run_id') == ['a1', 'a2', 'b1', 'b2', 'c1', 'c2']
+    mock_get.assert_any_call(name='b', run_id='run_id', compute_data_folder=None)
+
+
+def test_base_catalog_put_many_passes_the_synced_catalogs(mocker, monkeypatch):
+    mock_put = mocker.MagicMock(return_value=['put'])
+    monkeypatch.setattr(catalog.BaseCatalog, 'put', mock_put)
+
+    base_catalog = catalog.BaseCatalog(config=None)
+
+    assert base_catalog.put_many(names=['a'], run_id='run_id', synced_catalogs='synced') == ['put']
+    mock_put.assert_called_once_with(name='a', run_id='run_id', compute_data_folder=None, synced_catalogs='synced')
+
+
+def test_base_catalog_get_many_returns_empty_list_if_no_names():
+    base_catalog = catalog.BaseCatalog(config=None)
+
+    assert base_catalog.get_many(names=[], run_id='run_id') == []
+
+
+def test_base_catalog_get_many_uses_no_more_threads_than_cpus(mocker, monkeypatch):
+    mock_pool_class = mocker.MagicMock()
+    mock_pool_class.return_value.__enter__.return_value.map.return_value = []
+    monkeypatch.setattr(catalog.concurrent.futures, 'ThreadPoolExecutor', mock_pool_class)
+    monkeypatch.setattr(catalog.utils, 'effective_cpu_count', mocker.MagicMock(return_value=2))
+
+    base_catalog = catalog.BaseCatalog(config=None)
+    base_catalog.get_many(names=['a', 'b', 'c'], run_id='run_id')
+
+    mock_pool_class.assert_called_once_with(max_workers=2)
+
+
+def test_base_catalog_get_many_gets_sequentially_with_one_cpu(mocker, monkeypatch):
+    mock_pool_class = mocker.MagicMock()
+    monkeypatch.setattr(catalog.BaseCatalog, 'get', mocker.MagicMock(side_effect=lambda name, **kwargs: [name]))
+    monkeypatch.setattr(catalog.concurrent.futures, 'ThreadPoolExecutor', mock_pool_class)
+    monkeypatch.setattr(catalog.utils, 'effective_cpu_count', mocker.MagicMock(return_value=1))
+
+    base_catalog = catalog.BaseCatalog(config=None)
+
+    assert base_catalog.get_many(names=['a', 'b'], run_id='run_id') == ['a', 'b']
+    assert mock_pool_class.call_count == 0
+
+
 def test_base_catalog_inits_default_compute_folder_if_none_config():
     base_catalog = catalog.BaseCatalog(config=None)
     assert base_catalog.compute_data_folder == defaults.COMPUTE_DATA_FOLDER
@@ -283,6 +333,27 @@ def test_file_system_catalog_put_copies_files_from_compute_folder_to_catalog_if_
             assert len(list(files)) == 1
 
 
+def test_file_system_catalog_put_many_copies_a_file_matched_by_many_names_once(mocker, monkeypatch):
+    mock_copy = mocker.MagicMock()
+    monkeypatch.setattr(catalog, 'is_catalog_out_of_sync', mocker.MagicMock(return_value=True))
+    monkeypatch.setattr(catalog, 'get_run_log_store', mocker.MagicMock())
+    monkeypatch.setattr(catalog.shutil, 'copy', mock_copy)
+
+    with tempfile.TemporaryDirectory() as catalog_location:
+        with tempfile.TemporaryDirectory(dir='.') as compute_folder:
+            with open(catalog.Path(compute_folder) / 'catalog_file', 'w') as fw:
+                fw.write('hello')
+
+            catalog_handler = catalog.FileSystemCatalog(config=None)
+            catalog_handler.config.catalog_location = catalog_location
+            catalog_handler.config.compute_data_folder = compute_folder
+
+            data_catalogs = catalog_handler.put_many(names=['*', 'catalog*'], run_id='testing')
+
+            assert len(data_catalogs) == 2
+            assert mock_copy.call_count == 1
+
+
 def test_file_system_catalog_put_copies_files_from_compute_folder_to_catalog_if_synced_true(mocker, monkeypatch):
     monkeypatch.setattr(catalog, 'is_catalog_out_of_sync', mocker.MagicMock(return_value=False))
     monkeypatch.setattr(catalog, 'get_run_log_store', mocker.MagicMock())
@@ -309,6 +380,36 @@ def test_file_system_catalog_put_copies_files_from_compute_folder_to_catalog_if_
                 assert True
 
 
+def test_file_system_catalog_put_does_not_copy_files_unchanged_from_synced_catalogs(mocker, monkeypatch):
+    monkeypatch.setattr(catalog, 'get_run_log_store', mocker.MagicMock())
+
+    with tempfile.TemporaryDirectory() as catalog_location:
+        with tempfile.TemporaryDirectory(dir='.') as compute_folder:
+            catalog_location_path = catalog.Path(catalog_location)
+            run_id = 'testing'
+            catalog.Path(catalog_location_path / run_id).mkdir(parents=True)
+            with open(catalog.Path(compute_folder) / 'catalog_file', 'w') as fw:
+                fw.write('hello')
+
+            with open(catalog.Path(compute_folder) / 'not_catalog_file', 'w') as fw:
+                fw.write('hello')
+
+            synced_catalog = mocker.MagicMock()
+            synced_catalog.catalog_relative_path = run_id + os.sep + str(
+                (catalog.Path(compute_folder) / 'catalog_file').relative_to('.'))
+            synced_catalog.data_hash = catalog.utils.get_data_hash(str(catalog.Path(compute_folder) / 'catalog_file'))
+
+            catalog_handler = catalog.FileSystemCatalog(config=None)
+            catalog_handler.config.catalog_location = catalog_location
+            catalog_handler.config.compute_data_folder = compute_folder
+
+            catalog_handler.put(name="*", run_id=run_id, synced_catalogs=[synced_catalog])
+
+            _, _, files = next(os.walk(catalog_location_path / run_id / compute_folder))
+
+            assert list(files) == ['not_catalog_file']
+
+
 def test_file_system_catalog_put_uses_compute_folder_by_default(monkeypatch, mocker):
     mock_safe_make_dir = mocker.MagicMock()
     monkeypatch.setattr(catalog.utils, 'safe_make_dir', mock_safe_make_dir)
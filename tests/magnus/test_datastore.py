@@ -219,6 +219,15 @@ def test_base_run_log_store_get_parameters_gets_from_run_log(mocker, monkeypatch
     assert run_log_store.get_parameters(run_id='testing') == {'b': 2}
 
 
+def test_base_run_log_store_get_run_status_gets_from_run_log(mocker, monkeypatch):
+    run_log = datastore.RunLog(run_id='testing', status=defaults.FAIL)
+
+    monkeypatch.setattr(datastore.BaseRunLogStore, 'get_run_log_by_id', mocker.MagicMock(return_value=run_log))
+
+    run_log_store = datastore.BaseRunLogStore(config=None)
+    assert run_log_store.get_run_status(run_id='testing') == defaults.FAIL
+
+
 def test_base_run_log_store_get_run_config_returns_config_from_run_log(mocker, monkeypatch):
     run_log = datastore.RunLog(run_id='testing')
     run_config = {'executor': 'for testing'}
@@ -430,6 +439,36 @@ def test_base_run_log_add_branch_log_adds_branch_to_the_right_step(mocker, monke
     assert mock_step.branches['test.branch.step'] == branch_log
 
 
+def test_base_run_log_store_add_step_logs_adds_every_step_log(mocker, monkeypatch):
+    mock_add_step_log = mocker.MagicMock()
+    monkeypatch.setattr(datastore.BaseRunLogStore, 'add_step_log', mock_add_step_log)
+
+    run_log_store = datastore.BaseRunLogStore(config=None)
+    run_log_store.add_step_logs(['step1', 'step2'], run_id='test')
+
+    assert mock_add_step_log.call_count == 2
+
+
+def test_base_run_log_store_add_branch_logs_adds_every_branch_log(mocker, monkeypatch):
+    mock_add_branch_log = mocker.MagicMock()
+    monkeypatch.setattr(datastore.BaseRunLogStore, 'add_branch_log', mock_add_branch_log)
+
+    run_log_store = datastore.BaseRunLogStore(config=None)
+    run_log_store.add_branch_logs(['branch1', 'branch2'], run_id='test')
+
+    assert mock_add_branch_log.call_count == 2
+
+
+def test_base_run_log_store_get_branch_logs_gets_every_branch_log(mocker, monkeypatch):
+    mock_get_branch_log = mocker.MagicMock(side_effect=['log1', 'log2'])
+    monkeypatch.setattr(datastore.BaseRunLogStore, 'get_branch_log', mock_get_branch_log)
+
+    run_log_store = datastore.BaseRunLogStore(config=None)
+
+    assert run_log_store.get_branch_logs(['branch1', 'branch2'], run_id='test') == {'branch1': 'log1',
+                                                                                      'branch2': 'log2'}
+
+
 def test_buffered_run_log_store_inits_run_log_as_none():
     run_log_store = datastore.BufferRunLogstore(config=None)
 
@@ -488,6 +527,7 @@ def test_file_system_run_log_store_write_to_folder_makes_dir_if_not_present(mock
     mock_path = mocker.MagicMock()
     monkeypatch.setattr(datastore, 'json', mock_json)
     monkeypatch.setattr(datastore, 'Path', mock_path)
+    monkeypatch.setattr(datastore.os, 'replace', mocker.MagicMock())
 
     mock_run_log = mocker.MagicMock()
     mock_dict = mocker.MagicMock()
@@ -531,12 +571,12 @@ def test_file_system_run_log_store_get_from_folder_returns_run_log_from_file_con
     assert run_log.run_id == 'test'
 
 
-def test_file_system_run_log_store_create_run_log_writes_to_folder(mocker, monkeypatch):
+def test_file_system_run_log_store_create_run_log_writes_to_folder(mocker, monkeypatch, tmp_path):
     mock_write_to_folder = mocker.MagicMock()
 
     monkeypatch.setattr(datastore.FileSystemRunLogstore, 'write_to_folder', mock_write_to_folder)
 
-    run_log_store = datastore.FileSystemRunLogstore(config=None)
+    run_log_store = datastore.FileSystemRunLogstore(config={'log_folder': str(tmp_path)})
     run_log = run_log_store.create_run_log(run_id='test random')
 
     mock_write_to_folder.assert_called_once_with(run_log)
@@ -580,13 +620,223 @@ def test_file_system_run_log_store_get_run_log_by_id_returns_run_log_from_get_fr
     assert run_log == 'I am a run log'
 
 
-def test_file_system_run_log_store_put_run_log_writes_to_folder(mocker, monkeypatch):
+def test_file_system_run_log_store_put_run_log_writes_to_folder(mocker, monkeypatch, tmp_path):
     mock_write_to_folder = mocker.MagicMock()
 
     monkeypatch.setattr(datastore.FileSystemRunLogstore, 'write_to_folder', mock_write_to_folder)
 
-    run_log_store = datastore.FileSystemRunLogstore(config=None)
+    run_log_store = datastore.FileSystemRunLogstore(config={'log_folder': str(tmp_path)})
     mock_run_log = mocker.MagicMock()
     run_log_store.put_run_log(run_log=mock_run_log)
 
     mock_write_to_folder.assert_called_once_with(mock_run_log)
+
+
+def test_batched_run_log_store_reads_the_run_log_only_once(mocker):
+    mock_run_log_store = mocker.MagicMock()
+    run_log = datastore.RunLog(run_id='test')
+    mock_run_log_store.get_run_log_by_id.return_value = run_log
+
+    run_log_store = datastore.BatchedRunLogStore(mock_run_log_store)
+
+    assert run_log_store.get_run_log_by_id(run_id='test') == run_log
+    assert run_log_store.get_run_log_by_id(run_id='test') == run_log
+    assert mock_run_log_store.get_run_log_by_id.call_count == 1
+
+
+def test_batched_run_log_store_coalesces_writes_until_flush(mocker):
+    mock_run_log_store = mocker.MagicMock()
+    run_log = datastore.RunLog(run_id='test')
+    mock_run_log_store.get_run_log_by_id.return_value = run_log
+
+    run_log_store = datastore.BatchedRunLogStore(mock_run_log_store)
+
+    run_log_store.add_step_log(datastore.StepLog(name='step1', internal_name='step1'), run_id='test')
+    run_log_store.add_step_log(datastore.StepLog(name='step2', internal_name='step2'), run_id='test')
+    assert mock_run_log_store.put_run_log.call_count == 0
+    assert run_log_store.get_step_log('step2', run_id='test').name == 'step2'
+
+    run_log_store.flush()
+    mock_run_log_store.put_run_log.assert_called_once_with(run_log=run_log)
+    assert list(run_log.steps.keys()) == ['step1', 'step2']
+
+
+def test_batched_run_log_store_flushes_when_max_pending_writes_is_reached(mocker):
+    mock_run_log_store = mocker.MagicMock()
+    run_log = datastore.RunLog(run_id='test')
+
+    run_log_store = datastore.BatchedRunLogStore(mock_run_log_store, max_pending_writes=2)
+
+    run_log_store.put_run_log(run_log)
+    assert mock_run_log_store.put_run_log.call_count == 0
+
+    run_log_store.put_run_log(run_log)
+    assert mock_run_log_store.put_run_log.call_count == 1
+
+
+def test_batched_run_log_store_does_not_hold_run_logs_of_other_runs(mocker):
+    mock_run_log_store = mocker.MagicMock()
+    run_log_store = datastore.BatchedRunLogStore(mock_run_log_store)
+
+    run_log_store.put_run_log(datastore.RunLog(run_id='test'))
+    run_log_store.get_run_log_by_id(run_id='previous')
+
+    mock_run_log_store.get_run_log_by_id.assert_called_once_with(run_id='previous', full=True)
+
+
+def test_batched_run_log_store_uses_the_service_name_and_config_of_the_run_log_store():
+    file_system_store = datastore.FileSystemRunLogstore(config={'log_folder': 'test'})
+
+    run_log_store = datastore.BatchedRunLogStore(file_system_store)
+
+    assert run_log_store.service_name == 'file-system'
+    assert run_log_store.config is file_system_store.config
+    assert run_log_store.log_folder_name == 'test'
+
+
+def test_file_system_run_log_store_add_step_logs_writes_once(mocker, monkeypatch, tmp_path):
+    mock_write_to_folder = mocker.MagicMock()
+    run_log = datastore.RunLog(run_id='test')
+    branch_log = datastore.BranchLog(internal_name='parallel.a')
+    run_log.steps['parallel'] = datastore.StepLog(name='parallel', internal_name='parallel',
+                                                  branches={'parallel.a': branch_log})
+
+    monkeypatch.setattr(datastore.FileSystemRunLogstore, 'get_from_folder', mocker.MagicMock(return_value=run_log))
+    monkeypatch.setattr(datastore.FileSystemRunLogstore, 'write_to_folder', mock_write_to_folder)
+
+    run_log_store = datastore.FileSystemRunLogstore(config={'log_folder': str(tmp_path)})
+    run_log_store.add_step_logs([datastore.StepLog(name='step', internal_name='step'),
+                                 datastore.StepLog(name='step', internal_name='parallel.a.step')], run_id='test')
+
+    mock_write_to_folder.assert_called_once_with(run_log)
+    assert 'step' in run_log.steps
+    assert 'parallel.a.step' in branch_log.steps
+
+
+def test_file_system_run_log_store_add_branch_logs_writes_once(mocker, monkeypatch, tmp_path):
+    mock_write_to_folder = mocker.MagicMock()
+    run_log = datastore.RunLog(run_id='test')
+    run_log.steps['parallel'] = datastore.StepLog(name='parallel', internal_name='parallel')
+
+    monkeypatch.setattr(datastore.FileSystemRunLogstore, 'get_from_folder', mocker.MagicMock(return_value=run_log))
+    monkeypatch.setattr(datastore.FileSystemRunLogstore, 'write_to_folder', mock_write_to_folder)
+
+    run_log_store = datastore.FileSystemRunLogstore(config={'log_folder': str(tmp_path)})
+    run_log_store.add_branch_logs([datastore.BranchLog(internal_name='parallel.a'),
+                                   datastore.BranchLog(internal_name='parallel.b')], run_id='test')
+
+    mock_write_to_folder.assert_called_once_with(run_log)
+    assert list(run_log.steps['parallel'].branches) == ['parallel.a', 'parallel.b']
+
+
+def test_file_system_run_log_store_get_branch_logs_reads_once(mocker, monkeypatch):
+    run_log = datastore.RunLog(run_id='test')
+    branch_a = datastore.BranchLog(internal_name='parallel.a')
+    branch_b = datastore.BranchLog(internal_name='parallel.b')
+    run_log.steps['parallel'] = datastore.StepLog(name='parallel', internal_name='parallel',
+                                                  branches={'parallel.a': branch_a, 'parallel.b': branch_b})
+    mock_get_from_folder = mocker.MagicMock(return_value=run_log)
+
+    monkeypatch.setattr(datastore.FileSystemRunLogstore, 'get_from_folder', mock_get_from_folder)
+
+    run_log_store = datastore.FileSystemRunLogstore(config=None)
+    branch_logs = run_log_store.get_branch_logs(['parallel.a', 'parallel.b'], run_id='test')
+
+    assert branch_logs == {'parallel.a': branch_a, 'parallel.b': branch_b}
+    assert mock_get_from_folder.call_count == 1
+
+
+def test_file_system_run_log_store_get_run_status_reads_the_status_from_the_file(tmp_path):
+    run_log_store = datastore.FileSystemRunLogstore(config={'log_folder': str(tmp_path)})
+    run_log_store.write_to_folder(datastore.RunLog(run_id='test', status=defaults.SUCCESS))
+
+    assert run_log_store.get_run_status(run_id='test') == defaults.SUCCESS
+
+
+def test_file_system_run_log_store_get_run_status_raises_exception_if_not_present(tmp_path):
+    run_log_store = datastore.FileSystemRunLogstore(config={'log_folder': str(tmp_path)})
+
+    with pytest.raises(exceptions.RunLogNotFoundError):
+        run_log_store.get_run_status(run_id='test')
+
+
+def test_file_system_run_log_store_write_to_folder_replaces_the_run_log(tmp_path):
+    run_log_store = datastore.FileSystemRunLogstore(config={'log_folder': str(tmp_path)})
+    run_log_store.write_to_folder(datastore.RunLog(run_id='test', status=defaults.PROCESSING))
+    run_log_store.write_to_folder(datastore.RunLog(run_id='test', status=defaults.SUCCESS))
+
+    assert [path.name for path in tmp_path.iterdir()] == ['test.json']
+    assert run_log_store.get_run_status(run_id='test') == defaults.SUCCESS
+
+
+def test_file_system_run_log_store_lock_run_log_is_reentrant(mocker, monkeypatch, tmp_path):
+    mock_flock = mocker.MagicMock()
+    monkeypatch.setattr(datastore.fcntl, 'flock', mock_flock)
+
+    run_log_store = datastore.FileSystemRunLogstore(config={'log_folder': str(tmp_path)})
+    with run_log_store.lock_run_log('test'):
+        with run_log_store.lock_run_log('test'):
+            pass
+
+    assert [args[1] for args, _ in mock_flock.call_args_list] == [datastore.fcntl.LOCK_EX, datastore.fcntl.LOCK_UN]
+
+
+def test_file_system_run_log_store_lock_run_log_is_a_no_op_without_fcntl(monkeypatch, tmp_path):
+    monkeypatch.setattr(datastore, 'fcntl', None)
+
+    run_log_store = datastore.FileSystemRunLogstore(config={'log_folder': str(tmp_path)})
+    with run_log_store.lock_run_log('test'):
+        pass
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_file_system_run_log_store_release_run_log_removes_the_lock_file(tmp_path):
+    run_log_store = datastore.FileSystemRunLogstore(config={'log_folder': str(tmp_path)})
+    run_log_store.create_run_log(run_id='test')
+
+    run_log_store.release_run_log(run_id='test')
+
+    assert [path.name for path in tmp_path.iterdir()] == ['test.json']
+
+
+def test_file_system_run_log_store_release_run_log_without_a_lock_file(tmp_path):
+    run_log_store = datastore.FileSystemRunLogstore(config={'log_folder': str(tmp_path)})
+
+    run_log_store.release_run_log(run_id='test')
+
+
+def test_file_system_run_log_store_add_step_log_holds_the_lock(mocker, monkeypatch, tmp_path):
+    locked_while_writing = []
+    run_log_store = datastore.FileSystemRunLogstore(config={'log_folder': str(tmp_path)})
+    run_log_store.create_run_log(run_id='test')
+
+    def mock_write_to_folder(run_log):
+        locked_while_writing.append('test' in run_log_store._locked_run_ids)
+    monkeypatch.setattr(run_log_store, 'write_to_folder', mock_write_to_folder)
+
+    run_log_store.add_step_log(datastore.StepLog(name='step', internal_name='step'), run_id='test')
+
+    assert locked_while_writing == [True]
+
+
+def test_batched_run_log_store_release_run_log_flushes_and_releases_the_underlying_store(mocker):
+    mock_run_log_store = mocker.MagicMock()
+    run_log_store = datastore.BatchedRunLogStore(mock_run_log_store)
+    run_log = datastore.RunLog(run_id='test')
+    run_log_store.put_run_log(run_log=run_log)
+
+    run_log_store.release_run_log(run_id='test')
+
+    mock_run_log_store.put_run_log.assert_called_once_with(run_log=run_log)
+    mock_run_log_store.release_run_log.assert_called_once_with(run_id='test')
+
+
+def test_batched_run_log_store_get_run_status_uses_the_run_log_in_memory(mocker):
+    mock_run_log_store = mocker.MagicMock()
+    run_log_store = datastore.BatchedRunLogStore(mock_run_log_store)
+
+    run_log_store.put_run_log(datastore.RunLog(run_id='test', status=defaults.FAIL))
+
+    assert run_log_store.get_run_status(run_id='test') == defaults.FAIL
+    assert mock_run_log_store.get_run_status.call_count == 0
@@ -1,7 +1,13 @@
+import sys
+
 import pytest
 from pydantic import BaseModel, Extra
 
-from magnus import defaults, exceptions, executor
+from magnus import datastore, defaults, exceptions, executor
+
+
+def complete_all_branches(running, return_when):
+    return set(running), set()
 
 
 def test_base_executor__is_parallel_execution_uses_default():
@@ -10,6 +16,229 @@ def test_base_executor__is_parallel_execution_uses_default():
     assert base_executor._is_parallel_execution() == defaults.ENABLE_PARALLEL
 
 
+def test_base_executor__execute_branches_executes_sequentially_if_not_parallel(mocker, monkeypatch):
+    mock_execute_graph = mocker.MagicMock()
+    monkeypatch.setattr(executor.BaseExecutor, 'execute_graph', mock_execute_graph)
+
+    base_executor = executor.BaseExecutor(config=None)
+
+    base_executor._execute_branches([('branch1', None), ('branch2', {'a': 1})])
+
+    assert mock_execute_graph.call_count == 2
+    mock_execute_graph.assert_called_with('branch2', map_variable={'a': 1})
+
+
+def test_base_executor__execute_branches_executes_a_single_branch_in_process(mocker, monkeypatch):
+    mock_execute_graph = mocker.MagicMock()
+    mock_pool_class = mocker.MagicMock()
+    monkeypatch.setattr(executor.BaseExecutor, 'execute_graph', mock_execute_graph)
+    monkeypatch.setattr(executor.concurrent.futures, 'ProcessPoolExecutor', mock_pool_class)
+
+    base_executor = executor.BaseExecutor(config={'enable_parallel': True})
+
+    base_executor._execute_branches([('branch1', {'a': 1})])
+
+    mock_execute_graph.assert_called_once_with('branch1', map_variable={'a': 1})
+    assert mock_pool_class.call_count == 0
+
+
+def test_base_executor__execute_branches_submits_to_pool_if_parallel(mocker, monkeypatch):
+    mock_execute_graph = mocker.MagicMock()
+    mock_pool = mocker.MagicMock()
+    mock_pool_class = mocker.MagicMock()
+    mock_pool_class.return_value = mock_pool
+    mock_pool.submit.side_effect = lambda *args, **kwargs: mocker.MagicMock()
+    monkeypatch.setattr(executor.BaseExecutor, 'execute_graph', mock_execute_graph)
+    monkeypatch.setattr(executor.concurrent.futures, 'ProcessPoolExecutor', mock_pool_class)
+    monkeypatch.setattr(executor.concurrent.futures, 'wait', complete_all_branches)
+
+    mock_branch = mocker.MagicMock()
+    mock_branch.internal_branch_name = 'parallel.branch a'
+    mock_branch.compute_priorities.return_value = {}
+
+    base_executor = executor.BaseExecutor(config={'enable_parallel': True})
+    base_executor.run_log_store = mocker.MagicMock()
+    base_executor.run_id = 'run_id'
+
+    base_executor._execute_branches([(mock_branch, None), (mock_branch, {'a': 1})])
+
+    assert mock_execute_graph.call_count == 0
+    assert mock_pool.submit.call_count == 2
+    _, kwargs = mock_pool.submit.call_args
+    assert kwargs['branch_name'] == 'parallel.branch%a'
+    assert kwargs['map_variable'] == '{"a": 1}'
+    assert kwargs['run_id'] == 'run_id'
+
+
+def test_base_executor__execute_branches_submits_longest_branch_first(mocker, monkeypatch):
+    mock_pool = mocker.MagicMock()
+    mock_pool_class = mocker.MagicMock()
+    mock_pool_class.return_value = mock_pool
+    monkeypatch.setattr(executor.concurrent.futures, 'ProcessPoolExecutor', mock_pool_class)
+    monkeypatch.setattr(executor.concurrent.futures, 'wait', complete_all_branches)
+
+    branches = []
+    for name, length in [('short', 2), ('long', 5), ('also short', 2)]:
+        mock_branch = mocker.MagicMock()
+        mock_branch.internal_branch_name = name
+        mock_branch.start_at = 'start'
+        mock_branch.compute_priorities.return_value = {'start': length}
+        branches.append((mock_branch, None))
+
+    base_executor = executor.BaseExecutor(config={'enable_parallel': True})
+    base_executor.run_log_store = mocker.MagicMock()
+
+    base_executor._execute_branches(branches)
+
+    submitted = [kwargs['branch_name'] for _, kwargs in mock_pool.submit.call_args_list]
+    assert submitted == ['long', 'short', 'also%short']
+
+
+def test_base_executor__execute_branches_computes_critical_path_once_per_branch(mocker, monkeypatch):
+    monkeypatch.setattr(executor.concurrent.futures, 'ProcessPoolExecutor', mocker.MagicMock())
+    monkeypatch.setattr(executor.concurrent.futures, 'wait', complete_all_branches)
+
+    mock_branch = mocker.MagicMock()
+    mock_branch.compute_priorities.return_value = {}
+
+    base_executor = executor.BaseExecutor(config={'enable_parallel': True})
+    base_executor.run_log_store = mocker.MagicMock()
+
+    base_executor._execute_branches([(mock_branch, {'a': 1}), (mock_branch, {'a': 2})])
+    base_executor._execute_branches([(mock_branch, {'a': 3}), (mock_branch, {'a': 4})])
+
+    assert mock_branch.compute_priorities.call_count == 1
+
+
+def test_base_executor__execute_branches_serializes_a_shared_map_variable_once(mocker, monkeypatch):
+    mock_pool_class = mocker.MagicMock()
+    mock_dumps = mocker.MagicMock(return_value='{"a": 1}')
+    monkeypatch.setattr(executor.concurrent.futures, 'ProcessPoolExecutor', mock_pool_class)
+    monkeypatch.setattr(executor.concurrent.futures, 'wait', complete_all_branches)
+    monkeypatch.setattr(executor.json, 'dumps', mock_dumps)
+
+    mock_branch = mocker.MagicMock()
+    mock_branch.compute_priorities.return_value = {}
+    map_variable = {'a': 1}
+
+    base_executor = executor.BaseExecutor(config={'enable_parallel': True})
+    base_executor.run_log_store = mocker.MagicMock()
+
+    base_executor._execute_branches([(mock_branch, map_variable), (mock_branch, map_variable)])
+
+    mock_dumps.assert_called_once_with(map_variable)
+    assert mock_pool_class.return_value.submit.call_count == 2
+
+
+def test_base_executor__execute_branches_reuses_the_process_pool(mocker, monkeypatch):
+    mock_pool_class = mocker.MagicMock()
+    monkeypatch.setattr(executor.concurrent.futures, 'ProcessPoolExecutor', mock_pool_class)
+    monkeypatch.setattr(executor.concurrent.futures, 'wait', complete_all_branches)
+
+    mock_branch = mocker.MagicMock()
+    mock_branch.compute_priorities.return_value = {}
+
+    base_executor = executor.BaseExecutor(config={'enable_parallel': True})
+    base_executor.run_log_store = mocker.MagicMock()
+
+    base_executor._execute_branches([(mock_branch, None), (mock_branch, None)])
+    base_executor._execute_branches([(mock_branch, None), (mock_branch, None)])
+
+    assert mock_pool_class.call_count == 1
+    assert mock_pool_class.return_value.submit.call_count == 4
+
+
+def test_base_executor__execute_branches_discards_a_broken_process_pool(mocker, monkeypatch):
+    def broken_future(*args, **kwargs):
+        mock_future = mocker.MagicMock()
+        mock_future.result.side_effect = executor.concurrent.futures.BrokenExecutor()
+        return mock_future
+
+    mock_pool_class = mocker.MagicMock()
+    mock_pool_class.return_value.submit.side_effect = broken_future
+    monkeypatch.setattr(executor.concurrent.futures, 'ProcessPoolExecutor', mock_pool_class)
+    monkeypatch.setattr(executor.concurrent.futures, 'wait', complete_all_branches)
+
+    mock_branch = mocker.MagicMock()
+    mock_branch.compute_priorities.return_value = {}
+
+    base_executor = executor.BaseExecutor(config={'enable_parallel': True})
+    base_executor.run_log_store = mocker.MagicMock()
+
+    base_executor._execute_branches([(mock_branch, None), (mock_branch, None)])
+
+    mock_pool_class.return_value.shutdown.assert_called_once_with(wait=True)
+    assert base_executor._process_pool is None
+
+
+def test_base_executor__fail_unfinished_branches_marks_unfinished_branches_as_failed(mocker):
+    branch_logs = {
+        'processing': datastore.BranchLog(internal_name='processing', status=defaults.PROCESSING),
+        'raised': datastore.BranchLog(internal_name='raised', status=defaults.SUCCESS),
+        'success': datastore.BranchLog(internal_name='success', status=defaults.SUCCESS),
+        'fail': datastore.BranchLog(internal_name='fail', status=defaults.FAIL),
+    }
+
+    base_executor = executor.BaseExecutor(config=None)
+    base_executor.run_log_store = mocker.MagicMock()
+    base_executor.run_log_store.get_branch_logs.return_value = branch_logs
+
+    base_executor._fail_unfinished_branches(list(branch_logs), {'raised', 'fail'})
+
+    args, _ = base_executor.run_log_store.add_branch_logs.call_args
+    assert args[0] == [branch_logs['processing'], branch_logs['raised']]
+    assert branch_logs['processing'].status == defaults.FAIL
+    assert branch_logs['raised'].status == defaults.FAIL
+    assert branch_logs['success'].status == defaults.SUCCESS
+
+
+def test_base_executor__fail_unfinished_branches_does_not_write_if_all_branches_completed(mocker):
+    base_executor = executor.BaseExecutor(config=None)
+    base_executor.run_log_store = mocker.MagicMock()
+    base_executor.run_log_store.get_branch_logs.return_value = {
+        'success': datastore.BranchLog(internal_name='success', status=defaults.SUCCESS)}
+
+    base_executor._fail_unfinished_branches(['success'], set())
+
+    assert base_executor.run_log_store.add_branch_logs.call_count == 0
+
+
+def test_base_executor_send_return_code_shuts_down_the_process_pool(mocker, monkeypatch):
+    mock_pool = mocker.MagicMock()
+
+    base_executor = executor.BaseExecutor(config=None)
+    base_executor.run_log_store = mocker.MagicMock()
+    base_executor.run_log_store.get_run_status.return_value = defaults.SUCCESS
+    base_executor._process_pool = mock_pool
+
+    base_executor.send_return_code()
+
+    mock_pool.shutdown.assert_called_once_with(wait=True)
+    assert base_executor._process_pool is None
+
+
+def test_base_executor__execute_branches_submits_no_more_than_max_concurrency(mocker, monkeypatch):
+    mock_pool_class = mocker.MagicMock()
+    mock_pool_class.return_value.submit.side_effect = lambda *args, **kwargs: mocker.MagicMock()
+    monkeypatch.setattr(executor.concurrent.futures, 'ProcessPoolExecutor', mock_pool_class)
+    submitted_at_wait = []
+
+    def mock_wait(running, return_when):
+        submitted_at_wait.append(mock_pool_class.return_value.submit.call_count)
+        return {next(iter(running))}, set()
+    monkeypatch.setattr(executor.concurrent.futures, 'wait', mock_wait)
+
+    mock_branch = mocker.MagicMock()
+    mock_branch.compute_priorities.return_value = {}
+
+    base_executor = executor.BaseExecutor(config={'enable_parallel': True})
+    base_executor.run_log_store = mocker.MagicMock()
+
+    base_executor._execute_branches([(mock_branch, {'a': i}) for i in range(4)], max_concurrency=2)
+
+    assert submitted_at_wait == [2, 3, 4, 4]
+
+
 def test_base_executor__set_up_run_log_with_no_previous_run_log(mocker, monkeypatch):
     base_executor = executor.BaseExecutor(config=None)
 
@@ -58,6 +287,40 @@ def test_base_executor__set_up_run_log_with_previous_run_log(mocker, monkeypatch
         run_id='run_id', tag='', use_cached=True, status=defaults.PROCESSING, dag_hash='', original_run_id='old run id')
 
 
+def test_base_executor__set_up_run_log_returns_if_run_log_exists_and_exists_ok(mocker, monkeypatch):
+    base_executor = executor.BaseExecutor(config=None)
+
+    mock_run_log_store = mocker.MagicMock()
+    mock_run_log_store.get_run_log_by_id.return_value.status = defaults.PROCESSING
+    base_executor.run_log_store = mock_run_log_store
+
+    base_executor._set_up_run_log(exists_ok=True)
+
+    assert mock_run_log_store.create_run_log.call_count == 0
+
+
+def test_base_executor__set_up_run_log_raises_exists_error_if_run_log_exists(mocker, monkeypatch):
+    base_executor = executor.BaseExecutor(config=None)
+
+    mock_run_log_store = mocker.MagicMock()
+    mock_run_log_store.get_run_log_by_id.return_value.status = defaults.PROCESSING
+    base_executor.run_log_store = mock_run_log_store
+
+    with pytest.raises(exceptions.RunLogExistsError):
+        base_executor._set_up_run_log()
+
+
+def test_base_executor__set_up_run_log_raises_exception_if_run_log_is_complete(mocker, monkeypatch):
+    base_executor = executor.BaseExecutor(config=None)
+
+    mock_run_log_store = mocker.MagicMock()
+    mock_run_log_store.get_run_log_by_id.return_value.status = defaults.SUCCESS
+    base_executor.run_log_store = mock_run_log_store
+
+    with pytest.raises(Exception, match='already exists'):
+        base_executor._set_up_run_log(exists_ok=True)
+
+
 def test_base_executor_prepare_for_graph_execution_calls(mocker, monkeypatch):
     mock_integration = mocker.MagicMock()
     mock_validate = mocker.MagicMock()
@@ -120,7 +383,7 @@ def test_base_executor__sync_catalog_uses_catalog_handler_compute_folder_by_defa
     mock_catalog.compute_data_folder = 'data/'
 
     mock_catalog_get = mocker.MagicMock()
-    mock_catalog.get = mock_catalog_get
+    mock_catalog.get_many = mock_catalog_get
 
     mock_step_log = mocker.MagicMock()
 
@@ -131,7 +394,7 @@ def test_base_executor__sync_catalog_uses_catalog_handler_compute_folder_by_defa
     base_executor._sync_catalog(mock_node, mock_step_log, stage='get')
 
     mock_catalog_get.assert_called_once_with(
-        name='all', run_id='run_id', compute_data_folder='data/', synced_catalogs=None)
+        names=['all'], run_id='run_id', compute_data_folder='data/', synced_catalogs=None)
 
 
 def test_base_executor__sync_catalog_uses_compute_folder_if_provided_by_node(mocker, monkeypatch):
@@ -142,7 +405,7 @@ def test_base_executor__sync_catalog_uses_compute_folder_if_provided_by_node(moc
     mock_catalog.compute_data_folder = 'data/'
 
     mock_catalog_get = mocker.MagicMock()
-    mock_catalog.get = mock_catalog_get
+    mock_catalog.get_many = mock_catalog_get
 
     mock_step_log = mocker.MagicMock()
 
@@ -153,7 +416,7 @@ def test_base_executor__sync_catalog_uses_compute_folder_if_provided_by_node(moc
     base_executor._sync_catalog(mock_node, mock_step_log, stage='get')
 
     mock_catalog_get.assert_called_once_with(
-        name='all', run_id='run_id', compute_data_folder='data_from_node', synced_catalogs=None)
+        names=['all'], run_id='run_id', compute_data_folder='data_from_node', synced_catalogs=None)
 
 
 def test_base_executor_add_code_identities_adds_git_identity(mocker, monkeypatch):
@@ -171,6 +434,18 @@ def test_base_executor_add_code_identities_adds_git_identity(mocker, monkeypatch
     assert mock_step_log.code_identities == ['code id']
 
 
+def test_base_executor_add_code_identities_gets_git_identity_only_once(mocker, monkeypatch):
+    mock_utils_get_git_code_id = mocker.MagicMock(return_value='code id')
+    monkeypatch.setattr(executor.utils, 'get_git_code_identity', mock_utils_get_git_code_id)
+
+    base_executor = executor.BaseExecutor(config=None)
+
+    base_executor.add_code_identities(node=None, step_log=mocker.MagicMock())
+    base_executor.add_code_identities(node=None, step_log=mocker.MagicMock())
+
+    assert mock_utils_get_git_code_id.call_count == 1
+
+
 def test_base_executor_trigger_job_raises_exception():
     base_executor = executor.BaseExecutor(config=None)
 
@@ -193,6 +468,8 @@ def test_base_executor_execute_from_graph_executes_node_for_success_or_fail(mock
     base_executor.execute_from_graph(node=mock_node, map_variable=None)
 
     assert mock__execute_node.call_count == 1
+    _, kwargs = mock__execute_node.call_args
+    assert kwargs['step_log'] == mock_run_log_store.create_step_log.return_value
 
     mock_node.reset_mock()
     mock__execute_node.reset_mock()
@@ -239,6 +516,30 @@ def test_base_executor_execute_from_graph_makes_step_log_success_if_previous_run
     base_executor.execute_from_graph(node=mock_node, map_variable=None)
 
     assert mock_step_log.status == defaults.SUCCESS
+    assert base_executor._pending_skip_logs == [mock_step_log]
+    assert mock_run_log_store.add_step_log.call_count == 0
+
+
+def test_base_executor_execute_from_graph_adds_skipped_step_logs_before_executing_a_node(mocker, monkeypatch):
+    mock_node = mocker.MagicMock()
+    mock_run_log_store = mocker.MagicMock()
+    mock_skipped_step_log = mocker.MagicMock()
+
+    mock_node.node_type = 'task'
+    mock_node.is_composite = False
+    monkeypatch.setattr(executor.BaseExecutor, 'add_code_identities', mocker.MagicMock())
+    monkeypatch.setattr(executor.BaseExecutor, '_is_eligible_for_rerun', mocker.MagicMock(return_value=True))
+    monkeypatch.setattr(executor.BaseExecutor, 'trigger_job', mocker.MagicMock())
+
+    base_executor = executor.BaseExecutor(config=None)
+    base_executor.run_log_store = mock_run_log_store
+    base_executor.run_id = 'run_id'
+    base_executor._pending_skip_logs = [mock_skipped_step_log]
+
+    base_executor.execute_from_graph(node=mock_node, map_variable=None)
+
+    mock_run_log_store.add_step_logs.assert_called_once_with([mock_skipped_step_log], 'run_id')
+    assert base_executor._pending_skip_logs == []
 
 
 def test_base_executor_execute_from_graph_delegates_to_execute_as_graph_for_composite_nodes(mocker, monkeypatch):
@@ -394,6 +695,52 @@ def test_base_executor_sets_status_to_fail_if_node_raises_exception(monkeypatch,
     assert mock_step_catalog.status == defaults.FAIL
 
 
+def test_base_executor__execute_node_uses_the_step_log_if_provided(monkeypatch, mocker):
+    mock_node = mocker.MagicMock()
+    mock_node._get_max_attempts.return_value = 1
+    mock_node.execute.return_value = datastore.StepAttempt(status=defaults.SUCCESS)
+
+    mock_run_log_store = mocker.MagicMock()
+    step_log = datastore.StepLog(name='step', internal_name='step')
+
+    monkeypatch.setattr(executor, 'interaction', mocker.MagicMock())
+    monkeypatch.setattr(executor, 'utils', mocker.MagicMock())
+    monkeypatch.setattr(executor.BaseExecutor, '_sync_catalog', mocker.MagicMock())
+
+    base_executor = executor.BaseExecutor(config=None)
+    base_executor.run_log_store = mock_run_log_store
+
+    assert base_executor._execute_node(node=mock_node, step_log=step_log) == step_log
+
+    assert mock_run_log_store.get_step_log.call_count == 0
+    mock_run_log_store.add_step_log.assert_called_once_with(step_log, base_executor.run_id)
+
+
+def test_base_executor__execute_node_retries_failed_attempts_till_max_attempts(monkeypatch, mocker):
+    mock_node = mocker.MagicMock()
+    mock_node._get_max_attempts.return_value = 3
+    failed_attempt = datastore.StepAttempt(status=defaults.FAIL)
+    success_attempt = datastore.StepAttempt(status=defaults.SUCCESS)
+    mock_node.execute.side_effect = [failed_attempt, Exception(), success_attempt]
+
+    mock_run_log_store = mocker.MagicMock()
+    step_log = datastore.StepLog(name='step', internal_name='step')
+
+    monkeypatch.setattr(executor, 'interaction', mocker.MagicMock())
+    monkeypatch.setattr(executor, 'utils', mocker.MagicMock())
+    monkeypatch.setattr(executor.BaseExecutor, '_sync_catalog', mocker.MagicMock())
+
+    mock_run_log_store.get_step_log.return_value = step_log
+    base_executor = executor.BaseExecutor(config=None)
+    base_executor.run_log_store = mock_run_log_store
+
+    base_executor._execute_node(node=mock_node)
+
+    assert mock_node.execute.call_count == 3
+    assert step_log.status == defaults.SUCCESS
+    assert [attempt.attempt_number for attempt in step_log.attempts] == [0, 2]
+
+
 def test_base_executor__get_status_and_next_node_name_gets_next_if_success(mocker, monkeypatch):
     mock_node = mocker.MagicMock()
     mock_run_log_store = mocker.MagicMock()
@@ -412,6 +759,25 @@ def test_base_executor__get_status_and_next_node_name_gets_next_if_success(mocke
     assert next_node == 'next node'
 
 
+def test_base_executor__get_status_and_next_node_name_uses_step_log_if_provided(mocker, monkeypatch):
+    mock_node = mocker.MagicMock()
+    mock_run_log_store = mocker.MagicMock()
+    mock_dag = mocker.MagicMock()
+    mock_step_log = mocker.MagicMock()
+
+    mock_step_log.status = defaults.SUCCESS
+    mock_node._get_next_node.return_value = 'next node'
+
+    base_executor = executor.BaseExecutor(config=None)
+    base_executor.run_log_store = mock_run_log_store
+
+    status, next_node = base_executor._get_status_and_next_node_name(
+        current_node=mock_node, dag=mock_dag, step_log=mock_step_log)
+    assert status == defaults.SUCCESS
+    assert next_node == 'next node'
+    assert mock_run_log_store.get_step_log.call_count == 0
+
+
 def test_base_executor_get_status_and_next_node_gets_global_failure_node_by_default_if_step_fails(mocker, monkeypatch):
     mock_node = mocker.MagicMock()
     mock_run_log_store = mocker.MagicMock()
@@ -461,64 +827,74 @@ def test_base_executor__is_eligible_for_rerun_returns_true_if_no_previous_run_lo
 
 def test_base_executor__is_eligible_for_rerun_returns_true_if_step_log_not_found(mocker, monkeypatch):
     mock_node = mocker.MagicMock()
-    mock_previous_run_log = mocker.MagicMock()
-    mock_search_step_by_internal_name = mocker.MagicMock(side_effect=exceptions.StepLogNotFoundError(
-        run_id='id', name='hi'))
+    previous_run_log = datastore.RunLog(run_id='previous')
 
-    mock_previous_run_log.search_step_by_internal_name = mock_search_step_by_internal_name
     mock_node._get_step_log_name.return_value = 'step_log'
 
     base_executor = executor.BaseExecutor(config=None)
-    base_executor.previous_run_log = mock_previous_run_log
+    base_executor.previous_run_log = previous_run_log
 
     assert base_executor._is_eligible_for_rerun(node=mock_node)
-    mock_search_step_by_internal_name.assert_called_once_with('step_log')
 
 
 def test_base_executor__is_eligible_for_rerun_returns_false_if_previous_was_success(mocker, monkeypatch):
     mock_node = mocker.MagicMock()
     mock_step_log = mocker.MagicMock()
-    mock_previous_node_log = mocker.MagicMock()
-    mock_previous_run_log = mocker.MagicMock()
     mock_run_log_store = mocker.MagicMock()
 
-    mock_search_step_by_internal_name = mocker.MagicMock(return_value=(mock_previous_node_log, None))
+    previous_run_log = datastore.RunLog(run_id='previous')
+    previous_run_log.steps['step_log'] = datastore.StepLog(
+        name='step_log', internal_name='step_log', status=defaults.SUCCESS)
     mock_run_log_store.get_step_log.return_value = mock_step_log
 
-    mock_previous_node_log.status = defaults.SUCCESS
-
-    mock_previous_run_log.search_step_by_internal_name = mock_search_step_by_internal_name
     mock_node._get_step_log_name.return_value = 'step_log'
 
     base_executor = executor.BaseExecutor(config=None)
-    base_executor.previous_run_log = mock_previous_run_log
+    base_executor.previous_run_log = previous_run_log
     base_executor.run_log_store = mock_run_log_store
 
     assert base_executor._is_eligible_for_rerun(node=mock_node) is False
-    assert mock_step_log.status == defaults.SUCCESS
 
 
 def test_base_executor__is_eligible_for_rerun_returns_true_if_previous_was_not_success(mocker, monkeypatch):
     mock_node = mocker.MagicMock()
     mock_step_log = mocker.MagicMock()
-    mock_previous_node_log = mocker.MagicMock()
-    mock_previous_run_log = mocker.MagicMock()
     mock_run_log_store = mocker.MagicMock()
 
-    mock_search_step_by_internal_name = mocker.MagicMock(return_value=(mock_previous_node_log, None))
+    previous_run_log = datastore.RunLog(run_id='previous')
+    previous_run_log.steps['step_log'] = datastore.StepLog(
+        name='step_log', internal_name='step_log', status=defaults.FAIL)
     mock_run_log_store.get_step_log.return_value = mock_step_log
 
-    mock_previous_node_log.status = defaults.FAIL
-
-    mock_previous_run_log.search_step_by_internal_name = mock_search_step_by_internal_name
     mock_node._get_step_log_name.return_value = 'step_log'
 
     base_executor = executor.BaseExecutor(config=None)
-    base_executor.previous_run_log = mock_previous_run_log
+    base_executor.previous_run_log = previous_run_log
     base_executor.run_log_store = mock_run_log_store
 
     assert base_executor._is_eligible_for_rerun(node=mock_node)
     assert base_executor.previous_run_log is None
+    assert base_executor._previous_step_logs is None
+
+
+def test_base_executor__previous_step_index_has_steps_of_branches():
+    previous_run_log = datastore.RunLog(run_id='previous')
+    branch_step_log = datastore.StepLog(name='step', internal_name='parallel.a.step')
+    branch_log = datastore.BranchLog(internal_name='parallel.a', steps={'parallel.a.step': branch_step_log})
+    step_log = datastore.StepLog(name='parallel', internal_name='parallel', branches={'parallel.a': branch_log})
+    previous_run_log.steps['parallel'] = step_log
+
+    base_executor = executor.BaseExecutor(config=None)
+    base_executor.previous_run_log = previous_run_log
+
+    assert base_executor._previous_step_index == {'parallel': step_log, 'parallel.a.step': branch_step_log}
+
+
+def test_base_executor__previous_step_index_is_empty_if_no_previous_run_log():
+    base_executor = executor.BaseExecutor(config=None)
+
+    assert base_executor._previous_step_index == {}
+    assert base_executor._previous_step_logs is None
 
 
 def test_base_executor_execute_graph_breaks_if_node_status_is_triggered(mocker, monkeypatch):
@@ -649,6 +1025,54 @@ def test_base_executor_resolve_node_supresess_global_config_from_placeholders_if
     assert base_executor._resolve_node_config(mock_node) == {'a': 1, 'b': 2}
 
 
+def test_base_executor_execute_graph_prints_the_run_log_of_the_graph(mocker, monkeypatch):
+    mock_dag = mocker.MagicMock()
+    mock_node = mocker.MagicMock()
+    mock_json = mocker.MagicMock()
+    mock_print = mocker.MagicMock()
+
+    mock_dag.get_node_by_name.return_value = mock_node
+    mock_node.node_type = 'success'
+    mock_node.internal_branch_name = ''
+
+    monkeypatch.setattr(executor.BaseExecutor, 'execute_from_graph', mocker.MagicMock())
+    monkeypatch.setattr(executor.BaseExecutor, '_get_status_and_next_node_name',
+                        mocker.MagicMock(return_value=(defaults.SUCCESS, None)))
+    monkeypatch.setattr(executor, 'json', mock_json)
+    monkeypatch.setattr('builtins.print', mock_print)
+    base_executor = executor.BaseExecutor(config=None)
+    base_executor.run_log_store = mocker.MagicMock()
+
+    base_executor.execute_graph(dag=mock_dag)
+
+    mock_print.assert_called_once_with(mock_json.dumps.return_value)
+
+
+def test_base_executor_execute_graph_does_not_serialize_branch_log_if_not_debug(mocker, monkeypatch):
+    mock_dag = mocker.MagicMock()
+    mock_node = mocker.MagicMock()
+    mock_json = mocker.MagicMock()
+    mock_print = mocker.MagicMock()
+
+    mock_dag.get_node_by_name.return_value = mock_node
+    mock_node.node_type = 'success'
+    mock_node.internal_branch_name = 'parallel.branch'
+
+    monkeypatch.setattr(executor.BaseExecutor, 'execute_from_graph', mocker.MagicMock())
+    monkeypatch.setattr(executor.BaseExecutor, '_get_status_and_next_node_name',
+                        mocker.MagicMock(return_value=(defaults.SUCCESS, None)))
+    monkeypatch.setattr(executor, 'json', mock_json)
+    monkeypatch.setattr('builtins.print', mock_print)
+    monkeypatch.setattr(executor.logger, 'isEnabledFor', mocker.MagicMock(return_value=False))
+    base_executor = executor.BaseExecutor(config=None)
+    base_executor.run_log_store = mocker.MagicMock()
+
+    base_executor.execute_graph(dag=mock_dag)
+
+    assert mock_json.dumps.call_count == 0
+    assert mock_print.call_count == 0
+
+
 def test_base_executor_execute_graph_raises_exception_if_loop(mocker, monkeypatch):
     mock_dag = mocker.MagicMock()
     mock_execute_from_graph = mocker.MagicMock()
@@ -669,6 +1093,60 @@ def test_base_executor_execute_graph_raises_exception_if_loop(mocker, monkeypatc
         base_executor.execute_graph(dag=mock_dag)
 
 
+def test_base_executor_execute_graph_writes_the_skipped_step_logs_if_traversal_fails(mocker, monkeypatch):
+    mock_dag = mocker.MagicMock()
+    mock_run_log_store = mocker.MagicMock()
+    skipped_step_log = datastore.StepLog(name='skipped', internal_name='skipped')
+
+    monkeypatch.setattr(executor.BaseExecutor, 'execute_from_graph', mocker.MagicMock(side_effect=Exception()))
+    base_executor = executor.BaseExecutor(config=None)
+    base_executor.run_log_store = mock_run_log_store
+    base_executor.run_id = 'run_id'
+    base_executor._pending_skip_logs = [skipped_step_log]
+
+    with pytest.raises(Exception):
+        base_executor.execute_graph(dag=mock_dag)
+
+    mock_run_log_store.add_step_logs.assert_called_once_with([skipped_step_log], 'run_id')
+    assert base_executor._pending_skip_logs == []
+
+
+def test_base_executor_execute_graph_raises_the_traversal_error_if_writing_the_skipped_step_logs_fails(
+        mocker, monkeypatch):
+    mock_run_log_store = mocker.MagicMock()
+    mock_run_log_store.add_step_logs.side_effect = Exception('store is unreachable')
+
+    monkeypatch.setattr(executor.BaseExecutor, 'execute_from_graph',
+                        mocker.MagicMock(side_effect=Exception('traversal failed')))
+    base_executor = executor.BaseExecutor(config=None)
+    base_executor.run_log_store = mock_run_log_store
+    base_executor.run_id = 'run_id'
+    base_executor._pending_skip_logs = [datastore.StepLog(name='skipped', internal_name='skipped')]
+
+    with pytest.raises(Exception, match='traversal failed'):
+        base_executor.execute_graph(dag=mocker.MagicMock())
+
+    mock_run_log_store.add_step_logs.assert_called_once()
+
+
+def test_base_executor_execute_graph_raises_the_error_of_writing_the_skipped_step_logs(mocker, monkeypatch):
+    mock_dag = mocker.MagicMock()
+    mock_dag.get_node_by_name.return_value.node_type = 'success'
+    mock_run_log_store = mocker.MagicMock()
+    mock_run_log_store.add_step_logs.side_effect = Exception('store is unreachable')
+
+    monkeypatch.setattr(executor.BaseExecutor, 'execute_from_graph', mocker.MagicMock())
+    monkeypatch.setattr(executor.BaseExecutor, '_get_status_and_next_node_name',
+                        mocker.MagicMock(return_value=(defaults.SUCCESS, '')))
+    base_executor = executor.BaseExecutor(config=None)
+    base_executor.run_log_store = mock_run_log_store
+    base_executor.run_id = 'run_id'
+    base_executor._pending_skip_logs = [datastore.StepLog(name='skipped', internal_name='skipped')]
+
+    with pytest.raises(Exception, match='store is unreachable'):
+        base_executor.execute_graph(dag=mock_dag)
+
+
 def test_local_executor__is_parallel_execution_sends_defaults_if_not_config():
     local_executor = executor.LocalExecutor(config=None)
 
@@ -759,6 +1237,56 @@ def test_local_container_executor_add_code_ids_uses_local_docker_image_if_provid
     mock_get_local_docker_image_id.assert_called_once_with('local')
 
 
+def test_local_container_executor_add_code_ids_gets_docker_image_id_only_once(mocker, monkeypatch):
+    monkeypatch.setattr(executor.BaseExecutor, 'add_code_identities', mocker.MagicMock())
+
+    mock_node = mocker.MagicMock()
+    mock_node._get_mode_config.return_value = {}
+
+    mock_get_local_docker_image_id = mocker.MagicMock(return_value='image id')
+    monkeypatch.setattr(executor.utils, 'get_local_docker_image_id', mock_get_local_docker_image_id)
+
+    local_container_executor = executor.LocalContainerExecutor(config={'docker_image': 'global'})
+    local_container_executor.run_log_store = mocker.MagicMock()
+
+    local_container_executor.add_code_identities(node=mock_node, step_log=mocker.MagicMock())
+    local_container_executor.add_code_identities(node=mock_node, step_log=mocker.MagicMock())
+
+    mock_get_local_docker_image_id.assert_called_once_with('global')
+
+
+@pytest.mark.parametrize('mode_config', [{}, {'docker_image': 'local'}, {'gpu': None}, {'other': None},
+                                         {'docker_image': None}, {'gpu': None, 'docker_image': 'local'},
+                                         {'docker_image': 'local', 'gpu': None}])
+def test_local_container_executor_resolve_docker_image_matches_resolve_node_config(mocker, mode_config):
+    config = {'docker_image': 'global',
+              'placeholders': {'gpu': {'docker_image': 'gpu image'}, 'other': {'k': 'v'}}}
+    local_container_executor = executor.LocalContainerExecutor(config=config)
+
+    mock_node = mocker.MagicMock()
+    mock_node._get_mode_config.return_value = mode_config
+
+    assert local_container_executor._resolve_docker_image(mock_node) == \
+        local_container_executor._resolve_node_config(mock_node).get('docker_image')
+
+
+def test_local_container_executor_add_code_ids_does_not_resolve_the_whole_node_config(mocker, monkeypatch):
+    monkeypatch.setattr(executor.BaseExecutor, 'add_code_identities', mocker.MagicMock())
+    mock_resolve_node_config = mocker.MagicMock()
+    monkeypatch.setattr(executor.LocalContainerExecutor, '_resolve_node_config', mock_resolve_node_config)
+    monkeypatch.setattr(executor.utils, 'get_local_docker_image_id', mocker.MagicMock())
+
+    mock_node = mocker.MagicMock()
+    mock_node._get_mode_config.return_value = {}
+
+    local_container_executor = executor.LocalContainerExecutor(config={'docker_image': 'global'})
+    local_container_executor.run_log_store = mocker.MagicMock()
+
+    local_container_executor.add_code_identities(node=mock_node, step_log=mocker.MagicMock())
+
+    assert mock_resolve_node_config.call_count == 0
+
+
 def test_local_container_executor_calls_spin_container_during_trigger_job(mocker, monkeypatch):
     mock_spin_container = mocker.MagicMock()
     mock_step_log = mocker.MagicMock()
@@ -795,3 +1323,256 @@ def test_local_container_executor_marks_step_fail_if_status_is_not_success(mocke
     local_container_executor.trigger_job(node=mock_node)
 
     assert mock_step_log.status == defaults.FAIL
+
+
+def test_local_container_executor_docker_client_is_created_once(mocker, monkeypatch):
+    mock_docker = mocker.MagicMock()
+    monkeypatch.setitem(sys.modules, 'docker', mock_docker)
+
+    local_container_executor = executor.LocalContainerExecutor(config={'docker_image': 'test'})
+
+    assert local_container_executor._docker_client is local_container_executor._docker_client
+    assert mock_docker.from_env.call_count == 1
+
+
+def test_local_container_executor_get_exec_container_starts_one_container_per_image(mocker, monkeypatch):
+    mock_client = mocker.MagicMock()
+    monkeypatch.setattr(executor.atexit, 'register', mocker.MagicMock())
+
+    local_container_executor = executor.LocalContainerExecutor(config={'docker_image': 'test'})
+    local_container_executor._docker_client = mock_client
+
+    container = local_container_executor._get_exec_container('test')
+    assert local_container_executor._get_exec_container('test') is container
+    local_container_executor._get_exec_container('other')
+
+    assert mock_client.containers.run.call_count == 2
+    _, kwargs = mock_client.containers.run.call_args
+    assert kwargs['entrypoint'] == ['sleep', 'infinity']
+
+
+def test_local_container_executor_send_return_code_stops_exec_containers(mocker, monkeypatch):
+    mock_container = mocker.MagicMock()
+    monkeypatch.setattr(executor.BaseExecutor, 'send_return_code', mocker.MagicMock())
+
+    local_container_executor = executor.LocalContainerExecutor(config={'docker_image': 'test'})
+    local_container_executor._exec_containers = {'test': mock_container}
+
+    local_container_executor.send_return_code()
+
+    assert mock_container.stop.call_count == 1
+    assert local_container_executor._exec_containers == {}
+
+
+def test_local_container_executor_spin_container_streams_the_container_logs(mocker, monkeypatch):
+    mock_client = mocker.MagicMock()
+    mock_client.api.logs.return_value = iter([b'line 1\n', b'line 2\n'])
+    mock_node = mocker.MagicMock()
+    mock_node._get_mode_config.return_value = {}
+
+    monkeypatch.setattr(executor.utils, 'get_node_execution_command', mocker.MagicMock(return_value='action'))
+
+    local_container_executor = executor.LocalContainerExecutor(config={'docker_image': 'test'})
+    local_container_executor._docker_client = mock_client
+
+    local_container_executor._spin_container(mock_node)
+
+    container = mock_client.containers.create.return_value
+    assert container.start.call_count == 1
+    mock_client.api.logs.assert_called_once_with(container.id, stream=True, follow=True, stdout=True, stderr=True)
+
+
+def test_base_executor__get_parameters_reads_the_run_log_store_once(mocker, monkeypatch):
+    mock_run_log_store = mocker.MagicMock()
+    mock_run_log_store.get_parameters.return_value = {'a': 1}
+
+    base_executor = executor.BaseExecutor(config=None)
+    base_executor.run_log_store = mock_run_log_store
+    base_executor.run_id = 'run_id'
+
+    assert base_executor._get_parameters() == {'a': 1}
+    assert base_executor._get_parameters() == {'a': 1}
+    assert mock_run_log_store.get_parameters.call_count == 1
+
+
+def test_base_executor__set_parameters_updates_the_cache_and_the_store(mocker, monkeypatch):
+    mock_run_log_store = mocker.MagicMock()
+    mock_run_log_store.get_parameters.return_value = {'a': 1}
+
+    base_executor = executor.BaseExecutor(config=None)
+    base_executor.run_log_store = mock_run_log_store
+    base_executor.run_id = 'run_id'
+
+    base_executor._get_parameters()
+    base_executor._set_parameters({'b': 2})
+
+    mock_run_log_store.set_parameters.assert_called_once_with(run_id='run_id', parameters={'b': 2})
+    assert base_executor._get_parameters() == {'a': 1, 'b': 2}
+    assert mock_run_log_store.get_parameters.call_count == 1
+
+
+def test_base_executor__invalidate_parameters_cache_reads_the_store_again(mocker, monkeypatch):
+    mock_run_log_store = mocker.MagicMock()
+    mock_run_log_store.get_parameters.return_value = {'a': 1}
+
+    base_executor = executor.BaseExecutor(config=None)
+    base_executor.run_log_store = mock_run_log_store
+    base_executor.run_id = 'run_id'
+
+    base_executor._get_parameters()
+    base_executor._invalidate_parameters_cache()
+    base_executor._get_parameters()
+
+    assert mock_run_log_store.get_parameters.call_count == 2
+
+
+def test_base_execution_prepare_for_node_configures_services_only_once(mocker, monkeypatch):
+    mock_integration = mocker.MagicMock()
+
+    monkeypatch.setattr(executor, 'integration', mock_integration)
+
+    base_executor = executor.BaseExecutor(config=None)
+
+    base_executor.prepare_for_node_execution()
+    base_executor.prepare_for_node_execution()
+
+    assert mock_integration.configure_for_execution.call_count == 3
+    assert mock_integration.validate.call_count == 3
+
+
+def test_base_execution_prepare_for_node_configures_replaced_services(mocker, monkeypatch):
+    mock_integration = mocker.MagicMock()
+
+    monkeypatch.setattr(executor, 'integration', mock_integration)
+
+    base_executor = executor.BaseExecutor(config=None)
+
+    base_executor.prepare_for_node_execution()
+    base_executor.run_log_store = mocker.MagicMock()
+    base_executor.prepare_for_node_execution()
+
+    assert mock_integration.configure_for_execution.call_count == 4
+    mock_integration.configure_for_execution.assert_called_with(base_executor, base_executor.run_log_store)
+
+
+def test_base_execution__invalidate_integration_cache_configures_services_again(mocker, monkeypatch):
+    mock_integration = mocker.MagicMock()
+
+    monkeypatch.setattr(executor, 'integration', mock_integration)
+
+    base_executor = executor.BaseExecutor(config=None)
+
+    base_executor.prepare_for_node_execution()
+    base_executor._invalidate_integration_cache()
+    base_executor.prepare_for_node_execution()
+
+    assert mock_integration.configure_for_execution.call_count == 6
+
+
+def test_demo_renderer_execute_graph_writes_bash_script(mocker, monkeypatch, tmp_path):
+    from magnus import graph
+
+    dag = graph.create_graph({
+        'start_at': 'step 1',
+        'steps': {
+            'step 1': {'type': 'task', 'command': 'ls', 'command_type': 'shell', 'next': 'success'},
+            'success': {'type': 'success'},
+            'fail': {'type': 'fail'},
+        }
+    })
+
+    monkeypatch.setattr(executor.utils, 'get_node_execution_command',
+                        mocker.MagicMock(side_effect=lambda executor, node, over_write_run_id: f'run {node.name}'))
+    monkeypatch.chdir(tmp_path)
+
+    demo_renderer = executor.DemoRenderer(config=None)
+    demo_renderer.execute_graph(dag=dag)
+
+    expected = (
+        'run step 1\n'
+        'exit_code=$?\necho $exit_code\n'
+        'if [ $exit_code -ne 0 ];\nthen\n'
+        '\t $(run fail)\n'
+        '\texit 1\n'
+        'fi\n'
+        'run success'
+    )
+    assert (tmp_path / 'demo-bash.sh').read_text() == expected
+
+
+def test_demo_renderer_execute_node_writes_the_step_log_once_before_execution(mocker, monkeypatch):
+    mock_run_log_store = mocker.MagicMock()
+    mock__execute_node = mocker.MagicMock()
+    mock_node = mocker.MagicMock()
+
+    monkeypatch.setattr(executor.DemoRenderer, '_set_up_run_log', mocker.MagicMock())
+    monkeypatch.setattr(executor.DemoRenderer, 'add_code_identities', mocker.MagicMock())
+    monkeypatch.setattr(executor.BaseExecutor, '_execute_node', mock__execute_node)
+
+    demo_renderer = executor.DemoRenderer(config=None)
+    demo_renderer.run_log_store = mock_run_log_store
+
+    demo_renderer.execute_node(node=mock_node)
+
+    step_log = mock_run_log_store.create_step_log.return_value
+    mock_run_log_store.add_step_log.assert_called_once_with(step_log, demo_renderer.run_id)
+    _, kwargs = mock__execute_node.call_args
+    assert kwargs['step_log'] == step_log
+
+
+def test_demo_renderer_execute_node_raises_exception_if_step_fails(mocker, monkeypatch):
+    mock_run_log_store = mocker.MagicMock()
+    mock_node = mocker.MagicMock()
+    mock_node.name = 'step'
+
+    monkeypatch.setattr(executor.DemoRenderer, '_set_up_run_log', mocker.MagicMock())
+    monkeypatch.setattr(executor.DemoRenderer, 'add_code_identities', mocker.MagicMock())
+    monkeypatch.setattr(executor.BaseExecutor, '_execute_node',
+                        mocker.MagicMock(return_value=datastore.StepLog(name='step', internal_name='step',
+                                                                        status=defaults.FAIL)))
+
+    demo_renderer = executor.DemoRenderer(config=None)
+    demo_renderer.run_log_store = mock_run_log_store
+
+    with pytest.raises(Exception, match='Step step failed'):
+        demo_renderer.execute_node(node=mock_node)
+
+    assert mock_run_log_store.get_step_log.call_count == 0
+
+
+def test_base_executor_send_return_code_raises_exception_if_run_failed(mocker, monkeypatch):
+    mock_run_log_store = mocker.MagicMock()
+    mock_run_log_store.get_run_status.return_value = defaults.FAIL
+
+    base_executor = executor.BaseExecutor(config=None)
+    base_executor.run_log_store = mock_run_log_store
+    base_executor.run_id = 'run_id'
+
+    with pytest.raises(Exception, match='Pipeline execution failed'):
+        base_executor.send_return_code()
+
+    mock_run_log_store.get_run_status.assert_called_once_with(run_id='run_id')
+    assert mock_run_log_store.get_run_log_by_id.call_count == 0
+
+
+def test_base_executor_execute_graph_raises_exception_if_node_is_visited_again(mocker, monkeypatch):
+    mock_dag = mocker.MagicMock()
+    mock_node = mocker.MagicMock()
+    mock_node.node_type = 'task'
+
+    mock_dag.start_at = 'step1'
+    mock_dag.get_node_by_name.return_value = mock_node
+
+    mock_execute_from_graph = mocker.MagicMock()
+    next_nodes = iter([(defaults.SUCCESS, 'step2'), (defaults.SUCCESS, 'step1')])
+
+    monkeypatch.setattr(executor.BaseExecutor, 'execute_from_graph', mock_execute_from_graph)
+    monkeypatch.setattr(executor.BaseExecutor, '_get_status_and_next_node_name',
+                        mocker.MagicMock(side_effect=lambda *args, **kwargs: next(next_nodes)))
+    base_executor = executor.BaseExecutor(config=None)
+    base_executor.run_log_store = mocker.MagicMock()
+
+    with pytest.raises(Exception, match='step1 is visited again'):
+        base_executor.execute_graph(dag=mock_dag)
+
+    assert mock_execute_from_graph.call_count == 2
@@ -1,3 +1,5 @@
+from types import MappingProxyType
+
 import pytest
 
 from magnus import defaults  # pylint: disable=import-error
@@ -6,6 +8,17 @@ from magnus import graph  # pylint: disable=import-error
 from magnus.nodes import AsISNode, BaseNode, FailNode, SuccessNode
 
 
+# Read only, so that no test can change the config seen by the others
+ONE_STEP_DAG_CONFIG = MappingProxyType({
+    'start_at': 'step1',
+    'steps': MappingProxyType({
+        'step1': MappingProxyType({
+            'type': 'test'
+        })
+    })
+})
+
+
 def get_new_graph(start_at='this', internal_branch_name='i_name'):
     return graph.Graph(start_at=start_at, internal_branch_name=internal_branch_name)
 
@@ -27,16 +40,24 @@ def dummy_node(name='a', internal_name='a.b', node_type='task'):
     return Node(name, internal_name, node_type)
 
 
-def test_init():
-    new_graph = graph.Graph(start_at='this', internal_branch_name='i_name')
-    assert new_graph.start_at == 'this'
-    assert new_graph.internal_branch_name == 'i_name'
+@pytest.fixture(scope='module')
+def success_dummy():
+    return Node(node_type='success')
 
 
-def test_init_default():
-    new_graph = graph.Graph(start_at='this')
+@pytest.fixture(scope='module')
+def fail_dummy():
+    return Node(node_type='fail')
+
+
+@pytest.mark.parametrize('kwargs, expected_internal_branch_name', [
+    ({'start_at': 'this', 'internal_branch_name': 'i_name'}, 'i_name'),
+    ({'start_at': 'this'}, ''),
+])
+def test_init(kwargs, expected_internal_branch_name):
+    new_graph = graph.Graph(**kwargs)
     assert new_graph.start_at == 'this'
-    assert new_graph.internal_branch_name is ''
+    assert new_graph.internal_branch_name == expected_internal_branch_name
     assert len(new_graph.nodes) == 0
 
 
@@ -50,6 +71,24 @@ def test_get_node_by_name_returns_node_if_match(new_graph, dummy_node):
     assert dummy_node == new_graph.get_node_by_name('a')
 
 
+def test_get_node_by_name_finds_nodes_added_after_a_lookup(new_graph, dummy_node):
+    new_graph.add_node(dummy_node)
+    new_graph.get_node_by_name('a')
+
+    another_node = Node(name='b', internal_name='b')
+    new_graph.nodes.append(another_node)
+    assert another_node == new_graph.get_node_by_name('b')
+
+
+def test_get_node_by_name_does_not_return_nodes_not_in_graph(new_graph, dummy_node):
+    new_graph.add_node(dummy_node)
+    new_graph.get_node_by_name('a')
+
+    new_graph.nodes = []
+    with pytest.raises(exceptions.NodeNotFoundError):
+        new_graph.get_node_by_name('a')
+
+
 def test_get_node_by_internal_name_raises_exception_if_no_match(new_graph):
     with pytest.raises(exceptions.NodeNotFoundError):
         new_graph.get_node_by_internal_name('a')
@@ -60,6 +99,24 @@ def test_get_node_by_internal_name_returns_node_if_match(new_graph, dummy_node):
     assert dummy_node == new_graph.get_node_by_internal_name('a.b')
 
 
+def test_get_node_by_internal_name_finds_nodes_added_after_a_lookup(new_graph, dummy_node):
+    new_graph.add_node(dummy_node)
+    new_graph.get_node_by_internal_name('a.b')
+
+    another_node = Node(name='b', internal_name='a.c')
+    new_graph.nodes.append(another_node)
+    assert another_node == new_graph.get_node_by_internal_name('a.c')
+
+
+def test_get_node_by_internal_name_does_not_return_nodes_not_in_graph(new_graph, dummy_node):
+    new_graph.add_node(dummy_node)
+    new_graph.get_node_by_internal_name('a.b')
+
+    new_graph.nodes = []
+    with pytest.raises(exceptions.NodeNotFoundError):
+        new_graph.get_node_by_internal_name('a.b')
+
+
 def test_add_node_adds_to_nodes(new_graph, dummy_node):
     new_graph.add_node(dummy_node)
     assert len(new_graph.nodes) == 1
@@ -71,11 +128,10 @@ def test_get_success_node_fails_if_none_present(new_graph):
         new_graph.get_success_node()
 
 
-def test_get_success_node_returns_success_node_if_present(new_graph):
-    new_node = Node(node_type='success')
-    new_graph.nodes.append(new_node)
+def test_get_success_node_returns_success_node_if_present(new_graph, success_dummy):
+    new_graph.nodes.append(success_dummy)
 
-    assert new_graph.get_success_node() == new_node
+    assert new_graph.get_success_node() == success_dummy
 
 
 def test_get_fail_node_fails_if_none_present(new_graph):
@@ -83,240 +139,164 @@ def test_get_fail_node_fails_if_none_present(new_graph):
         new_graph.get_fail_node()
 
 
-def test_get_fail_node_returns_success_node_if_present(new_graph):
-    new_node = Node(node_type='fail')
-    new_graph.nodes.append(new_node)
+def test_get_fail_node_returns_success_node_if_present(new_graph, fail_dummy):
+    new_graph.nodes.append(fail_dummy)
 
-    assert new_graph.get_fail_node() == new_node
+    assert new_graph.get_fail_node() == fail_dummy
 
 
-def test_is_start_node_present_returns_false_if_node_absent(monkeypatch, mocker):
-    monkeypatch.setattr(graph.Graph, 'get_node_by_name', mocker.MagicMock(
-        side_effect=exceptions.NodeNotFoundError('a')))
+def test_is_start_node_present_returns_false_if_node_absent():
     new_graph = get_new_graph(start_at='a')
     assert new_graph.is_start_node_present() == False
 
 
-def test_is_start_node_present_returns_true_if_node_present(mocker, monkeypatch):
-    monkeypatch.setattr(graph.Graph, 'get_node_by_name', mocker.MagicMock())
+def test_is_start_node_present_returns_true_if_node_present(dummy_node):
     new_graph = get_new_graph(start_at='a')
+    new_graph.add_node(dummy_node)
     assert new_graph.is_start_node_present() == True
 
 
-def test_success_node_validation_returns_false_if_neq_1(new_graph):
-    assert new_graph.success_node_validation() == False
-
+@pytest.mark.parametrize('count, expected', [(0, False), (2, False), (1, True)])
+def test_success_node_validation_returns_true_only_if_eq_1(new_graph, success_dummy, count, expected):
+    new_graph.nodes.extend([success_dummy] * count)
+    assert new_graph.success_node_validation() == expected
 
-def test_success_node_validation_returns_false_if_gr_1(new_graph):
-    node = Node(node_type='success')
-    new_graph.nodes.append(node)
-    new_graph.nodes.append(node)
-    assert new_graph.success_node_validation() == False
 
+@pytest.mark.parametrize('count, expected', [(0, False), (2, False), (1, True)])
+def test_fail_node_validation_returns_true_only_if_eq_1(new_graph, fail_dummy, count, expected):
+    new_graph.nodes.extend([fail_dummy] * count)
+    assert new_graph.fail_node_validation() == expected
 
-def test_success_node_validation_returns_true_if_eq_1(new_graph):
-    node = Node(node_type='success')
-    new_graph.nodes.append(node)
-    assert new_graph.success_node_validation() == True
 
+VALIDATE_METHODS = {
+    'missing_neighbors': [],
+    'is_dag': True,
+    'is_start_node_present': True,
+    'success_node_validation': True,
+    'fail_node_validation': True,
+}
 
-def test_fail_node_validation_returns_false_if_neq_1(new_graph):
-    assert new_graph.fail_node_validation() == False
 
+@pytest.mark.parametrize('failing_method, failing_value', [
+    ('is_dag', False),
+    ('is_start_node_present', False),
+    ('success_node_validation', False),
+    ('fail_node_validation', False),
+    ('missing_neighbors', ['missing']),
+])
+def test_validate_raises_exception_if_a_validation_fails(failing_method, failing_value, monkeypatch):
+    for method, value in VALIDATE_METHODS.items():
+        if method == failing_method:
+            value = failing_value
+        monkeypatch.setattr(graph.Graph, method, lambda self, value=value: value)
 
-def test_fail_node_validation_returns_false_if_gr_1(new_graph):
-    node = Node(node_type='fail')
-    new_graph.nodes.append(node)
-    new_graph.nodes.append(node)
-    assert new_graph.fail_node_validation() == False
-
-
-def test_fail_node_validation_returns_true_if_eq_1(new_graph):
-    node = Node(node_type='fail')
-    new_graph.nodes.append(node)
-    assert new_graph.fail_node_validation() == True
-
-
-def test_validate_does_not_raise_exception_if_all_pass(monkeypatch, mocker):
-    try:
-        monkeypatch.setattr(graph.Graph, 'missing_neighbors', mocker.MagicMock(return_value=[]))
-        monkeypatch.setattr(graph.Graph, 'is_dag', mocker.MagicMock(return_value=True))
-        monkeypatch.setattr(graph.Graph, 'is_start_node_present', mocker.MagicMock(return_value=True))
-        monkeypatch.setattr(graph.Graph, 'success_node_validation', mocker.MagicMock(return_value=True))
-        monkeypatch.setattr(graph.Graph, 'fail_node_validation', mocker.MagicMock(return_value=True))
-        new_graph = get_new_graph()
-        new_graph.validate()
-    except BaseException:
-        assert False
-
-
-def test_validate_raises_exception_if_is_dag_fails(mocker, monkeypatch):
-    with pytest.raises(Exception):
-        monkeypatch.setattr(graph.Graph, 'missing_neighbors', mocker.MagicMock(return_value=[]))
-        monkeypatch.setattr(graph.Graph, 'is_dag', mocker.MagicMock(return_value=False))
-        monkeypatch.setattr(graph.Graph, 'is_start_node_present', mocker.MagicMock(return_value=True))
-        monkeypatch.setattr(graph.Graph, 'success_node_validation', mocker.MagicMock(return_value=True))
-        monkeypatch.setattr(graph.Graph, 'fail_node_validation', mocker.MagicMock(return_value=True))
-        new_graph = get_new_graph()
-        new_graph.validate()
-
-
-def test_validate_raises_exception_if_is_start_node_present_fails(mocker, monkeypatch):
-    with pytest.raises(Exception):
-        monkeypatch.setattr(graph.Graph, 'missing_neighbors', mocker.MagicMock(return_value=[]))
-        monkeypatch.setattr(graph.Graph, 'is_dag', mocker.MagicMock(return_value=True))
-        monkeypatch.setattr(graph.Graph, 'is_start_node_present', mocker.MagicMock(return_value=False))
-        monkeypatch.setattr(graph.Graph, 'success_node_validation', mocker.MagicMock(return_value=True))
-        monkeypatch.setattr(graph.Graph, 'fail_node_validation', mocker.MagicMock(return_value=True))
-        new_graph = get_new_graph()
-        new_graph.validate()
-
-
-def test_validate_raises_exception_if_success_node_validation_fails(mocker, monkeypatch):
+    new_graph = get_new_graph()
     with pytest.raises(Exception):
-        monkeypatch.setattr(graph.Graph, 'missing_neighbors', mocker.MagicMock(return_value=[]))
-        monkeypatch.setattr(graph.Graph, 'is_dag', mocker.MagicMock(return_value=True))
-        monkeypatch.setattr(graph.Graph, 'is_start_node_present', mocker.MagicMock(return_value=True))
-        monkeypatch.setattr(graph.Graph, 'success_node_validation', mocker.MagicMock(return_value=False))
-        monkeypatch.setattr(graph.Graph, 'fail_node_validation', mocker.MagicMock(return_value=True))
-        new_graph = get_new_graph()
         new_graph.validate()
 
 
-def test_validate_raises_exception_if_fail_node_validation_fails(mocker, monkeypatch):
-    with pytest.raises(Exception):
-        monkeypatch.setattr(graph.Graph, 'missing_neighbors', mocker.MagicMock(return_value=[]))
-        monkeypatch.setattr(graph.Graph, 'is_dag', mocker.MagicMock(return_value=True))
-        monkeypatch.setattr(graph.Graph, 'is_start_node_present', mocker.MagicMock(return_value=True))
-        monkeypatch.setattr(graph.Graph, 'success_node_validation', mocker.MagicMock(return_value=True))
-        monkeypatch.setattr(graph.Graph, 'fail_node_validation', mocker.MagicMock(return_value=False))
-        new_graph = get_new_graph()
-        new_graph.validate()
+def test_validate_does_not_raise_exception_if_all_pass(monkeypatch):
+    for method, value in VALIDATE_METHODS.items():
+        monkeypatch.setattr(graph.Graph, method, lambda self, value=value: value)
 
-
-def test_validate_raises_exception_if_missing_neighbors(mocker, monkeypatch):
-    with pytest.raises(Exception):
-        monkeypatch.setattr(graph.Graph, 'missing_neighbors', mocker.MagicMock(return_value=['missing']))
-        monkeypatch.setattr(graph.Graph, 'is_dag', mocker.MagicMock(return_value=True))
-        monkeypatch.setattr(graph.Graph, 'is_start_node_present', mocker.MagicMock(return_value=True))
-        monkeypatch.setattr(graph.Graph, 'success_node_validation', mocker.MagicMock(return_value=True))
-        monkeypatch.setattr(graph.Graph, 'fail_node_validation', mocker.MagicMock(return_value=True))
-        new_graph = get_new_graph()
-        new_graph.validate()
+    new_graph = get_new_graph()
+    new_graph.validate()
 
 
-def test_create_graph_inits_graph_with_defaults(mocker, monkeypatch):
-    dag_config = {
-        'start_at': 'step1'
-    }
+@pytest.fixture
+def mocked_graph_init(mocker, monkeypatch):
     graph_init = mocker.MagicMock(return_value=None)
     monkeypatch.setattr(graph.Graph, '__init__', graph_init)
     monkeypatch.setattr(graph.Graph, 'validate', mocker.MagicMock())
+    monkeypatch.setattr(graph.Graph, 'add_node', mocker.MagicMock())
+    return graph_init
 
+
+@pytest.mark.parametrize('dag_config, expected_init_kwargs', [
+    ({'start_at': 'step1'},
+     {'start_at': 'step1', 'description': None, 'max_time': defaults.MAX_TIME}),
+    ({'start_at': 'step1', 'description': 'test', 'max_time': 1},
+     {'start_at': 'step1', 'description': 'test', 'max_time': 1}),
+])
+def test_create_graph_inits_graph_with_config(dag_config, expected_init_kwargs, mocked_graph_init):
     graph.create_graph(dag_config, internal_branch_name='i_name')
-    graph_init.assert_called_once_with(start_at='step1', description=None,
-                                       max_time=defaults.MAX_TIME, internal_branch_name='i_name')
+    mocked_graph_init.assert_called_once_with(internal_branch_name='i_name', **expected_init_kwargs)
 
 
-def test_create_graph_inits_graph_with_given_config(mocker, monkeypatch):
-    dag_config = {
-        'start_at': 'step1',
-        'description': 'test',
-        'max_time': 1
-    }
-    graph_init = mocker.MagicMock(return_value=None)
-    monkeypatch.setattr(graph.Graph, '__init__', graph_init)
-    monkeypatch.setattr(graph.Graph, 'validate', mocker.MagicMock())
+@pytest.mark.parametrize('internal_branch_name, expected_internal_name', [
+    (None, 'step1'),
+    ('i_name', 'i_name.step1'),
+])
+def test_create_graph_inits_graph_populates_nodes(internal_branch_name, expected_internal_name,
+                                                  mocked_graph_init, mocker, monkeypatch):
+    mock_node_class = mocker.MagicMock()
 
-    graph.create_graph(dag_config, internal_branch_name='i_name')
-    graph_init.assert_called_once_with(start_at='step1', description='test',
-                                       max_time=1, internal_branch_name='i_name')
-
-
-def test_create_graph_inits_graph_populates_nodes(mocker, monkeypatch):
-    dag_config = {
-        'start_at': 'step1',
-        'steps': {
-            'step1': {
-                'type': 'test'
-            }
-        }
-    }
-    graph_init = mocker.MagicMock(return_value=None)
-    monkeypatch.setattr(graph.Graph, '__init__', graph_init)
-    monkeypatch.setattr(graph.Graph, 'validate', mocker.MagicMock())
-    monkeypatch.setattr(graph.Graph, 'add_node', mocker.MagicMock())
+    monkeypatch.setattr(graph.utils, 'get_plugin_class', mocker.MagicMock(return_value=mock_node_class))
+    graph.create_graph(ONE_STEP_DAG_CONFIG, internal_branch_name=internal_branch_name)
 
-    mock_driver_manager = mocker.MagicMock()
+    _, kwargs = mock_node_class.call_args
+    assert kwargs['name'] == 'step1'
+    assert kwargs['internal_name'] == expected_internal_name
 
-    monkeypatch.setattr(graph.driver, 'DriverManager', mock_driver_manager)
-    graph.create_graph(dag_config, internal_branch_name=None)
 
-    _, kwargs = mock_driver_manager.call_args
-    assert kwargs['invoke_kwds']['name'] == 'step1'
-    assert kwargs['invoke_kwds']['internal_name'] == 'step1'
+@pytest.mark.usefixtures('mocked_graph_init')
+def test_create_graph_raises_exception_if_node_fails():
+    with pytest.raises(Exception):
+        graph.create_graph(ONE_STEP_DAG_CONFIG, internal_branch_name=None)
 
 
-def test_create_graph_inits_graph_populates_nodes_with_internal_branch(mocker, monkeypatch):
-    dag_config = {
-        'start_at': 'step1',
-        'steps': {
-            'step1': {
-                'type': 'test'
-            }
-        }
+@pytest.fixture
+def empty_graph():
+    return get_new_graph(start_at='start', internal_branch_name='')
+
+
+@pytest.fixture(scope='session')
+def graph_nodes():
+    """
+    Nodes of a start -> middle -> success pipeline, with every step failing to the fail node.
+
+    The graph tests only read the nodes, so they are built once and shared.
+    """
+    return {
+        'start': AsISNode(name='start', internal_name='start', config={'next_node': 'middle', 'on_failure': 'fail'}),
+        'middle': AsISNode(name='middle', internal_name='middle',
+                           config={'next_node': 'success', 'on_failure': 'fail'}),
+        'success': SuccessNode(name='success', internal_name='success', config={}),
+        'fail': FailNode(name='fail', internal_name='fail', config={}),
     }
-    graph_init = mocker.MagicMock(return_value=None)
-    monkeypatch.setattr(graph.Graph, '__init__', graph_init)
-    monkeypatch.setattr(graph.Graph, 'validate', mocker.MagicMock())
-    monkeypatch.setattr(graph.Graph, 'add_node', mocker.MagicMock())
 
-    mock_driver_manager = mocker.MagicMock()
-
-    monkeypatch.setattr(graph.driver, 'DriverManager', mock_driver_manager)
-    graph.create_graph(dag_config, internal_branch_name='i_name')
-
-    _, kwargs = mock_driver_manager.call_args
-    assert kwargs['invoke_kwds']['name'] == 'step1'
-    assert kwargs['invoke_kwds']['internal_name'] == 'i_name.step1'
 
+def test_is_dag_returns_true_when_acyclic(empty_graph, graph_nodes):
+    test_graph = empty_graph
+    start_node_config = {'next_node': 'middle', 'on_failure': ''}
+    start_node = AsISNode(name='start', internal_name='start', config=start_node_config)
 
-def test_create_graph_raises_exception_if_node_fails(mocker, monkeypatch):
-    dag_config = {
-        'start_at': 'step1',
-        'steps': {
-            'step1': {
-                'type': 'test'
-            }
-        }
-    }
-    graph_init = mocker.MagicMock(return_value=None)
-    monkeypatch.setattr(graph.Graph, '__init__', graph_init)
-    monkeypatch.setattr(graph.Graph, 'validate', mocker.MagicMock())
-    monkeypatch.setattr(graph.Graph, 'add_node', mocker.MagicMock())
+    middle_node_config = {'next_node': 'success', 'on_failure': ''}
+    middle_node = AsISNode(name='middle', internal_name='middle', config=middle_node_config)
 
-    with pytest.raises(Exception):
-        graph.create_graph(dag_config, internal_branch_name=None)
+    success_node = graph_nodes['success']
+    fail_node = graph_nodes['fail']
 
+    test_graph.nodes = [
+        start_node,
+        middle_node,
+        success_node,
+        fail_node
+    ]
 
-@pytest.fixture(name='mocked_graph')
-def create_mocked_graph(mocker):
-    mocked_graph_init = mocker.MagicMock(return_value=None)
-    mocker.patch.object(graph.Graph, '__init__', mocked_graph_init)
-    return graph.Graph()
+    assert test_graph.is_dag()
 
 
-def test_is_dag_returns_true_when_acyclic(mocked_graph):
-    test_graph = mocked_graph
-    start_node_config = {'next_node': 'middle', 'on_failure': ''}
+def test_compute_priorities_returns_the_longest_path_to_a_terminal_node(empty_graph, graph_nodes):
+    test_graph = empty_graph
+    start_node_config = {'next_node': 'middle', 'on_failure': 'fail'}
     start_node = AsISNode(name='start', internal_name='start', config=start_node_config)
 
     middle_node_config = {'next_node': 'success', 'on_failure': ''}
     middle_node = AsISNode(name='middle', internal_name='middle', config=middle_node_config)
 
-    success_node = SuccessNode(name='success', internal_name='success', config={})
-
-    fail_node = FailNode(name='fail', internal_name='fail', config={})
+    success_node = graph_nodes['success']
+    fail_node = graph_nodes['fail']
 
     test_graph.nodes = [
         start_node,
@@ -325,11 +305,11 @@ def test_is_dag_returns_true_when_acyclic(mocked_graph):
         fail_node
     ]
 
-    assert test_graph.is_dag()
+    assert test_graph.compute_priorities() == {'start': 3, 'middle': 2, 'success': 1, 'fail': 1}
 
 
-def test_is_dag_returns_true_when_on_failure_points_to_non_terminal_node_and_later_node(mocked_graph):
-    test_graph = mocked_graph
+def test_is_dag_returns_true_when_on_failure_points_to_non_terminal_node_and_later_node(empty_graph, graph_nodes):
+    test_graph = empty_graph
 
     start_node_config = {'next_node': 'middle', 'on_failure': ''}
     start_node = AsISNode(name='start', internal_name='start', config=start_node_config)
@@ -337,9 +317,8 @@ def test_is_dag_returns_true_when_on_failure_points_to_non_terminal_node_and_lat
     middle_node_config = {'next_node': 'success', 'on_failure': 'fail'}
     middle_node = AsISNode(name='middle', internal_name='middle', config=middle_node_config)
 
-    success_node = SuccessNode(name='success', internal_name='success', config={})
-
-    fail_node = FailNode(name='fail', internal_name='fail', config={})
+    success_node = graph_nodes['success']
+    fail_node = graph_nodes['fail']
 
     test_graph.nodes = [
         start_node,
@@ -350,8 +329,8 @@ def test_is_dag_returns_true_when_on_failure_points_to_non_terminal_node_and_lat
     assert test_graph.is_dag()
 
 
-def test_is_dag_returns_false_when_cyclic_in_next_nodes(mocked_graph):
-    test_graph = mocked_graph
+def test_is_dag_returns_false_when_cyclic_in_next_nodes(empty_graph, graph_nodes):
+    test_graph = empty_graph
 
     start_node_config = {'next_node': 'b', 'on_failure': 'fail'}
     start_node = AsISNode(name='start', internal_name='start', config=start_node_config)
@@ -365,7 +344,7 @@ def test_is_dag_returns_false_when_cyclic_in_next_nodes(mocked_graph):
     dnode_config = {'next_node': 'b', 'on_failure': 'fail'}
     dnode = AsISNode(name='d', internal_name='d', config=dnode_config)
 
-    fail_node = FailNode(name='fail', internal_name='fail', config={})
+    fail_node = graph_nodes['fail']
 
     test_graph.nodes = [
         start_node,
@@ -378,8 +357,8 @@ def test_is_dag_returns_false_when_cyclic_in_next_nodes(mocked_graph):
     assert not test_graph.is_dag()
 
 
-def test_is_dag_returns_false_when_fail_points_to_previous_node(mocked_graph):
-    test_graph = mocked_graph
+def test_is_dag_returns_false_when_fail_points_to_previous_node(empty_graph, graph_nodes):
+    test_graph = empty_graph
 
     start_config = {'next_node': 'b', 'on_failure': 'fail'}
     start_node = AsISNode(name='start', internal_name='start', config=start_config)
@@ -390,7 +369,7 @@ def test_is_dag_returns_false_when_fail_points_to_previous_node(mocked_graph):
     c_config = {'next_node': 'c', 'on_failure': 'b'}
     cnode = AsISNode(name='c', internal_name='c', config=c_config)
 
-    fail_node = FailNode(name='fail', internal_name='fail', config={})
+    fail_node = graph_nodes['fail']
     test_graph.nodes = [
         start_node,
         bnode,
@@ -401,18 +380,13 @@ def test_is_dag_returns_false_when_fail_points_to_previous_node(mocked_graph):
     assert not test_graph.is_dag()
 
 
-def test_missing_neighbors_empty_list_no_neigbors_missing(mocked_graph):
-    test_graph = mocked_graph
-
-    start_config = {'next_node': 'middle', 'on_failure': 'fail'}
-    start_node = AsISNode(name='start', internal_name='start', config=start_config)
-
-    middle_config = {'next_node': 'success', 'on_failure': 'fail'}
-    middle_node = AsISNode(name='middle', internal_name='middle', config=middle_config)
-
-    success_node = SuccessNode(name='success', internal_name='success', config={})
+def test_missing_neighbors_empty_list_no_neigbors_missing(empty_graph, graph_nodes):
+    test_graph = empty_graph
 
-    fail_node = FailNode(name='fail', internal_name='fail', config={})
+    start_node = graph_nodes['start']
+    middle_node = graph_nodes['middle']
+    success_node = graph_nodes['success']
+    fail_node = graph_nodes['fail']
 
     test_graph.nodes = [
         start_node,
@@ -425,16 +399,12 @@ def test_missing_neighbors_empty_list_no_neigbors_missing(mocked_graph):
     assert len(missing_nodes) == 0
 
 
-def test_missing_neighbors_list_of_missing_neighbor_one_missing_next(mocked_graph):
-    test_graph = mocked_graph
-
-    start_config = {'next_node': 'middle', 'on_failure': 'fail'}
-    start_node = AsISNode(name='start', internal_name='start', config=start_config)
+def test_missing_neighbors_list_of_missing_neighbor_one_missing_next(empty_graph, graph_nodes):
+    test_graph = empty_graph
 
-    middle_config = {'next_node': 'success', 'on_failure': 'fail'}
-    middle_node = AsISNode(name='middle', internal_name='middle', config=middle_config)
-
-    fail_node = FailNode(name='fail', internal_name='fail', config={})
+    start_node = graph_nodes['start']
+    middle_node = graph_nodes['middle']
+    fail_node = graph_nodes['fail']
 
     test_graph.nodes = [
         start_node,
@@ -447,18 +417,13 @@ def test_missing_neighbors_list_of_missing_neighbor_one_missing_next(mocked_grap
     assert missing_nodes[0] == 'success'
 
 
-def test_missing_list_of_missing_neighbor_one_missing_on_failure(mocked_graph):
-    test_graph = mocked_graph
-
-    start_config = {'next_node': 'middle', 'on_failure': 'fail'}
-    start_node = AsISNode(name='start', internal_name='start', config=start_config)
+def test_missing_list_of_missing_neighbor_one_missing_on_failure(empty_graph, graph_nodes):
+    test_graph = empty_graph
 
-    middle_config = {'next_node': 'success', 'on_failure': 'fail'}
-    middle_node = AsISNode(name='middle', internal_name='middle', config=middle_config)
-
-    success_node = SuccessNode(name='success', internal_name='success', config={})
-
-    fail_node = FailNode(name='fail', internal_name='fail', config={})
+    start_node = graph_nodes['start']
+    middle_node = graph_nodes['middle']
+    success_node = graph_nodes['success']
+    fail_node = graph_nodes['fail']
 
     test_graph.nodes = [
         start_node,
@@ -471,18 +436,13 @@ def test_missing_list_of_missing_neighbor_one_missing_on_failure(mocked_graph):
     assert missing_nodes[0] == 'fail'
 
 
-def test_missing_list_of_missing_neighbor_two_missing(mocked_graph):
-    test_graph = mocked_graph
-
-    start_config = {'next_node': 'middle', 'on_failure': 'fail'}
-    start_node = AsISNode(name='start', internal_name='start', config=start_config)
-
-    middle_config = {'next_node': 'success', 'on_failure': 'fail'}
-    middle_node = AsISNode(name='middle', internal_name='middle', config=middle_config)
-
-    success_node = SuccessNode(name='success', internal_name='success', config={})
+def test_missing_list_of_missing_neighbor_two_missing(empty_graph, graph_nodes):
+    test_graph = empty_graph
 
-    fail_node = FailNode(name='fail', internal_name='fail', config={})
+    start_node = graph_nodes['start']
+    middle_node = graph_nodes['middle']
+    success_node = graph_nodes['success']
+    fail_node = graph_nodes['fail']
 
     test_graph.nodes = [
         start_node,
@@ -1,7 +1,9 @@
 import os
+from datetime import datetime
 
 import pytest
 
+from magnus import datastore  # pylint: disable=import-error
 from magnus import defaults  # pylint: disable=import-error
 from magnus import nodes  # pylint: disable=import-error
 
@@ -15,6 +17,19 @@ def test_base_node__command_friendly_name_replaces_whitespace_with_character():
     assert node._command_friendly_name() == 'test' + defaults.COMMAND_FRIENDLY_CHARACTER
 
 
+def test_base_node_validate_reads_the_config_once(mocker, monkeypatch):
+    monkeypatch.setattr(nodes.BaseNode, 'required_fields', ['a', 'b'])
+    monkeypatch.setattr(nodes.BaseNode, 'errors_on', ['mode_config'])
+    node = nodes.BaseNode(name='test', internal_name='test', config={})
+    mock_dict = mocker.MagicMock(return_value={'a': 1, 'mode_config': {}})
+    monkeypatch.setattr(nodes.BaseNode.Config, 'dict', mock_dict)
+
+    messages = node.validate()
+
+    assert messages == ['test should have b field', 'test should not have mode_config field']
+    assert mock_dict.call_count == 1
+
+
 def test_base_node__get_internal_name_from_command_name_replaces_character_with_whitespace():
     assert nodes.BaseNode._get_internal_name_from_command_name('test') == 'test'
 
@@ -42,6 +57,48 @@ def test_base_node__get_step_log_name_returns_map_modified_internal_name_if_map_
     assert node._get_step_log_name(map_variable={'map_key': 'a', 'map_key1': 'b'}) == 'test.a.step.b'
 
 
+def test_base_node__resolve_map_placeholders_returns_name_if_no_placeholder():
+    resolved = nodes.BaseNode._resolve_map_placeholders('a.b', map_variable={'x': 'y'})
+
+    assert resolved == 'a.b'
+
+
+def test_base_node__resolve_map_placeholders_replaces_placeholders_in_order():
+    name = 'a.' + defaults.MAP_PLACEHOLDER + '.b.' + defaults.MAP_PLACEHOLDER
+    resolved = nodes.BaseNode._resolve_map_placeholders(name, map_variable={'x': '1', 'y': '2'})
+
+    assert resolved == 'a.1.b.2'
+
+
+def test_base_node__resolve_map_placeholders_leaves_placeholders_without_map_variable():
+    name = 'a.' + defaults.MAP_PLACEHOLDER + '.b.' + defaults.MAP_PLACEHOLDER
+    resolved = nodes.BaseNode._resolve_map_placeholders(name, map_variable={'x': '1'})
+
+    assert resolved == 'a.1.b.' + defaults.MAP_PLACEHOLDER
+
+
+def test_base_node__get_step_log_name_resolves_placeholders_once_per_map_variable(mocker, monkeypatch):
+    node = nodes.BaseNode(name='test', internal_name='test.' + defaults.MAP_PLACEHOLDER,
+                          config={})
+    mock_resolve = mocker.MagicMock(return_value='test.a')
+    monkeypatch.setattr(nodes.BaseNode, '_resolve_map_placeholders', mock_resolve)
+
+    assert node._get_step_log_name(map_variable={'map_key': 'a'}) == 'test.a'
+    assert node._get_step_log_name(map_variable={'map_key': 'a'}) == 'test.a'
+    assert mock_resolve.call_count == 1
+
+
+def test_base_node__get_step_log_name_remembers_only_the_recent_map_variables(monkeypatch):
+    monkeypatch.setattr(nodes.defaults, 'MAX_RESOLVED_LOG_NAMES', 2)
+    node = nodes.BaseNode(name='test', internal_name='test.' + defaults.MAP_PLACEHOLDER,
+                          config={})
+
+    for value in ['a', 'b', 'a', 'c']:
+        node._get_step_log_name(map_variable={'map_key': value})
+
+    assert list(node._resolved_names.values()) == ['test.a', 'test.c']
+
+
 def test_base_node__get_branch_log_name_returns_null_if_not_set():
     node = nodes.BaseNode(name='test', internal_name='test', config={})
 
@@ -91,6 +148,69 @@ def test_base_node_execute_as_graph_raises_not_implemented_error():
         node.execute_as_graph(executor='test')
 
 
+def test_base_node__run_attempt_marks_attempt_fail_if_action_fails(mocker):
+    mock_executor = mocker.MagicMock()
+    mock_executor.run_log_store.create_attempt_log.return_value = datastore.StepAttempt()
+
+    node = nodes.BaseNode(name='test', internal_name='test', config={})
+    attempt_log = node._run_attempt(mock_executor, mocker.MagicMock(side_effect=Exception('failed')))
+
+    assert attempt_log.status == defaults.FAIL
+    assert attempt_log.message == 'failed'
+
+
+def test_base_node__run_attempt_marks_attempt_success_if_ignoring_errors(mocker):
+    mock_executor = mocker.MagicMock()
+    mock_executor.run_log_store.create_attempt_log.return_value = datastore.StepAttempt()
+
+    node = nodes.BaseNode(name='test', internal_name='test', config={})
+    attempt_log = node._run_attempt(mock_executor, mocker.MagicMock(side_effect=Exception('failed')),
+                                    ignore_errors=True)
+
+    assert attempt_log.status == defaults.SUCCESS
+    assert attempt_log.end_time
+
+
+def test_base_node__finalize_step_marks_step_fail_if_any_branch_failed():
+    node = nodes.BaseNode(name='test', internal_name='test', config={})
+    step_log = datastore.StepLog(name='test', internal_name='test')
+
+    node._finalize_step(step_log, [defaults.SUCCESS, defaults.PROCESSING, defaults.FAIL])
+
+    assert step_log.status == defaults.FAIL
+
+
+def test_base_node__finalize_step_marks_step_processing_if_any_branch_is_processing():
+    node = nodes.BaseNode(name='test', internal_name='test', config={})
+    step_log = datastore.StepLog(name='test', internal_name='test')
+
+    node._finalize_step(step_log, [defaults.SUCCESS, defaults.PROCESSING])
+
+    assert step_log.status == defaults.PROCESSING
+
+
+def test_base_node__finalize_step_marks_step_success_if_all_branches_succeeded():
+    node = nodes.BaseNode(name='test', internal_name='test', config={})
+    step_log = datastore.StepLog(name='test', internal_name='test')
+
+    node._finalize_step(step_log, [defaults.SUCCESS, defaults.SUCCESS])
+
+    assert step_log.status == defaults.SUCCESS
+
+
+def test_base_node__get_neighbors_returns_next_and_on_failure_nodes():
+    node = nodes.TaskNode(name='test', internal_name='test',
+                          config={'command': 'test', 'next': 'next_node', 'on_failure': 'fail_node'})
+
+    assert node._get_neighbors() == ('next_node', 'fail_node')
+
+
+def test_base_node__get_neighbors_returns_empty_for_terminal_node():
+    node = nodes.SuccessNode(name='success', internal_name='success', config={})
+
+    assert node._get_neighbors() == ()
+
+
 def test_task_node_mocks_if_mock_is_true(mocker, monkeypatch):
     mock_attempt_log = mocker.MagicMock()
 
@@ -105,6 +225,25 @@ def test_task_node_mocks_if_mock_is_true(mocker, monkeypatch):
     assert mock_attempt_log.status == defaults.SUCCESS
 
 
+def test_task_node_sets_attempt_log_duration_from_start_and_end_time(mocker, monkeypatch):
+    start, end = datetime(2022, 1, 1, 10, 0, 0), datetime(2022, 1, 1, 10, 0, 1, 500000)
+    mock_datetime = mocker.MagicMock()
+    mock_datetime.now.side_effect = [start, end]
+    monkeypatch.setattr(nodes, 'datetime', mock_datetime)
+
+    mock_executor = mocker.MagicMock()
+    mock_executor.run_log_store.create_attempt_log.return_value = datastore.StepAttempt()
+
+    configuration = {'command': 'test', 'next': 'next_node'}
+    task_node = nodes.TaskNode(name='test', internal_name='test', config=configuration)
+
+    attempt_log = task_node.execute(executor=mock_executor, mock=True)
+
+    assert attempt_log.start_time == str(start)
+    assert attempt_log.end_time == str(end)
+    assert attempt_log.duration == '0:00:01.500000'
+
+
 def test_task_node_sets_attempt_log_fail_in_exception_of_execution(mocker, monkeypatch):
     mock_attempt_log = mocker.MagicMock()
 
@@ -247,6 +386,27 @@ def test_parallel_node_get_sub_graphs_creates_graphs(mocker, monkeypatch):
     assert len(node.branches.items()) == 2
 
 
+def test_parallel_node_get_sub_graphs_raises_exception_before_creating_graphs_if_no_branches(mocker, monkeypatch):
+    mock_create_graph = mocker.MagicMock()
+    monkeypatch.setattr(nodes, 'create_graph', mock_create_graph)
+
+    with pytest.raises(Exception, match='should have branches'):
+        nodes.ParallelNode(name='test', internal_name='test', config={'branches': {}, 'next': 'next_node'})
+
+    assert mock_create_graph.call_count == 0
+
+
+def test_parallel_node_get_sub_graphs_names_branches_by_dot_path(mocker, monkeypatch):
+    mock_create_graph = mocker.MagicMock(return_value='agraphobject')
+    monkeypatch.setattr(nodes, 'create_graph', mock_create_graph)
+
+    parallel_config = {'branches': {'a': {}}, 'next': 'next_node'}
+    node = nodes.ParallelNode(name='test', internal_name='test', config=parallel_config)
+
+    assert node.branches == {'test.a': 'agraphobject'}
+    mock_create_graph.assert_called_once_with({}, internal_branch_name='test.a')
+
+
 def test_parallel_node__get_branch_by_name_raises_exception_if_branch_not_found(mocker, monkeypatch):
     monkeypatch.setattr(nodes.ParallelNode, 'get_sub_graphs', mocker.MagicMock())
 
@@ -281,6 +441,57 @@ def test_parallel_node__get_branch_by_name_returns_branch_if_found(mocker, monke
     assert node._get_branch_by_name('a') == 'somegraph'
 
 
+def test_parallel_node_execute_as_graph_adds_and_gets_branch_logs_together(mocker, monkeypatch):
+    monkeypatch.setattr(nodes.ParallelNode, 'get_sub_graphs', mocker.MagicMock())
+
+    parallel_config = {
+        'branches': {
+            'a': {},
+            'b': {}
+        },
+        'next': 'next_node'
+    }
+
+    node = nodes.ParallelNode(name='test', internal_name='test', config=parallel_config)
+    node.branches = {'test.a': 'graph a', 'test.b': 'graph b'}
+
+    mock_success_log = mocker.MagicMock()
+    mock_success_log.status = defaults.SUCCESS
+    mock_executor = mocker.MagicMock()
+    mock_executor.run_log_store.get_branch_logs.return_value = {'test.a': mock_success_log,
+                                                                'test.b': mock_success_log}
+
+    step_log = node.execute_as_graph(mock_executor)
+
+    branch_logs, _ = mock_executor.run_log_store.add_branch_logs.call_args[0]
+    assert len(branch_logs) == 2
+    mock_executor.run_log_store.get_branch_logs.assert_called_once_with(['test.a', 'test.b'], mock_executor.run_id)
+    assert step_log.status == defaults.SUCCESS
+
+
+def test_map_node_execute_as_graph_adds_and_gets_branch_logs_together(mocker, monkeypatch):
+    monkeypatch.setattr(nodes.MapNode, 'get_sub_graph', mocker.MagicMock(return_value='graph'))
+
+    map_config = {'branch': {}, 'iterate_on': 'xs', 'iterate_as': 'x', 'next': 'next_node'}
+    node = nodes.MapNode(name='test', internal_name='test', config=map_config)
+
+    mock_success_log = mocker.MagicMock()
+    mock_success_log.status = defaults.SUCCESS
+    mock_executor = mocker.MagicMock()
+    mock_executor.run_log_store.get_run_log_by_id.return_value.parameters = {'xs': ['a', 'b']}
+    mock_executor.run_log_store.get_branch_logs.return_value = {'test.a': mock_success_log,
+                                                                'test.b': mock_success_log}
+
+    step_log = node.execute_as_graph(mock_executor)
+
+    branch_logs, _ = mock_executor.run_log_store.add_branch_logs.call_args[0]
+    assert len(branch_logs) == 2
+    mock_executor.run_log_store.get_branch_logs.assert_called_once_with(['test.a', 'test.b'], mock_executor.run_id)
+    branches, = mock_executor._execute_branches.call_args[0]
+    assert branches == [('graph', {'x': 'a'}), ('graph', {'x': 'b'})]
+    assert step_log.status == defaults.SUCCESS
+
+
 def test_parallel_node_execute_raises_exception(mocker, monkeypatch):
     monkeypatch.setattr(nodes.ParallelNode, 'get_sub_graphs', mocker.MagicMock())
 
@@ -0,0 +1,96 @@
+import multiprocessing
+
+import pytest
+import ruamel.yaml
+
+from magnus import datastore  # pylint: disable=import-error
+from magnus import pipeline  # pylint: disable=import-error
+
+yaml = ruamel.yaml.YAML()
+
+
+@pytest.fixture
+def pipeline_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, '_graphs_by_run', {})
+    dag = {
+        'dag': {
+            'start_at': 'first',
+            'steps': {
+                'first': {'type': 'as-is', 'next': 'success'},
+                'success': {'type': 'success'},
+                'fail': {'type': 'fail'},
+            }
+        }
+    }
+    pipeline_file_path = tmp_path / 'dag.yaml'
+    with open(pipeline_file_path, 'wb') as f:
+        yaml.dump(dag, f)
+    return str(pipeline_file_path)
+
+
+def test_prepare_configurations_creates_the_graph_once_per_run(pipeline_file, mocker, monkeypatch):
+    mock_create_graph = mocker.MagicMock(wraps=pipeline.graph.create_graph)
+    monkeypatch.setattr(pipeline.graph, 'create_graph', mock_create_graph)
+
+    first_branch_executor = pipeline.prepare_configurations(pipeline_file=pipeline_file, run_id='run')
+    second_branch_executor = pipeline.prepare_configurations(pipeline_file=pipeline_file, run_id='run')
+
+    assert mock_create_graph.call_count == 1
+    assert first_branch_executor.dag is second_branch_executor.dag
+
+
+def test_prepare_configurations_does_not_share_the_graph_across_runs(pipeline_file):
+    first_run_executor = pipeline.prepare_configurations(pipeline_file=pipeline_file, run_id='first run')
+    first_node = first_run_executor.dag.get_node_by_name('first')
+    first_node._resolve_log_name(first_node.internal_name, map_variable=None)
+
+    second_run_executor = pipeline.prepare_configurations(pipeline_file=pipeline_file, run_id='second run')
+    second_node = second_run_executor.dag.get_node_by_name('first')
+
+    assert second_run_executor.dag is not first_run_executor.dag
+    assert second_node is not first_node
+    assert not second_node._resolved_names
+    assert len(pipeline._graphs_by_run) == 1
+
+
+def test_execute_single_branch_uses_the_underlying_run_log_store_of_batched_writes(mocker, monkeypatch):
+    mock_run_log_store = mocker.MagicMock()
+    mock_executor = mocker.MagicMock()
+    mock_executor.run_log_store = datastore.BatchedRunLogStore(mock_run_log_store)
+    monkeypatch.setattr(pipeline, 'prepare_configurations', mocker.MagicMock(return_value=mock_executor))
+    monkeypatch.setattr(pipeline.utils, 'set_magnus_environment_variables', mocker.MagicMock())
+    monkeypatch.setattr(pipeline.graph, 'search_branch_by_internal_name', mocker.MagicMock())
+
+    pipeline.execute_single_brach(configuration_file='', pipeline_file='', branch_name='branch', map_variable='{}',
+                                  run_id='run')
+
+    assert mock_executor.run_log_store is mock_run_log_store
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs the fork start method')
+def test_execute_single_branch_in_a_forked_worker_does_not_replay_the_pending_writes_of_the_parent(
+        mocker, monkeypatch, tmp_path):
+    parent_run_log_store = datastore.BatchedRunLogStore(
+        datastore.FileSystemRunLogstore(config={'log_folder': str(tmp_path)}))
+    parent_run_log_store.put_run_log(run_log=datastore.RunLog(run_id='parent'))
+    parent_executor = mocker.MagicMock()
+    parent_executor.run_log_store = parent_run_log_store
+    monkeypatch.setattr(pipeline, 'global_executor', parent_executor)
+
+    monkeypatch.setattr(pipeline, 'prepare_configurations', mocker.MagicMock())
+    monkeypatch.setattr(pipeline.utils, 'set_magnus_environment_variables', mocker.MagicMock())
+    monkeypatch.setattr(pipeline.graph, 'search_branch_by_internal_name', mocker.MagicMock())
+
+    def worker():
+        pipeline.execute_single_brach(configuration_file='', pipeline_file='', branch_name='branch',
+                                      map_variable='{}', run_id='run')
+        # The inherited executor of the parent is still reachable in the worker
+        parent_run_log_store.flush()
+
+    process = multiprocessing.get_context('fork').Process(target=worker)
+    process.start()
+    process.join()
+
+    assert process.exitcode == 0
+    assert list(tmp_path.iterdir()) == []
+    assert parent_run_log_store._pending_writes == 1
@@ -1,5 +1,6 @@
 import contextlib
 import os
+import subprocess
 
 import pytest
 
@@ -11,6 +12,11 @@ def configuration():
     return {'command': 'dummy'}
 
 
+@pytest.fixture(autouse=True)
+def clear_python_functions(monkeypatch):
+    monkeypatch.setattr(tasks, '_python_functions', {})
+
+
 def test_base_task_execute_command_raises_not_implemented_error(configuration):
     base_execution_type = tasks.BaseTaskType(configuration)
 
@@ -63,6 +69,42 @@ def test_python_task_command_raises_exception_if_function_fails(mocker, monkeypa
         py_exec.execute_command()
 
 
+def test_python_task_get_function_imports_the_module_only_once(mocker, monkeypatch, configuration):
+    class DummyModule:
+        def func(self):
+            pass
+    mock_import_module = mocker.MagicMock(return_value=DummyModule())
+
+    monkeypatch.setattr(tasks.utils, 'get_module_and_func_names', mocker.MagicMock(return_value=('idk', 'func')))
+    monkeypatch.setattr(tasks.importlib, 'import_module', mock_import_module)
+
+    py_exec = tasks.PythonTaskType(configuration)
+    first = py_exec._get_function()
+    second = tasks.PythonTaskType(configuration)._get_function()
+
+    assert first == second
+    mock_import_module.assert_called_once_with('idk')
+
+
+def test_python_task_command_parses_the_command_only_once(mocker, monkeypatch, configuration):
+    class DummyModule:
+        def func(self):
+            pass
+    mock_get_module_and_func_names = mocker.MagicMock(return_value=('idk', 'func'))
+
+    monkeypatch.setattr(tasks.utils, 'get_module_and_func_names', mock_get_module_and_func_names)
+    monkeypatch.setattr(tasks.importlib, 'import_module', mocker.MagicMock(return_value=DummyModule()))
+    monkeypatch.setattr(tasks, 'output_to_file', contextlib.nullcontext)
+    monkeypatch.setattr(tasks.utils, 'filter_arguments_for_func', mocker.MagicMock(return_value={}))
+    monkeypatch.setattr(tasks.BaseTaskType, '_get_parameters', mocker.MagicMock(return_value={}))
+
+    py_exec = tasks.PythonTaskType(configuration)
+    py_exec.execute_command()
+    py_exec.execute_command()
+
+    mock_get_module_and_func_names.assert_called_once_with(py_exec.command)
+
+
 def test_python_task_command_calls_with_no_parameters_if_none_sent(mocker, monkeypatch, configuration):
     dummy_func = mocker.MagicMock(return_value=None)
 
@@ -173,3 +215,26 @@ def test_notebook_raises_exception_if_ploomber_is_not_installed(mocker, monkeypa
 
     with pytest.raises(Exception):
         task_exec.execute_command()
+
+
+def test_shell_task_command_streams_the_output(capsys):
+    shell_exec = tasks.ShellTaskType({'command': 'echo hello; echo world 1>&2'})
+
+    shell_exec.execute_command()
+
+    assert capsys.readouterr().out == 'hello\nworld\n'
+
+
+def test_shell_task_command_sends_map_variable_as_environment_variable(capsys):
+    shell_exec = tasks.ShellTaskType({'command': f'echo ${defaults.PARAMETER_PREFIX}MAP_VARIABLE'})
+
+    shell_exec.execute_command(map_variable={'x': 'a'})
+
+    assert capsys.readouterr().out == '{"x": "a"}\n'
+
+
+def test_shell_task_command_raises_exception_if_command_fails():
+    shell_exec = tasks.ShellTaskType({'command': 'exit 1'})
+
+    with pytest.raises(subprocess.CalledProcessError):
+        shell_exec.execute_command()
@@ -130,6 +130,32 @@ def test_load_yaml_returns_from_yaml_load(mocker, monkeypatch):
     assert 'test' == utils.load_yaml('does not matter')
 
 
+def test_load_yaml_parses_an_unmodified_file_once(mocker, monkeypatch, tmp_path):
+    monkeypatch.setattr(utils, '_loaded_yamls', {})
+    yaml_file = tmp_path / 'test.yaml'
+    yaml_file.write_text('a: 1')
+    mock_yaml_class = mocker.MagicMock(wraps=utils.YAML)
+    monkeypatch.setattr(utils, 'YAML', mock_yaml_class)
+
+    first = utils.load_yaml(str(yaml_file))
+    first['a'] = 2
+    second = utils.load_yaml(str(yaml_file))
+
+    assert second == {'a': 1}
+    assert mock_yaml_class.call_count == 1
+
+
+def test_load_yaml_parses_a_modified_file_again(monkeypatch, tmp_path):
+    monkeypatch.setattr(utils, '_loaded_yamls', {})
+    yaml_file = tmp_path / 'test.yaml'
+    yaml_file.write_text('a: 1')
+
+    assert utils.load_yaml(str(yaml_file)) == {'a': 1}
+
+    yaml_file.write_text('a: 10')
+    assert utils.load_yaml(str(yaml_file)) == {'a': 10}
+
+
 def test_is_a_git_repo_suppresses_exceptions(mocker, monkeypatch):
     mock_subprocess = mocker.MagicMock(side_effect=Exception())
 
@@ -360,13 +386,25 @@ def test_get_tracked_data_removes_the_data_if_prefix_match_remove(monkeypatch):
     assert defaults.TRACK_PREFIX + 'key' not in os.environ
 
 
+def test_reset_tracked_state_removes_tracked_data_and_parameters(monkeypatch):
+    monkeypatch.setenv(defaults.TRACK_PREFIX + 'key', 'not json')
+    monkeypatch.setenv(defaults.PARAMETER_PREFIX + 'key', '1')
+    monkeypatch.setenv('random', 'value')
+
+    utils.reset_tracked_state()
+
+    assert defaults.TRACK_PREFIX + 'key' not in os.environ
+    assert defaults.PARAMETER_PREFIX + 'key' not in os.environ
+    assert os.environ['random'] == 'value'
+
+
 def test_get_local_docker_image_id_gets_image_from_docker_client(mocker, monkeypatch):
     mock_client = mocker.MagicMock()
     mock_docker = mocker.MagicMock()
 
     mock_docker.from_env.return_value = mock_client
 
-    monkeypatch.setattr(utils, 'docker', mock_docker)
+    monkeypatch.setitem(sys.modules, 'docker', mock_docker)
 
     class MockImage:
         attrs = {'Id': 'I am a docker image ID'}
@@ -381,7 +419,7 @@ def test_get_local_docker_image_id_returns_none_in_exception(mocker, monkeypatch
 
     mock_docker.from_env.return_value = mock_client
 
-    monkeypatch.setattr(utils, 'docker', mock_docker)
+    monkeypatch.setitem(sys.modules, 'docker', mock_docker)
 
     mock_client.images.get = mocker.MagicMock(side_effect=Exception('No Image exists'))
 
@@ -516,3 +554,49 @@ def test_get_node_execution_command_returns_magnus_execute_appends_map_variable(
 def test_get_service_base_class_throws_exception_for_unknown_service():
     with pytest.raises(Exception):
         utils.get_service_base_class('Does not exist')
+
+
+def test_get_plugin_class_looks_up_the_plugin_once(mocker, monkeypatch):
+    mock_driver_manager = mocker.MagicMock()
+    monkeypatch.setattr(utils.driver, 'DriverManager', mock_driver_manager)
+    utils.get_plugin_class.cache_clear()
+
+    assert utils.get_plugin_class('namespace', 'name') == mock_driver_manager.return_value.driver
+    assert utils.get_plugin_class('namespace', 'name') == mock_driver_manager.return_value.driver
+
+    mock_driver_manager.assert_called_once_with(namespace='namespace', name='name', invoke_on_load=False)
+    utils.get_plugin_class.cache_clear()
+
+
+def test_get_plugin_class_does_not_remember_failures(mocker, monkeypatch):
+    mock_driver_manager = mocker.MagicMock(side_effect=[Exception('not found'), mocker.MagicMock()])
+    monkeypatch.setattr(utils.driver, 'DriverManager', mock_driver_manager)
+    utils.get_plugin_class.cache_clear()
+
+    with pytest.raises(Exception):
+        utils.get_plugin_class('namespace', 'name')
+    utils.get_plugin_class('namespace', 'name')
+
+    assert mock_driver_manager.call_count == 2
+    utils.get_plugin_class.cache_clear()
+
+
+def test_effective_cpu_count_prefers_slurm_allocation(monkeypatch):
+    monkeypatch.setenv('SLURM_CPUS_ON_NODE', '3')
+
+    assert utils.effective_cpu_count() == 3
+
+
+def test_effective_cpu_count_uses_cpu_affinity_if_no_slurm(mocker, monkeypatch):
+    monkeypatch.delenv('SLURM_CPUS_ON_NODE', raising=False)
+    monkeypatch.setattr(utils.os, 'sched_getaffinity', mocker.MagicMock(return_value={0, 1}), raising=False)
+
+    assert utils.effective_cpu_count() == 2
+
+
+def test_effective_cpu_count_falls_back_to_cpu_count(mocker, monkeypatch):
+    monkeypatch.delenv('SLURM_CPUS_ON_NODE', raising=False)
+    monkeypatch.delattr(utils.os, 'sched_getaffinity', raising=False)
+    monkeypatch.setattr(utils.os, 'cpu_count', mocker.MagicMock(return_value=None))
+
+    assert utils.effective_cpu_count() == 1
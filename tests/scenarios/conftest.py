@@ -100,3 +100,28 @@ def parallel_fail_graph(as_is_node, parallel_node, fail_graph):
         dag.add_terminal_nodes()
         return dag
     return _closure
+
+
+@pytest.fixture
+def map_node():
+    def _closure(name, branch, next_node, iterate_on):
+        step_config = {
+            'type': 'map',
+            'next': next_node,
+            'iterate_on': iterate_on,
+            'iterate_as': 'map_value',
+            'branch': branch()._to_dict()
+        }
+        return graph.create_node(name=name, step_config=step_config)
+    return _closure
+
+
+@pytest.fixture
+def parallel_and_map_success_graph(parallel_node, map_node, success_graph):
+    def _closure():
+        dag = graph.Graph(start_at='first')
+        dag.add_node(parallel_node(name='first', branch=success_graph, next_node='second'))
+        dag.add_node(map_node(name='second', branch=success_graph, next_node='success', iterate_on='map_values'))
+        dag.add_terminal_nodes()
+        return dag
+    return _closure
@@ -299,3 +299,64 @@ def test_parallel_fail(parallel_fail_graph):
                         ['steps'].keys()) == ['second.b.first', 'second.b.fail']
         except:
             assert False
+
+
+@pytest.mark.no_cover
+@pytest.mark.parametrize('batch_log_writes', [False, True])
+def test_parallel_and_map_with_enable_parallel(parallel_and_map_success_graph, batch_log_writes, monkeypatch):
+    # The branches are executed by several worker processes even on machines with a single cpu
+    monkeypatch.setenv('SLURM_CPUS_ON_NODE', '4')
+    config = get_config()
+    config['mode']['config'] = {'enable_parallel': True, 'batch_log_writes': batch_log_writes}
+    map_values = [f'value{i}' for i in range(8)]
+    with tempfile.TemporaryDirectory() as context_dir:
+        context_dir_path = Path(context_dir)
+        dag = {'dag': parallel_and_map_success_graph()._to_dict()}
+
+        write_dag_and_config(context_dir_path, dag, config)
+        with open(context_dir_path / 'parameters.yaml', 'wb') as f:
+            yaml.dump({'map_values': map_values}, f)
+        run_id = 'testing_parallel_and_map'
+
+        pipeline.execute(configuration_file=str(context_dir_path / 'config.yaml'),
+                         pipeline_file=str(context_dir_path / 'dag.yaml'), run_id=run_id,
+                         parameters_file=str(context_dir_path / 'parameters.yaml'))
+
+        run_log = get_run_log(context_dir_path, run_id)
+        assert run_log['status'] == defaults.SUCCESS
+        assert list(run_log['steps'].keys()) == ['first', 'second', 'success']
+
+        branch_names = ['first.a', 'first.b'] + [f'second.{map_value}' for map_value in map_values]
+        for branch_name in branch_names:
+            step_name = branch_name.split('.')[0]
+            assert run_log['steps'][step_name]['status'] == defaults.SUCCESS
+            branch_log = run_log['steps'][step_name]['branches'][branch_name]
+            assert branch_log['status'] == defaults.SUCCESS
+            assert list(branch_log['steps'].keys()) == [f'{branch_name}.first', f'{branch_name}.second',
+                                                        f'{branch_name}.success']
+
+
+@pytest.mark.no_cover
+def test_parallel_and_map_with_enable_parallel_leaves_only_the_run_log(parallel_and_map_success_graph, monkeypatch):
+    monkeypatch.setenv('SLURM_CPUS_ON_NODE', '4')
+    config = get_config()
+    config['mode']['config'] = {'enable_parallel': True}
+    with tempfile.TemporaryDirectory() as context_dir:
+        context_dir_path = Path(context_dir)
+        dag = {'dag': parallel_and_map_success_graph()._to_dict()}
+
+        write_dag_and_config(context_dir_path, dag, config)
+        log_folder_path = context_dir_path / 'run_logs'
+        config['run_log_store']['config']['log_folder'] = str(log_folder_path)
+        with open(context_dir_path / 'config.yaml', 'wb') as f:
+            yaml.dump(config, f)
+        with open(context_dir_path / 'parameters.yaml', 'wb') as f:
+            yaml.dump({'map_values': ['value0', 'value1']}, f)
+        run_id = 'testing_parallel_and_map'
+
+        pipeline.execute(configuration_file=str(context_dir_path / 'config.yaml'),
+                         pipeline_file=str(context_dir_path / 'dag.yaml'), run_id=run_id,
+                         parameters_file=str(context_dir_path / 'parameters.yaml'))
+
+        assert get_run_log(log_folder_path, run_id)['status'] == defaults.SUCCESS
+        assert [path.name for path in log_folder_path.iterdir()] == [f'{run_id}.json']